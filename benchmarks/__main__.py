@@ -0,0 +1,147 @@
+"""
+Runs the end-to-end benchmarks of the UUPS components against in-process fakes
+and compares their stage latencies with the stored baseline.
+
+Usage (from the repository root):
+    python -m benchmarks [--components producer migrator publisher logging_overhead cold_start quote_dedup llm_backends meta_export] [--update-baseline]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+COMPONENT_DIRS = {
+    'producer': os.path.join(ROOT_DIR, 'post-producer'),
+    'migrator': os.path.join(ROOT_DIR, 'post-migrator'),
+    'publisher': os.path.join(ROOT_DIR, 'post-publisher'),
+    'logging_overhead': os.path.join(ROOT_DIR, 'post-producer'),
+    'cold_start': os.path.join(ROOT_DIR, 'post-publisher'),
+    'quote_dedup': os.path.join(ROOT_DIR, 'post-producer'),
+    'llm_backends': os.path.join(ROOT_DIR, 'post-producer'),
+    'meta_export': os.path.join(ROOT_DIR, 'post-producer'),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='''
+        Benchmarks the UUPS components against in-process fakes of the external services.
+        ''')
+    parser.add_argument('--components', nargs='+', choices=list(COMPONENT_DIRS),
+        default=list(COMPONENT_DIRS), help='The components to benchmark. Default is all.')
+    parser.add_argument('--items', type=int, default=20,
+        help='The number of assets processed per component. Default is 20.')
+    parser.add_argument('--latency-ms', type=float, default=20,
+        help='The latency injected into every cloud service call. Default is 20.')
+    parser.add_argument('--llm-latency-ms', type=float, default=200,
+        help='The latency injected into every LLM completion. Default is 200.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+        help='The allowed relative p95 latency increase over the baseline. Default is 0.25.')
+    parser.add_argument('--update-baseline', action='store_true',
+        help='Store the results as the new baseline instead of comparing against it.')
+
+    return parser.parse_args()
+
+
+def run_component(component: str, args: argparse.Namespace) -> dict:
+    """
+    Run the benchmark of a component in its own directory and interpreter,
+    as the components have separate import roots.
+
+    Args:
+        - component: The name of the component.
+        - args: The parsed command line arguments.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.' + component,
+            '--items', str(args.items),
+            '--latency-ms', str(args.latency_ms),
+            '--llm-latency-ms', str(args.llm_latency_ms)],
+        cwd=COMPONENT_DIRS[component],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise RuntimeError(f"The {component} benchmark failed.")
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_results(results: dict) -> None:
+    """
+    Print the results of the benchmarked components as a table.
+
+    Args:
+        - results: The benchmark results, keyed by the component name.
+    """
+    print(f"{'stage':<32}{'count':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for component, result in results.items():
+        print(f"{component:<32}{result['items']:>8}{result['throughput_per_s']:>10.2f}")
+        for stage, stats in result['stages'].items():
+            print(f"  {stage:<30}{stats['count']:>8}{stats['throughput_per_s'] or 0:>10.2f}"
+                f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}")
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare the p95 latencies of the stages with the baseline.
+
+    Args:
+        - results: The benchmark results, keyed by the component name.
+        - baseline: The baseline results, keyed by the component name.
+        - tolerance: The allowed relative p95 latency increase.
+
+    Returns:
+        The descriptions of the stages that regressed.
+    """
+    regressions = []
+    for component, result in results.items():
+        for stage, stats in result['stages'].items():
+            baseline_stats = baseline.get(component, {}).get('stages', {}).get(stage)
+            if baseline_stats and stats['p95_ms'] > baseline_stats['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{component}.{stage}: p95 {stats['p95_ms']:.2f} ms "
+                    f"(baseline {baseline_stats['p95_ms']:.2f} ms)")
+
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    results = {component: run_component(component, args) for component in args.components}
+    print_results(results)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline updated in '{BASELINE_FILE}'.")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("No baseline found, run with --update-baseline to store one.")
+        return 0
+
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+
+    for regression in regressions:
+        print("REGRESSION " + regression)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark of the post-publisher's cold start, run from the post-publisher directory.
+
+Every sample starts a fresh interpreter, which measures the import time of the function app
+and the time to the completion of its first invocation, including the deferred SDK imports.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+
+
+def probe(latency: float) -> None:
+    """
+    Measure a single cold start in the current interpreter and print it as a JSON line.
+
+    Args:
+        - latency: The latency of a fake request in seconds.
+    """
+    from benchmarks.publisher import fake_services, queue_image_metas, set_test_environment
+    from benchmarks.fakes import FakeCosmosClient
+
+    set_test_environment()
+    cosmos_client = FakeCosmosClient(latency)
+    queue_image_metas(cosmos_client, 1)
+
+    start_time = time.perf_counter()
+    import function_app
+    imported_time = time.perf_counter()
+
+    # The fakes are installed within the measured time, as they import the patched SDKs
+    with fake_services(latency, cosmos_client):
+        function_app.main()
+    completed_time = time.perf_counter()
+
+    print(json.dumps({
+        "import": imported_time - start_time,
+        "first_main": completed_time - imported_time
+    }))
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the cold start of the post-publisher.")
+
+    timer = StageTimer()
+    start_time = time.perf_counter()
+    for _ in range(args.items):
+        completed = subprocess.run(
+            [sys.executable, '-c',
+                f'from benchmarks.cold_start import probe; probe({args.latency_ms / 1000})'],
+            env=os.environ,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        for stage, duration in sample.items():
+            timer.durations[stage].append(duration)
+    elapsed = time.perf_counter() - start_time
+
+    emit_results('cold_start', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
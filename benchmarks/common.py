@@ -0,0 +1,119 @@
+import argparse
+import inspect
+import json
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+
+class StageTimer:
+    """
+    Collects the durations of the stages of a benchmarked process.
+
+    Attributes:
+        - durations: The measured durations in seconds, keyed by the stage name.
+    """
+    def __init__(self) -> None:
+        self.durations: dict[str, list[float]] = defaultdict(list)
+
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Measures the duration of the wrapped block as a stage.
+
+        Args:
+            - stage: The name of the stage.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage].append(time.perf_counter() - start_time)
+
+
+    def wrap(self, owner: type, attribute: str, stage: str) -> None:
+        """
+        Replaces a method of a class with a wrapper that measures each of its calls as a stage.
+
+        Args:
+            - owner: The class that defines the method.
+            - attribute: The name of the method.
+            - stage: The name of the stage.
+        """
+        is_static = isinstance(inspect.getattr_static(owner, attribute), staticmethod)
+        original = getattr(owner, attribute)
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            with self.measure(stage):
+                return original(*args, **kwargs)
+
+        setattr(owner, attribute, staticmethod(timed) if is_static else timed)
+
+
+    def summary(self) -> dict:
+        """
+        Summarizes the measured stages with their call count, throughput and latencies.
+        """
+        return {
+            stage: {
+                "count": len(durations),
+                "throughput_per_s": len(durations) / sum(durations) if sum(durations) else None,
+                "p50_ms": percentile(durations, 50) * 1000,
+                "p95_ms": percentile(durations, 95) * 1000
+            }
+            for stage, durations in self.durations.items()
+        }
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Calculates the q-th percentile of the values with the nearest-rank method.
+
+    Args:
+        - values: The measured values.
+        - q: The percentile to calculate, between 0 and 100.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def parse_component_args(description: str) -> argparse.Namespace:
+    """
+    Parse the command line arguments shared by the component benchmarks.
+
+    Args:
+        - description: The description of the component benchmark.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--items', type=int, default=20,
+        help='The number of assets processed by the benchmark.')
+    parser.add_argument('--latency-ms', type=float, default=20,
+        help='The latency injected into every cloud service call.')
+    parser.add_argument('--llm-latency-ms', type=float, default=200,
+        help='The latency injected into every LLM completion.')
+
+    return parser.parse_args()
+
+
+def emit_results(component: str, items: int, elapsed: float, stages: dict) -> None:
+    """
+    Print the results of a component benchmark as a single JSON line,
+    which is collected by the benchmark runner.
+
+    Args:
+        - component: The name of the benchmarked component.
+        - items: The number of processed assets.
+        - elapsed: The wall clock time of the benchmark in seconds.
+        - stages: The summary of the measured stages.
+    """
+    print(json.dumps({
+        "component": component,
+        "items": items,
+        "throughput_per_s": items / elapsed,
+        "stages": stages
+    }))
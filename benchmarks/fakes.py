@@ -0,0 +1,248 @@
+"""
+In-process fakes of the external services used by the UUPS components.
+
+Every fake call sleeps for the configured latency, so the benchmarks can simulate
+the network round trips without reaching any real service.
+"""
+import copy
+import json
+import textwrap
+import time
+import uuid
+from types import SimpleNamespace
+
+
+class FakeOpenAI:
+    """
+    Fake of the OpenAI SDK client that returns a random quote with a fixed caption.
+
+    Attributes:
+        - latency: The latency of a completion in seconds.
+    """
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create,
+            with_raw_response=SimpleNamespace(create=self._create_raw)))
+
+
+    def __call__(self, **kwargs) -> 'FakeOpenAI':
+        # Stands in for the OpenAI class, so the clients are constructed as usual
+        return self
+
+
+    def _create(self, **kwargs) -> SimpleNamespace:
+        time.sleep(self.latency)
+        # Every quote is unique, so the quote deduplication never triggers a regeneration
+        content = json.dumps({
+            "quote": " ".join(textwrap.wrap(uuid.uuid4().hex, 8)) + ".",
+            "caption": "Irony in tranquility. #reflection #irony"
+        })
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+    def _create_raw(self, **kwargs) -> SimpleNamespace:
+        completion = self._create(**kwargs)
+        return SimpleNamespace(
+            headers={"x-ratelimit-remaining-requests": "9999", "x-ratelimit-reset-requests": "6ms"},
+            parse=lambda: completion
+        )
+
+
+class FakeBlobContainerClient:
+    """
+    Fake of an Azure Blob Storage container client that keeps the blobs in memory.
+
+    Attributes:
+        - latency: The latency of a request in seconds.
+        - blobs: The uploaded blobs, keyed by their name.
+    """
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.blobs: dict[str, bytes] = {}
+
+
+    def __call__(self, **kwargs) -> 'FakeBlobContainerClient':
+        # Stands in for the ContainerClient class
+        return self
+
+
+    def upload_blob(self, name: str, data, **kwargs) -> None:
+        time.sleep(self.latency)
+        self.blobs[name] = data.read() if hasattr(data, 'read') else data
+
+
+class FakeBlobServiceClient:
+    """
+    Fake of an Azure Blob Storage service client that hands out user delegation keys.
+
+    Attributes:
+        - latency: The latency of a request in seconds.
+    """
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+
+    def __call__(self, **kwargs) -> 'FakeBlobServiceClient':
+        # Stands in for the BlobServiceClient class
+        return self
+
+
+    def get_container_client(self, container_name: str) -> FakeBlobContainerClient:
+        return FakeBlobContainerClient(self.latency)
+
+
+    def get_user_delegation_key(self, **kwargs) -> SimpleNamespace:
+        time.sleep(self.latency)
+        return SimpleNamespace(value='fake-delegation-key')
+
+
+    def get_blob_client(self, container: str, blob: str) -> SimpleNamespace:
+        return SimpleNamespace(account_name='fake', container_name=container, blob_name=blob)
+
+
+def fake_generate_blob_sas(**kwargs) -> str:
+    """
+    Fake of the SAS token generation, which is a local signing operation.
+    """
+    return 'sp=r&sig=fake'
+
+
+class FakeCosmosContainerClient:
+    """
+    Fake of an Azure Cosmos DB container client that keeps the documents in memory.
+
+    Only the queries issued by the UUPS components are supported.
+
+    Attributes:
+        - latency: The latency of a request in seconds.
+        - documents: The stored documents, keyed by their id.
+        - client_connection: Holds the headers of the last response.
+    """
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.documents: dict[str, dict] = {}
+        self.client_connection = SimpleNamespace(
+            last_response_headers={'x-ms-request-charge': '1.0'})
+
+
+    def upsert_item(self, body: dict, **kwargs) -> dict:
+        time.sleep(self.latency)
+        document = dict(body, _etag=str(uuid.uuid4()))
+        self.documents[document['id']] = document
+        return copy.deepcopy(document)
+
+
+    def query_items(self, query: str, parameters: list[dict] = None, **kwargs) -> list[dict]:
+        time.sleep(self.latency)
+        parameters = {parameter['name']: parameter['value'] for parameter in parameters or []}
+
+        # The fake never reports a previous post, so every publisher run has a due slot
+        if 'published_at DESC' in query:
+            return []
+
+        documents = [document for document in self.documents.values()
+            if document.get('published') == parameters.get('@published', document.get('published'))
+            and document.get('lease_expires_at', '') < parameters.get('@leased_before', '~')]
+
+        if 'NOT IS_DEFINED(c.scheduled_at)' in query:
+            documents = [document for document in documents if 'scheduled_at' not in document]
+        elif 'scheduled_at' in query:
+            documents = sorted((document for document in documents if 'scheduled_at' in document),
+                key=lambda document: document['scheduled_at'])
+
+        return copy.deepcopy(documents[:parameters.get('@limit', 1)])
+
+
+    def patch_item(self, item: str, partition_key: str, patch_operations: list[dict],
+        etag: str = None, filter_predicate: str = None, **kwargs) -> dict:
+        # Imported here, as only the Cosmos DB based components have the SDK installed
+        from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+        time.sleep(self.latency)
+        document = self.documents[item]
+        if etag and document['_etag'] != etag:
+            raise CosmosAccessConditionFailedError(status_code=412, message="Precondition failed.")
+
+        for operation in patch_operations:
+            field = operation['path'].lstrip('/')
+            if operation['op'] == 'set':
+                document[field] = operation['value']
+            elif operation['op'] == 'remove':
+                document.pop(field, None)
+            elif operation['op'] == 'incr':
+                document[field] = document.get(field, 0) + operation['value']
+
+        document['_etag'] = str(uuid.uuid4())
+        return copy.deepcopy(document)
+
+
+class FakeCosmosClient:
+    """
+    Fake of an Azure Cosmos DB account client with a single shared container.
+
+    Attributes:
+        - container_client: The container client shared by every database and container name.
+    """
+    def __init__(self, latency: float) -> None:
+        self.container_client = FakeCosmosContainerClient(latency)
+
+
+    def __call__(self, **kwargs) -> 'FakeCosmosClient':
+        # Stands in for the CosmosClient class
+        return self
+
+
+    def get_database_client(self, database_name: str) -> 'FakeCosmosClient':
+        return self
+
+
+    def get_container_client(self, container_name: str) -> FakeCosmosContainerClient:
+        return self.container_client
+
+
+class FakeSecretClient:
+    """
+    Fake of an Azure Key Vault secret client that returns dummy credentials.
+
+    Attributes:
+        - latency: The latency of a request in seconds.
+    """
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+
+    def __call__(self, *args, **kwargs) -> 'FakeSecretClient':
+        # Stands in for the SecretClient class
+        return self
+
+
+    def get_secret(self, name: str) -> SimpleNamespace:
+        time.sleep(self.latency)
+        return SimpleNamespace(value='fake-' + name)
+
+
+class FakeGraphApi:
+    """
+    Fake of the Graph API endpoints used for publishing to Instagram,
+    replacing the requests module of the social media client.
+
+    Attributes:
+        - latency: The latency of a request in seconds.
+    """
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+
+    def post(self, url: str, params: dict, **kwargs) -> SimpleNamespace:
+        time.sleep(self.latency)
+        return self._response({'id': str(uuid.uuid4())})
+
+
+    def get(self, url: str, params: dict, **kwargs) -> SimpleNamespace:
+        time.sleep(self.latency)
+        return self._response({'status_code': 'FINISHED'})
+
+
+    @staticmethod
+    def _response(body: dict) -> SimpleNamespace:
+        return SimpleNamespace(json=lambda: body)
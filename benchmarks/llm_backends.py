@@ -0,0 +1,83 @@
+"""
+Benchmark of the LLM backends of the post-producer, run from the post-producer directory.
+
+The same prompts are sent through the QuoteGeneratorService to OpenAI's backend, served by
+the fake OpenAI client, and to the local backend, served by the stub model over HTTP.
+Both take the LLM latency per completion, but the stub server, like llama.cpp's server
+or vLLM, serves the prefetched batches concurrently. The cost of OpenAI's backend is estimated
+with the prices of gpt-4o-mini and 4 characters per token, the local backend has no API cost.
+"""
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+from benchmarks.fakes import FakeOpenAI
+
+# Prices of gpt-4o-mini in USD per token
+INPUT_TOKEN_PRICE = 0.150 / 1_000_000
+OUTPUT_TOKEN_PRICE = 0.600 / 1_000_000
+# Number of prompts that are prefetched together from the local backend
+BATCH_SIZE = 8
+
+
+def estimate_cost(prompt: str, quote: str, caption: str) -> float:
+    """
+    Estimate the cost of a completion of OpenAI's backend in USD.
+    """
+    return len(prompt) / 4 * INPUT_TOKEN_PRICE + len(quote + caption) / 4 * OUTPUT_TOKEN_PRICE
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the OpenAI and local LLM backends of the post-producer.")
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+    os.environ.setdefault('OPENAI_MODEL', 'benchmark')
+
+    from app.config import init_config
+    from app.models.local_llm_client import LocalLlmClient
+    from app.models.quote_generator_client import OpenAiClient
+    from app.models.stub_llm_server import StubLlmServer
+    from app.services.prompt_builder_service import PromptBuilderService
+    from app.services.quote_generator_service import QuoteGeneratorService
+
+    init_config('test')
+    latency = args.llm_latency_ms / 1000
+    prompts = [PromptBuilderService().get_prompt_variation()[0] for _ in range(args.items)]
+
+    server = StubLlmServer(port=0, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    timer = StageTimer()
+    costs = {'openai': 0.0, 'local': 0.0}
+    start_time = time.perf_counter()
+    try:
+        with patch('app.models.quote_generator_client.OpenAI', FakeOpenAI(latency)):
+            openai_service = QuoteGeneratorService(OpenAiClient(api_key='benchmark', model='benchmark'))
+            for prompt in prompts:
+                with timer.measure('openai'):
+                    quote, caption = openai_service.get_quote_and_caption(prompt)
+                costs['openai'] += estimate_cost(prompt, quote, caption)
+
+        local_client = LocalLlmClient(base_url=server.base_url, batch_size=BATCH_SIZE)
+        local_service = QuoteGeneratorService(local_client)
+        for batch_start in range(0, len(prompts), BATCH_SIZE):
+            batch = prompts[batch_start:batch_start + BATCH_SIZE]
+            local_client.prefetch(batch)
+            for prompt in batch:
+                with timer.measure('local'):
+                    local_service.get_quote_and_caption(prompt)
+    finally:
+        server.shutdown()
+        server.server_close()
+    elapsed = time.perf_counter() - start_time
+
+    stages = timer.summary()
+    for backend, cost in costs.items():
+        stages[backend]['cost_usd_per_1k_quotes'] = cost / args.items * 1000
+
+    emit_results('llm_backends', args.items, elapsed, stages)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,99 @@
+"""
+Benchmark of the per-image logging overhead, run from the post-producer directory.
+
+Compares the previous synchronous file and console handlers with the queue based setup
+of the application's log_config, by emitting the log lines of a generated image.
+"""
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import time
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+
+
+def build_sync_logger(log_path: str, stream: io.TextIOBase) -> logging.Logger:
+    """
+    Build a logger with the synchronous handlers used before the queue based setup.
+    """
+    logger = logging.getLogger('benchmarks.logging.sync')
+    logger.propagate = False
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    for handler in (logging.FileHandler(log_path, mode='a', encoding='utf-8'),
+        logging.StreamHandler(stream)):
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    return logger
+
+
+def build_queue_logger(log_path: str,
+    stream: io.TextIOBase) -> tuple[logging.Logger, logging.handlers.QueueListener]:
+    """
+    Build a logger with the queue based handlers of the application.
+    """
+    from app.config.log_config import CorrelationQueueHandler, JsonFormatter
+
+    file_handler = logging.handlers.RotatingFileHandler(log_path, mode='a',
+        maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - [%(run_id)s] %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+
+    logger = logging.getLogger('benchmarks.logging.queue')
+    logger.propagate = False
+    # Only the message is rendered before queueing, as by the application's queue handler
+    queue_handler = CorrelationQueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(queue_handler)
+
+    return logger, listener
+
+
+def log_image(logger: logging.Logger, asset_id: str) -> None:
+    """
+    Emit the log lines of a single generated image.
+    """
+    logger.info("Quote and caption generated for asset with id '%s'.", asset_id)
+    logger.info("Image with quote created for asset with id '%s'.", asset_id)
+    logger.info("Image with name %s saved.", asset_id + '.jpg')
+    logger.info("Asset with id '%s' generated successfully.", asset_id)
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the per-image logging overhead.")
+    from app.config.log_config import log_context
+
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, 'w', encoding='utf-8') as stream:
+        sync_logger = build_sync_logger(os.path.join(log_dir, 'sync.log'), stream)
+        queue_logger, listener = build_queue_logger(os.path.join(log_dir, 'queue.log'), stream)
+
+        start_time = time.perf_counter()
+        for index in range(args.items):
+            asset_id = f'asset-{index}'
+            with timer.measure('sync_handlers'):
+                log_image(sync_logger, asset_id)
+            with log_context(asset_id=asset_id), timer.measure('queue_handler'):
+                log_image(queue_logger, asset_id)
+
+        # Include draining the queue in the wall clock time
+        listener.stop()
+        elapsed = time.perf_counter() - start_time
+
+        for handler in [*sync_logger.handlers, *listener.handlers]:
+            handler.close()
+
+    emit_results('logging_overhead', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
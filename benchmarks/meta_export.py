@@ -0,0 +1,94 @@
+"""
+Benchmark of the columnar export of the image metadata, run from the post-producer directory.
+
+Writes a metadata file of 100k images, then measures an analytics query over it
+(the approved images of an emotion) as a Python scan of the CSV with its JSON cells parsed,
+and as a filtered read of the exported Parquet file.
+"""
+import csv
+import json
+import os
+import random
+import shutil
+import time
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+
+# The number of images in the metadata file
+HISTORY_SIZE = 100_000
+EMOTIONS = ['Joy', 'Sadness', 'Anger', 'Fear', 'Love', 'Surprise']
+
+
+def write_history(image_meta_file: str, approved_dir: str) -> None:
+    """
+    Write the metadata of the history, and approve every tenth image.
+    """
+    from app.models.image_meta import ImageMeta
+
+    rng = random.Random(0)
+    with open(image_meta_file, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for i in range(HISTORY_SIZE):
+            image_meta = ImageMeta(
+                id=f'{i:08d}',
+                quote=f'Quote number {i} about following shadows to the light.',
+                caption='Benchmark caption #shadows #light',
+                llm_model='benchmark',
+                prompt_version='1',
+                prompt_extras={'emotion': rng.choice(EMOTIONS), 'poetry_topic': 'Love',
+                    'writing_style': 'funny', 'artistical_tool': 'irony', 'max_words': rng.randint(5, 15)},
+                img_meta={'quote_font': 'Modak-Regular.ttf', 'image_background': 'background_pink.png',
+                    'image_width': 2000, 'image_height': 2000, 'image_margin': 151,
+                    'quote_color': [0, 0, 0], 'quote_font_size': 140, 'quote_offset': 100}
+            )
+            writer.writerow(image_meta.to_row())
+            if i % 10 == 0:
+                open(os.path.join(approved_dir, image_meta.id + '.jpg'), 'wb').close()
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the columnar export of 100k images' metadata.")
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+    os.environ.setdefault('OPENAI_MODEL', 'benchmark')
+
+    from app.config import init_config, get_config
+    from app.services.meta_export_service import MetaExportService
+
+    init_config('test')
+    test_dir = get_config().GENERATED_ASSETS_DIR
+    shutil.rmtree(test_dir, ignore_errors=True)
+
+    timer = StageTimer()
+    try:
+        get_config().ensure_asset_storage()
+        write_history(get_config().IMAGE_META_FILE, get_config().APPROVED_IMAGE_DIR)
+        approved_ids = {name[:-len('.jpg')] for name in os.listdir(get_config().APPROVED_IMAGE_DIR)}
+
+        with timer.measure('export'):
+            MetaExportService().export()
+
+        start_time = time.perf_counter()
+        for i in range(args.items):
+            emotion = EMOTIONS[i % len(EMOTIONS)]
+
+            with timer.measure('csv_scan'):
+                with open(get_config().IMAGE_META_FILE, encoding='utf-8', newline='') as f:
+                    scanned = [row['id'] for row in csv.DictReader(f)
+                        if row['id'] in approved_ids
+                        and json.loads(row['prompt_extras'])['emotion'] == emotion]
+
+            with timer.measure('parquet_query'):
+                queried = MetaExportService.read(
+                    filters=[('review_status', '=', 'approved'), ('emotion', '=', emotion)],
+                    columns=['id']).column('id').to_pylist()
+
+            assert scanned == queried
+        elapsed = time.perf_counter() - start_time
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+    emit_results('meta_export', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
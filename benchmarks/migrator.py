@@ -0,0 +1,74 @@
+"""
+Benchmark of the post-migrator's main process, run from the post-migrator directory.
+"""
+import csv
+import os
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+from PIL import Image
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+from benchmarks.fakes import FakeBlobContainerClient, FakeCosmosClient
+
+
+def create_approved_assets(items: int) -> None:
+    """
+    Create approved images of the producer's size and their metadata rows.
+
+    Args:
+        - items: The number of approved assets to create.
+    """
+    from app.config import get_config
+    from app.models.image_meta import ImageMeta
+
+    image = Image.new('RGB', (2000, 2000), color='yellow')
+    with open(get_config().IMAGE_META_FILE, 'a', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for _ in range(items):
+            image_meta = ImageMeta(id=str(uuid.uuid4()), quote='quote', caption='caption',
+                llm_model='benchmark', prompt_version='1.0.0', prompt_extras={}, img_meta={})
+            writer.writerow(image_meta.to_list())
+            image.save(os.path.join(get_config().APPROVED_IMAGE_DIR, image_meta.id + '.jpg'))
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the post-migrator with fake Azure services.")
+    latency = args.latency_ms / 1000
+    for name in ['TEST_STORAGE_ACCOUNT_URL', 'TEST_STORAGE_CONTAINER_NAME',
+        'TEST_STORAGE_CONTAINER_SAS', 'TEST_COSMOSDB_ACCOUNT_URL', 'TEST_COSMOSDB_ACCOUNT_KEY',
+        'TEST_COSMOSDB_DATABASE_NAME', 'TEST_COSMOSDB_CONTAINER_NAME']:
+        os.environ[name] = 'benchmark'
+
+    from app.__main__ import main
+    from app.clients.database_client import CosmosDbClient
+    from app.clients.storage_client import AzureStorageClient
+    from app.config import TestConfig, init_config
+    from app.services.asset_manager_service import AssetManagerService
+
+    # Measure the stages of the migration
+    timer = StageTimer()
+    timer.wrap(AssetManagerService, 'get_approved_assets', 'scan')
+    timer.wrap(AzureStorageClient, 'upload_file', 'upload')
+    timer.wrap(CosmosDbClient, 'insert_record', 'insert')
+    timer.wrap(AssetManagerService, 'move_images_to_processed', 'move')
+
+    with tempfile.TemporaryDirectory() as assets_dir, \
+        patch.object(TestConfig, 'set_generated_images_root_dir',
+            lambda self: setattr(self, 'GENERATED_ASSETS_DIR', assets_dir)), \
+        patch('app.clients.storage_client.ContainerClient', FakeBlobContainerClient(latency)), \
+        patch('app.clients.database_client.CosmosClient', FakeCosmosClient(latency)):
+        init_config('test')
+        create_approved_assets(args.items)
+
+        start_time = time.perf_counter()
+        main()
+        elapsed = time.perf_counter() - start_time
+
+    emit_results('migrator', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,49 @@
+"""
+Benchmark of the post-producer's main process, run from the post-producer directory.
+"""
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+from benchmarks.fakes import FakeOpenAI
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the post-producer with a fake LLM.")
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+    os.environ.setdefault('OPENAI_MODEL', 'benchmark')
+
+    from app.__main__ import main
+    from app.config import TestConfig, init_config
+    from app.services.asset_manager_service import AssetManagerService
+    from app.services.image_generator_service import ImageGeneratorService
+    from app.services.image_meta_writer import ImageMetaWriter
+    from app.services.prompt_builder_service import PromptBuilderService
+    from app.services.quote_generator_service import QuoteGeneratorService
+
+    # Measure the stages of the image generation
+    timer = StageTimer()
+    timer.wrap(PromptBuilderService, 'get_prompt_variation', 'prompt')
+    timer.wrap(QuoteGeneratorService, 'get_quote_and_caption', 'llm')
+    timer.wrap(ImageGeneratorService, 'set_random_color_and_font_scheme', 'load_assets')
+    timer.wrap(ImageGeneratorService, 'create_image_with_quote', 'render')
+    timer.wrap(ImageMetaWriter, 'flush', 'save_meta')
+    timer.wrap(AssetManagerService, 'save_image', 'save_image')
+
+    with tempfile.TemporaryDirectory() as assets_dir, \
+        patch.object(TestConfig, 'set_export_root',
+            lambda self: setattr(self, 'GENERATED_ASSETS_DIR', assets_dir)), \
+        patch('app.models.quote_generator_client.OpenAI', FakeOpenAI(args.llm_latency_ms / 1000)):
+        init_config('test')
+
+        start_time = time.perf_counter()
+        main(image_num=args.items)
+        elapsed = time.perf_counter() - start_time
+
+    emit_results('producer', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
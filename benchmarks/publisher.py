@@ -0,0 +1,108 @@
+"""
+Benchmark of the post-publisher's main process, run from the post-publisher directory.
+"""
+import datetime
+import os
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+from benchmarks.fakes import (
+    FakeBlobServiceClient,
+    FakeCosmosClient,
+    FakeGraphApi,
+    FakeSecretClient,
+    fake_generate_blob_sas
+)
+
+
+def set_test_environment() -> None:
+    """
+    Set the environment variables of the post-publisher's test configuration.
+    """
+    os.environ['UUPS_ENV'] = 'test'
+    for name in ['TEST_STORAGE_ACCOUNT_URL', 'TEST_STORAGE_CONTAINER_NAME',
+        'TEST_COSMOSDB_ACCOUNT_URL', 'TEST_COSMOSDB_DATABASE_NAME', 'TEST_COSMOSDB_CONTAINER_NAME']:
+        os.environ[name] = 'benchmark'
+
+
+def queue_image_metas(cosmos_client: FakeCosmosClient, items: int) -> None:
+    """
+    Queue the metadata of the approved images for publishing.
+
+    Args:
+        - cosmos_client: The fake Cosmos DB client that stores the metadata.
+        - items: The number of queued images.
+    """
+    scheduled_at = datetime.datetime.now(datetime.timezone.utc)
+    for index in range(items):
+        cosmos_client.container_client.upsert_item({
+            "id": str(uuid.uuid4()),
+            "caption": "caption",
+            "published": False,
+            "scheduled_at": (scheduled_at + datetime.timedelta(seconds=index)).isoformat()
+        })
+
+
+@contextmanager
+def fake_services(latency: float, cosmos_client: FakeCosmosClient):
+    """
+    Replace the Azure SDKs and the Graph API with in-process fakes.
+
+    The SDKs are patched where they are defined, as the post-publisher imports them on first use.
+
+    Args:
+        - latency: The latency of a fake request in seconds.
+        - cosmos_client: The fake Cosmos DB client that stores the metadata.
+    """
+    graph_api = FakeGraphApi(latency)
+    with ExitStack() as stack:
+        for target, fake in [
+            ('azure.identity.DefaultAzureCredential', lambda: None),
+            ('azure.keyvault.secrets.SecretClient', FakeSecretClient(latency)),
+            ('azure.storage.blob.BlobServiceClient', FakeBlobServiceClient(latency)),
+            ('azure.storage.blob.generate_blob_sas', fake_generate_blob_sas),
+            ('azure.cosmos.cosmos_client.CosmosClient', cosmos_client),
+            ('requests.get', graph_api.get),
+            ('requests.post', graph_api.post)]:
+            stack.enter_context(patch(target, fake))
+        yield
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the post-publisher with fake Azure and Graph APIs.")
+    latency = args.latency_ms / 1000
+    set_test_environment()
+
+    import function_app
+    from clients.database_client import CosmosDbClient
+    from clients.social_media_client import InstagramClient
+    from clients.storage_client import AzureStorageClient
+    from services.publish_queue_service import PublishQueueService
+
+    # Measure the stages of the publishing
+    timer = StageTimer()
+    timer.wrap(PublishQueueService, 'claim_next', 'claim')
+    timer.wrap(AzureStorageClient, 'get_access_token', 'sas')
+    timer.wrap(InstagramClient, 'publish_post', 'publish')
+    timer.wrap(CosmosDbClient, 'update_published_statuses', 'status_update')
+
+    # Queue the approved images' metadata
+    cosmos_client = FakeCosmosClient(latency)
+    queue_image_metas(cosmos_client, args.items)
+
+    with fake_services(latency, cosmos_client):
+        # Every invocation publishes the post of a single due slot
+        start_time = time.perf_counter()
+        for _ in range(args.items):
+            with timer.measure('invocation'):
+                function_app.main()
+        elapsed = time.perf_counter() - start_time
+
+    emit_results('publisher', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
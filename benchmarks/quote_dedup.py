@@ -0,0 +1,46 @@
+"""
+Benchmark of the quote deduplication index, run from the post-producer directory.
+
+Loads a persisted index of 100k quotes and measures the lookup latency of new quotes.
+"""
+import os
+import tempfile
+import time
+import uuid
+
+from benchmarks.common import StageTimer, emit_results, parse_component_args
+
+# The number of quotes in the persisted index
+INDEX_SIZE = 100_000
+
+
+def run() -> None:
+    args = parse_component_args("Benchmarks the quote deduplication index at 100k quotes.")
+    from app.services.quote_dedup_service import QuoteDedupService
+
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as index_dir:
+        # Random records stand in for the signatures of unrelated quotes
+        index_file = os.path.join(index_dir, 'quote_index.bin')
+        with open(index_file, 'wb') as f:
+            f.write(os.urandom(INDEX_SIZE * QuoteDedupService.RECORD_SIZE))
+
+        quote_dedup_service = QuoteDedupService(index_file=index_file)
+        with timer.measure('load'):
+            quote_dedup_service.load()
+
+        # Every item is looked up as a new quote, then added to the index
+        start_time = time.perf_counter()
+        for _ in range(args.items):
+            quote = f"Quote number {uuid.uuid4().hex} about following shadows to the light."
+            with timer.measure('lookup'):
+                quote_dedup_service.is_duplicate(quote)
+            with timer.measure('add'):
+                quote_dedup_service.add(quote)
+        elapsed = time.perf_counter() - start_time
+
+    emit_results('quote_dedup', args.items, elapsed, timer.summary())
+
+
+if __name__ == '__main__':
+    run()
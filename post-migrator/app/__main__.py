@@ -1,13 +1,57 @@
+import argparse
+import time
+
 from app.config import init_config, get_config
 from app.config.log_config import logger
 from app.clients.database_client import CosmosDbClient
 from app.clients.storage_client import AzureStorageClient
 from app.services.asset_manager_service import AssetManagerService
+from app.services.directory_scanner_service import DirectoryScannerService
 
 
-def main():
-    # Initialize the AssetManagerService for Azure Blob Storage and Azure Cosmos DB
-    asset_manager_service = AssetManagerService(
+def parse_args():
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description='''
+            This script migrates the approved images and their metadata to Azure.
+            '''
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running, and migrate the images within seconds of their approval.',
+        required=False
+    )
+    parser.add_argument(
+        '--idle_timeout',
+        type=float,
+        help='The number of seconds without approvals after which the watch stops. Default is 900.',
+        required=False,
+        default=900
+    )
+    parser.add_argument(
+        '--batch_window',
+        type=float,
+        help='The number of seconds the approvals of a burst are collected to be migrated together. '
+            'Default is 2.',
+        required=False,
+        default=2
+    )
+
+    return parser.parse_args()
+
+
+def get_asset_manager_service(directory_scanner: DirectoryScannerService) -> AssetManagerService:
+    """
+    Initialize the AssetManagerService for Azure Blob Storage and Azure Cosmos DB.
+    The clients keep their connections, so they are reused by every migration of the process.
+
+    Args:
+        - directory_scanner: The incremental scanner of the approved images.
+    """
+    return AssetManagerService(
         storage_client=AzureStorageClient(
             account_url=get_config().STORAGE_ACCOUNT_URL,
             container_name=get_config().STORAGE_CONTAINER_NAME,
@@ -18,26 +62,119 @@ def main():
             account_key=get_config().COSMOSDB_ACCOUNT_KEY,
             database_name=get_config().COSMOSDB_DATABASE_NAME,
             container_name=get_config().COSMOSDB_CONTAINER_NAME
-        )
+        ),
+        directory_scanner=directory_scanner
     )
 
+
+def migrate(asset_manager_service: AssetManagerService) -> int:
+    """
+    Migrate the images approved since the last migration, and their metadata.
+
+    Args:
+        - asset_manager_service: The service of the assets.
+
+    Returns:
+        The number of migrated images.
+    """
     # Get the approved images and their metadata
     img_paths, img_metas = asset_manager_service.get_approved_assets()
 
-    if not img_paths:
+    if img_paths:
+        # Upload the approved images to the cloud storage and their metas to the database
+        asset_manager_service.upload_images(img_paths)
+        asset_manager_service.upload_image_metas(img_metas)
+
+        # Move locally the approved images to the processed folder
+        asset_manager_service.move_images_to_processed(img_paths)
+
+    # Record the scan, so the migrated images are not scanned again
+    asset_manager_service.directory_scanner.commit()
+
+    return len(img_paths)
+
+
+def main():
+    # The review is over when a single migration is started, so the images are not waited for
+    asset_manager_service = get_asset_manager_service(DirectoryScannerService(
+        directory=get_config().APPROVED_IMAGE_DIR,
+        manifest_file=get_config().SCAN_MANIFEST_FILE,
+        settle_seconds=0,
+        use_inotify=False
+    ))
+
+    if not migrate(asset_manager_service):
         logger.info("No approved images to upload.")
-        return
 
-    # Upload the approved images to the cloud storage and their metas to the database
-    asset_manager_service.upload_images(img_paths)
-    asset_manager_service.upload_image_metas(img_metas)
 
-    # Move locally the approved images to the processed folder
-    asset_manager_service.move_images_to_processed(img_paths)
+def watch(idle_timeout: float = 900,
+    batch_window: float = 2,
+    rescan_interval: float = 5,
+    retry_interval: float = 30):
+    """
+    Migrate the images continuously during the review, until no image is approved for the idle timeout.
+    The failed migrations are retried, until they keep failing for the idle timeout.
+
+    Args:
+        - idle_timeout: The number of seconds without approvals after which the watch stops.
+        - batch_window: The number of seconds the approvals of a burst are collected to be migrated together.
+        - rescan_interval: The maximum number of seconds between two scans, e.g. of the images still being copied.
+        - retry_interval: The number of seconds to wait before retrying a failed migration.
+    """
+    logger.info("Watching the approved images, until none is approved for %s seconds...", idle_timeout)
+
+    get_config().ensure_asset_directories()
+    directory_scanner = DirectoryScannerService(
+        directory=get_config().APPROVED_IMAGE_DIR,
+        manifest_file=get_config().SCAN_MANIFEST_FILE
+    )
+    asset_manager_service = get_asset_manager_service(directory_scanner)
+    last_approval_time = time.monotonic()
+    failing_since = None
+
+    try:
+        while True:
+            try:
+                if migrate(asset_manager_service):
+                    last_approval_time = time.monotonic()
+                failing_since = None
+            except Exception:
+                # A persistent failure, e.g. a closed IP window or invalid credentials,
+                # stops the watch with an error once it lasted for the idle timeout
+                failing_since = failing_since or time.monotonic()
+                failing_time = time.monotonic() - failing_since
+                if failing_time >= idle_timeout:
+                    logger.critical("Failed to migrate the approved images for %s seconds, "
+                        "stopping the watch.", idle_timeout)
+                    raise
+
+                # The failed images are not committed, so they are scanned again by the retry
+                logger.error("Failed to migrate the approved images, retrying in %s seconds.",
+                    retry_interval, exc_info=True)
+                time.sleep(min(retry_interval, idle_timeout - failing_time))
+                continue
+
+            idle_time = time.monotonic() - last_approval_time
+            if idle_time >= idle_timeout:
+                logger.info("No images were approved for %s seconds, stopping the watch.", idle_timeout)
+                break
+
+            # Collect the rest of a burst of approvals, once the first one arrives
+            if directory_scanner.wait(timeout=min(idle_timeout - idle_time, rescan_interval)):
+                time.sleep(batch_window)
+    except KeyboardInterrupt:
+        logger.info("Watch interrupted.")
+    finally:
+        directory_scanner.close()
 
 
 if __name__ == "__main__":
+    # Retrieve the application arguments
+    args = parse_args()
     # Initialize the project configuration
     init_config(env='prod')
 
-    main()
+    if args.watch:
+        watch(args.idle_timeout, args.batch_window)
+    else:
+        main()
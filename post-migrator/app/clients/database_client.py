@@ -6,6 +6,7 @@ from azure.cosmos.cosmos_client import (
 )
 
 from app.config.log_config import logger
+from app.config.metrics_config import metrics
 from app.exceptions.database_client_exceptions import DatabaseInsertException
 
 
@@ -85,6 +86,7 @@ class CosmosDbClient(DatabaseClient):
             return False
 
 
+    @metrics.timed('insert_record')
     def insert_record(self, record: dict) -> None:
         """
         Insert a record into the database's container.
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from azure.storage.blob import ContainerClient, ContentSettings
 
 from app.config.log_config import logger
+from app.config.metrics_config import metrics
 from app.exceptions.storage_client_exceptions import FileUploadException
 
 
@@ -55,6 +56,7 @@ class AzureStorageClient(StorageClient):
         )
 
 
+    @metrics.timed('upload_file')
     def upload_file(self, file_path: str,
         file_name: str) -> None:
         """
@@ -66,9 +68,11 @@ class AzureStorageClient(StorageClient):
         """
         try:
             with open(file=file_path, mode="rb") as data:
+                # A retried upload replaces the blob of the failed attempt
                 self.container_client.upload_blob(
                     name=file_name,
                     data=data,
+                    overwrite=True,
                     content_settings=ContentSettings(
                         content_type="image/jpg"
                     )
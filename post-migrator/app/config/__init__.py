@@ -2,12 +2,16 @@ import csv
 import os
 from dotenv import load_dotenv
 
+from app.config.log_config import setup_logger
 from app.models.image_meta import ImageMeta
 
 
 class Config:
     """
     Configuration class for the application.
+
+    Only the paths are resolved on initialization. The directories are created
+    by the first writer that needs them.
     """
     def __init__(self):
         # Load the environment variables from the .env file
@@ -16,8 +20,17 @@ class Config:
         # Set folder and file paths used in the application
         self.set_generated_images_root_dir()
         self.set_generated_image_paths()
-        # Create the required directories if they don't exist
-        self.create_asset_directories()
+        self._asset_directories_created = False
+
+
+    def ensure_asset_directories(self):
+        """
+        Create the directories where the generated images are stored,
+        if they were not created yet by this run.
+        """
+        if not self._asset_directories_created:
+            self.create_asset_directories()
+            self._asset_directories_created = True
 
 
     def load_env_variables(self):
@@ -57,6 +70,8 @@ class Config:
         self.APPROVED_IMAGE_DIR = os.path.join(self.GENERATED_ASSETS_DIR, 'approved_images')
         self.PROCESSED_IMAGE_DIR = os.path.join(self.GENERATED_ASSETS_DIR, 'processed_images')
         self.IMAGE_META_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'images_meta.csv')
+        # Manifest of the approved images that were already scanned
+        self.SCAN_MANIFEST_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'migrator_manifest.json')
 
 
     def create_asset_directories(self):
@@ -82,7 +97,8 @@ class TestConfig(Config):
     """
     def __init__(self):
         super().__init__()
-        # Create test files necessary for the automated tests
+        # Create test directories and files necessary for the automated tests
+        self.ensure_asset_directories()
         self.create_test_files()
 
 
@@ -133,6 +149,7 @@ config = None
 
 def init_config(env='test'):
     global config
+    setup_logger()
     if env == 'test':
         config = TestConfig()
     elif env == 'prod':
@@ -1,11 +1,75 @@
+import atexit
+import contextvars
+import datetime
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import uuid
+from contextlib import contextmanager
 
+# Correlation ids attached to every log record of the current run and asset
+run_id_var = contextvars.ContextVar('run_id', default=uuid.uuid4().hex[:12])
+asset_id_var = contextvars.ContextVar('asset_id', default=None)
 
-def setup_logger(log_file='app.log'):
+
+class CorrelationQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that stamps the records with the correlation ids of the calling context,
+    before they are handed over to the listener thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.run_id = run_id_var.get()
+        record.asset_id = asset_id_var.get()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatter that renders the log records as single-line JSON objects.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            'timestamp': datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'run_id': getattr(record, 'run_id', None),
+            'asset_id': getattr(record, 'asset_id', None)
+        }, ensure_ascii=False)
+
+
+@contextmanager
+def log_context(asset_id: str = None):
+    """
+    Attaches the id of the processed asset to the log records emitted within the block.
+
+    Args:
+        - asset_id: The id of the processed asset.
+    """
+    token = asset_id_var.set(asset_id)
+    try:
+        yield
+    finally:
+        asset_id_var.reset(token)
+
+
+def setup_logger(log_file='app.log',
+    max_bytes=10 * 1024 * 1024,
+    backup_count=5):
     """
     Setup the logger for the application.
+
+    The records are put on a queue by the application threads, and written
+    to the rotating JSON log file and the console by a background listener thread,
+    so logging never blocks on I/O. Calling it again has no effect.
     """
+    global _listener
+    if _listener is not None:
+        return logger
+
     # Create logs directory if it doesn't exist
     log_dir = 'logs'
     if not os.path.exists(log_dir):
@@ -13,22 +77,40 @@ def setup_logger(log_file='app.log'):
 
     log_path = os.path.join(log_dir, log_file)
 
+    # Configure the handlers of the listener thread
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=log_path,
+        mode='a',
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding='utf-8',
+        delay=True
+    )
+    file_handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - [%(run_id)s] %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler,
+        respect_handler_level=True)
+    _listener.start()
+    # Flush the queued records when the application exits
+    atexit.register(_listener.stop)
+
+    # Only the message is rendered before queueing, the listener's handlers add the rest
+    queue_handler = CorrelationQueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(
-                filename=log_path,
-                mode='a',
-                encoding='utf-8'
-            ),
-            logging.StreamHandler()
-        ]
+        handlers=[queue_handler]
     )
 
-    # Create and return logger with module name granularity
-    return logging.getLogger(__name__)
+    return logger
 
-# Initialize the logger as a global variable
-logger = setup_logger()
+# Create the logger with module name granularity as a global variable,
+# its handlers are attached by setup_logger() when the configuration is initialized
+logger = logging.getLogger(__name__)
+_listener = None
@@ -0,0 +1,94 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+
+class MetricsRecorder:
+    """
+    Records the duration of the application's stages as structured JSON lines.
+
+    The sink is configured via the UUPS_METRICS_SINK environment variable:
+        - not set or empty: metrics are disabled, and the timed functions are left untouched
+        - 'log': the metrics are emitted through the application's logger
+        - any other value: the path of the JSON lines file the metrics are appended to
+
+    Attributes:
+        - component: The name of the component that emits the metrics.
+        - sink: The configured metrics sink.
+        - enabled: Whether the metrics are recorded or not.
+    """
+    def __init__(self, component: str,
+        sink: str = None) -> None:
+        self.component = component
+        self.sink = sink
+        self.enabled = bool(sink)
+        self._file = None
+        self._lock = threading.Lock()
+
+
+    def timed(self, stage: str):
+        """
+        Decorator that records the duration of every call of the decorated function.
+
+        When the metrics are disabled, the function is returned as is,
+        so the instrumentation adds no overhead at all.
+
+        Args:
+            - stage: The name of the stage the function implements.
+        """
+        def decorator(func):
+            if not self.enabled:
+                return func
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start_time = time.perf_counter()
+                status = 'error'
+                try:
+                    result = func(*args, **kwargs)
+                    status = 'ok'
+                    return result
+                finally:
+                    self.record(stage, time.perf_counter() - start_time, status=status)
+
+            return wrapper
+        return decorator
+
+
+    def record(self, stage: str,
+        duration: float,
+        **attributes) -> None:
+        """
+        Emit a single metric to the configured sink.
+
+        Args:
+            - stage: The name of the measured stage.
+            - duration: The duration of the stage in seconds.
+            - attributes: Additional attributes of the measurement.
+        """
+        if not self.enabled:
+            return
+
+        line = json.dumps({
+            'timestamp': time.time(),
+            'component': self.component,
+            'stage': stage,
+            'duration_ms': round(duration * 1000, 3),
+            **attributes
+        }, default=str)
+
+        if self.sink == 'log':
+            logging.getLogger(__name__).info(line)
+            return
+
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.sink)), exist_ok=True)
+                self._file = open(self.sink, mode='a', encoding='utf-8', buffering=1)
+            self._file.write(line + '\n')
+
+# Initialize the metrics recorder as a global variable
+metrics = MetricsRecorder('post-migrator', os.environ.get('UUPS_METRICS_SINK'))
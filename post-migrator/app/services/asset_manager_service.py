@@ -1,14 +1,16 @@
 import csv
+import datetime
 import os
 import shutil
 from glob import glob
 from typing import Tuple
 
 from app.config import get_config
-from app.config.log_config import logger
+from app.config.log_config import log_context, logger
 from app.models.image_meta import ImageMeta
 from app.clients.database_client import DatabaseClient
 from app.clients.storage_client import StorageClient
+from app.services.directory_scanner_service import DirectoryScannerService
 
 
 class AssetManagerService:
@@ -18,18 +20,23 @@ class AssetManagerService:
     Attributes:
         - storage_client: The client for the cloud storage account.
         - database_client: The client for the cloud database.
+        - directory_scanner: The incremental scanner of the approved images, or None to list all of them.
     """
     def __init__(self, storage_client: StorageClient,
-        database_client: DatabaseClient) -> None:
+        database_client: DatabaseClient,
+        directory_scanner: DirectoryScannerService = None) -> None:
         self.storage_client: StorageClient = storage_client
         self.database_client: DatabaseClient = database_client
+        self.directory_scanner: DirectoryScannerService = directory_scanner
 
 
     def get_approved_assets(self) -> Tuple[list[str], list[ImageMeta]]:
         """
-        Get the approved images and their metadata.
+        Get the approved images and their metadata. With a directory scanner,
+        only the images approved since its last committed scan are returned.
         """
-        img_paths = self.get_approved_image_paths()
+        img_paths = self.directory_scanner.scan() if self.directory_scanner \
+            else self.get_approved_image_paths()
 
         if not img_paths:
             return [], []
@@ -82,10 +89,11 @@ class AssetManagerService:
             - image_paths: The paths of the images to be uploaded.
         """
         for image_path in image_paths:
-            self.storage_client.upload_file(
-                file_path=image_path,
-                file_name=os.path.basename(image_path)
-            )
+            with log_context(asset_id=os.path.basename(image_path).split('.')[0]):
+                self.storage_client.upload_file(
+                    file_path=image_path,
+                    file_name=os.path.basename(image_path)
+                )
 
         logger.info("Images uploaded to the '%s' container in the '%s' storage account.",
             get_config().STORAGE_CONTAINER_NAME, get_config().STORAGE_ACCOUNT_URL)
@@ -103,9 +111,12 @@ class AssetManagerService:
             # indicating that the image has not been published to social media
             img_meta = img_meta.to_json()
             img_meta['published'] = False
+            # Queue the image for publishing in the order of the migration
+            img_meta['scheduled_at'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
             # Insert the image metadata into the database
-            self.database_client.insert_record(img_meta)
+            with log_context(asset_id=img_meta['id']):
+                self.database_client.insert_record(img_meta)
 
         logger.info("Image metadata uploaded to the '%s' container in the '%s' database.",
             get_config().COSMOSDB_CONTAINER_NAME, get_config().COSMOSDB_DATABASE_NAME)
@@ -119,6 +130,8 @@ class AssetManagerService:
         Args:
             - image_paths: The path of the image to be moved to the processed folder.
         """
+        get_config().ensure_asset_directories()
+
         for image_path in image_paths:
             file_name = os.path.basename(image_path)
 
@@ -0,0 +1,248 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sys
+import time
+from typing import Optional
+
+from app.config.log_config import logger
+
+
+class DirectoryScannerService:
+    """
+    Service class that scans a directory incrementally, and emits only the files
+    that were added since the last committed scan.
+
+    The scanned files are recorded in a manifest by their names, inodes and modification times.
+    The directory itself is only listed when its modification time changed since the last scan,
+    the inodes of the listed files come from the directory entries, and only the new files are
+    stat'ed, so a scan doesn't stat every file of a large directory. A file that replaces another
+    one under the same name is a new file, as it has a new inode.
+
+    The files modified in the last moments are left for a later scan, as they may still be copied
+    into the directory. The changes of the directory can be awaited through inotify on Linux,
+    or by polling the modification time of the directory elsewhere.
+
+    Attributes:
+        - directory: The path of the scanned directory.
+        - manifest_file: The path of the manifest of the committed scans, or None to keep it in memory.
+        - extension: The extension of the scanned files.
+        - settle_seconds: The time since their last modification after which the files are emitted.
+        - use_inotify: Whether the changes of the directory are awaited through inotify, when it is available.
+    """
+    def __init__(self, directory: str,
+        manifest_file: str = None,
+        extension: str = '.jpg',
+        settle_seconds: float = 1.0,
+        use_inotify: bool = True) -> None:
+        self.directory = directory
+        self.manifest_file = manifest_file
+        self.extension = extension
+        self.settle_seconds = settle_seconds
+
+        self._manifest = self._load_manifest()
+        self._scanned_entries: dict[str, list[int]] = {}
+        self._scanned_directory_mtime: Optional[int] = None
+        self._emitted_files: list[str] = []
+        self._inotify = _Inotify.create(directory) if use_inotify else None
+
+
+    def scan(self) -> list[str]:
+        """
+        Get the paths of the files added to the directory since the last committed scan,
+        in the order of their modification.
+        """
+        # The changes until now are covered by this scan, so a wait is only woken up by later ones
+        if self._inotify:
+            self._inotify.drain()
+
+        directory_mtime = self._get_directory_mtime()
+        if directory_mtime is None:
+            return []
+
+        # Nothing was added or removed since the last committed scan
+        if directory_mtime == self._manifest['directory_mtime_ns']:
+            return []
+
+        known_entries = self._manifest['entries']
+        scanned_entries, new_files, settling = {}, [], False
+        settled_before = time.time_ns() - int(self.settle_seconds * 1e9)
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.extension) or entry.name.startswith('.'):
+                    continue
+
+                known_entry = known_entries.get(entry.name)
+                # The inode of the entry is read from the directory, without a stat on POSIX
+                if known_entry and known_entry[0] == entry.inode():
+                    scanned_entries[entry.name] = known_entry
+                    continue
+
+                stat = entry.stat()
+                if stat.st_mtime_ns > settled_before:
+                    settling = True
+                    continue
+
+                scanned_entries[entry.name] = [stat.st_ino, stat.st_mtime_ns]
+                new_files.append((stat.st_mtime_ns, entry.path))
+
+        # The listing is only skipped next time if it couldn't miss a file that was still settling,
+        # or one that was added in the same tick of a coarse modification time
+        self._scanned_entries = scanned_entries
+        self._scanned_directory_mtime = directory_mtime \
+            if not settling and directory_mtime < settled_before else None
+        self._emitted_files = [path for _, path in sorted(new_files)]
+
+        return self._emitted_files
+
+
+    def commit(self) -> None:
+        """
+        Record the files of the last scan in the manifest, once they were processed,
+        so they are not emitted again.
+        """
+        # The processed files that were moved away are forgotten, so they are new if they come back
+        entries = dict(self._scanned_entries)
+        for path in self._emitted_files:
+            if not os.path.exists(path):
+                entries.pop(os.path.basename(path), None)
+
+        self._manifest = {
+            'directory_mtime_ns': self._scanned_directory_mtime,
+            'entries': entries
+        }
+        self._save_manifest()
+
+
+    def wait(self, timeout: float,
+        poll_interval: float = 1.0) -> bool:
+        """
+        Wait until the directory changes or the timeout expires.
+
+        Args:
+            - timeout: The maximum time to wait in seconds.
+            - poll_interval: The interval of checking the directory when inotify is not available.
+
+        Returns:
+            Whether the directory changed.
+        """
+        if self._inotify:
+            return self._inotify.wait(timeout)
+
+        deadline = time.monotonic() + timeout
+        initial_mtime = self._get_directory_mtime()
+        while True:
+            if self._get_directory_mtime() != initial_mtime:
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(poll_interval, remaining))
+
+
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+
+    def _get_directory_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+    def _load_manifest(self) -> dict:
+        """
+        Load the manifest of the committed scans. A new manifest is started
+        if there is none yet or it was written for another directory.
+        """
+        if self.manifest_file and os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            if manifest.get('directory') == os.path.abspath(self.directory):
+                return manifest
+
+        return {'directory_mtime_ns': None, 'entries': {}}
+
+
+    def _save_manifest(self) -> None:
+        """
+        Persist the manifest by replacing the manifest file atomically.
+        """
+        if not self.manifest_file:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_file)), exist_ok=True)
+        temp_file = self.manifest_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'directory': os.path.abspath(self.directory), **self._manifest}, f)
+        os.replace(temp_file, self.manifest_file)
+
+
+class _Inotify:
+    """
+    Minimal inotify watch of the files created in or moved into a directory, through the C library.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+
+    @classmethod
+    def create(cls, directory: str) -> Optional['_Inotify']:
+        """
+        Watch the directory, or return None if inotify is not available.
+        """
+        if not sys.platform.startswith('linux'):
+            return None
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(cls.IN_NONBLOCK | cls.IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, os.fsencode(directory),
+                cls.IN_CLOSE_WRITE | cls.IN_MOVED_TO | cls.IN_CREATE) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        except (OSError, AttributeError):
+            logger.warning("Inotify is not available, the directory is polled instead.", exc_info=True)
+            return None
+
+        return cls(fd)
+
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+
+        self.drain()
+        return True
+
+
+    def drain(self) -> None:
+        """
+        Discard the pending events, as they are only used to wake up a wait.
+        """
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+
+    def close(self) -> None:
+        os.close(self.fd)
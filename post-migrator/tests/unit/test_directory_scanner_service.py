@@ -0,0 +1,82 @@
+import os
+import shutil
+import threading
+import time
+from unittest.mock import patch
+
+from app.config import get_config
+from app.services.directory_scanner_service import DirectoryScannerService
+
+
+def create_image(file_name: str, mtime: float = None) -> str:
+    """
+    Create a dummy image in the approved images directory, modified at the given time.
+    """
+    image_path = os.path.join(get_config().APPROVED_IMAGE_DIR, file_name)
+    with open(image_path, 'wb') as f:
+        f.write(b'jpg')
+    if mtime is not None:
+        os.utime(image_path, (mtime, mtime))
+
+    return image_path
+
+
+def test_scan_emits_only_new_files_and_skips_unchanged_directory():
+    """
+    GIVEN a directory scanner with a manifest, and 2 approved images
+    WHEN the directory is scanned and committed, a new image is added, and it is scanned again
+        by a new scanner with the same manifest
+    THEN only the new image should be emitted by the second scan
+        AND an unchanged directory should not be listed again
+        AND an uncommitted scan should emit its images again
+    """
+    # Scan the first images
+    manifest_file = get_config().SCAN_MANIFEST_FILE
+    first_paths = [create_image('image1.jpg', mtime=1000), create_image('image2.jpg', mtime=2000)]
+    first_scanner = DirectoryScannerService(get_config().APPROVED_IMAGE_DIR, manifest_file,
+        settle_seconds=0, use_inotify=False)
+    assert first_scanner.scan() == first_paths
+    first_scanner.commit()
+
+    # Scan the new image with a new scanner, without committing
+    new_path = create_image('image3.jpg', mtime=3000)
+    os.utime(get_config().APPROVED_IMAGE_DIR, (time.time() - 10, time.time() - 10))
+    scanner = DirectoryScannerService(get_config().APPROVED_IMAGE_DIR, manifest_file,
+        settle_seconds=0, use_inotify=False)
+    assert scanner.scan() == [new_path]
+    assert scanner.scan() == [new_path]
+
+    # Check that the committed, unchanged directory is not listed again
+    scanner.commit()
+    with patch('os.scandir') as mock_scandir:
+        assert scanner.scan() == []
+        mock_scandir.assert_not_called()
+
+    # Check that a migrated image is emitted again when it comes back
+    processed_path = shutil.move(first_paths[0], get_config().PROCESSED_IMAGE_DIR)
+    assert scanner.scan() == []
+    scanner.commit()
+    shutil.move(processed_path, get_config().APPROVED_IMAGE_DIR)
+    assert scanner.scan() == [first_paths[0]]
+
+
+def test_scan_waits_for_settling_files_and_wakes_up_on_changes():
+    """
+    GIVEN a directory scanner that waits 60 seconds for the files to settle
+    WHEN an image is just added, and another one is added while waiting for a change
+    THEN the fresh images should not be emitted
+        AND the wait should return as soon as the directory changes
+    """
+    scanner = DirectoryScannerService(get_config().APPROVED_IMAGE_DIR, settle_seconds=60)
+    create_image('image1.jpg')
+    assert scanner.scan() == []
+
+    # Add an image while waiting for a change
+    timer = threading.Timer(0.1, create_image, args=('image2.jpg',))
+    timer.start()
+    start_time = time.monotonic()
+    assert scanner.wait(timeout=5, poll_interval=0.05)
+    assert 0.05 < time.monotonic() - start_time < 5
+    timer.join()
+    assert scanner.scan() == []
+    scanner.close()
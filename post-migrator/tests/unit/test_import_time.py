@@ -0,0 +1,33 @@
+import os
+import re
+import subprocess
+import sys
+
+# The maximum cumulative import time of the application's entry point in microseconds
+IMPORT_TIME_BUDGET_US = 2_000_000
+
+
+def test_import_is_side_effect_free_and_within_budget(tmp_path):
+    """
+    GIVEN an empty working directory
+    WHEN the application's entry point is imported with import time profiling
+    THEN no files or directories should be created
+        AND the cumulative import time should be within the budget
+    """
+    # Import the entry point in a fresh interpreter, from an empty working directory
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app.__main__'],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=os.getcwd(), PYTHONDONTWRITEBYTECODE='1'),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # Check that importing did not touch the filesystem
+    assert not os.listdir(tmp_path)
+
+    # Check the cumulative import time of the entry point
+    import_time_us = int(re.search(r'\|\s*(\d+)\s*\|\s*app\.__main__$',
+        completed.stderr, re.MULTILINE).group(1))
+    assert import_time_us < IMPORT_TIME_BUDGET_US
@@ -0,0 +1,80 @@
+import csv
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from app.__main__ import watch
+from app.config import get_config
+from app.models.image_meta import ImageMeta
+
+
+def test_watch_migrates_approved_images_until_idle(mock_asset_manager_service, make_image_meta):
+    """
+    GIVEN a watch with an idle timeout of 1 second, and mocked cloud clients
+    WHEN 2 images are approved together while watching
+    THEN they should be migrated together with the same clients
+        AND moved to the processed folder
+        AND the watch should stop after being idle
+    """
+    # Save the metadata of the images
+    image_metas: list[ImageMeta] = [make_image_meta(id=f"test_id_{i}") for i in range(2)]
+    with open(get_config().IMAGE_META_FILE, 'a', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for image_meta in image_metas:
+            writer.writerow(image_meta.to_list())
+
+    # Approve the images while watching
+    def approve_images():
+        for image_meta in image_metas:
+            image_path = os.path.join(get_config().APPROVED_IMAGE_DIR, image_meta.id + '.jpg')
+            Image.new('RGB', (10, 10)).save(image_path)
+            os.utime(image_path, (time.time() - 5, time.time() - 5))
+
+    # Use the service with the mocked clients, and the scanner of the watch
+    def get_asset_manager_service(directory_scanner):
+        mock_asset_manager_service.directory_scanner = directory_scanner
+        return mock_asset_manager_service
+
+    with patch('app.__main__.get_asset_manager_service', side_effect=get_asset_manager_service), \
+        patch.object(mock_asset_manager_service, 'upload_images',
+            wraps=mock_asset_manager_service.upload_images) as upload_images:
+        timer = threading.Timer(0.2, approve_images)
+        timer.start()
+        start_time = time.monotonic()
+        watch(idle_timeout=1, batch_window=0.1, rescan_interval=0.2)
+        timer.join()
+
+    # Check that the images were migrated in a single batch
+    upload_images.assert_called_once()
+    assert len(upload_images.call_args.args[0]) == 2
+    assert mock_asset_manager_service.storage_client.upload_file.call_count == 2
+    assert mock_asset_manager_service.database_client.insert_record.call_count == 2
+    assert sorted(os.listdir(get_config().PROCESSED_IMAGE_DIR)) == \
+        sorted(image_meta.id + '.jpg' for image_meta in image_metas)
+    assert os.listdir(get_config().APPROVED_IMAGE_DIR) == []
+
+    # Check that the watch stopped after being idle
+    assert 1 < time.monotonic() - start_time < 5
+
+
+def test_watch_stops_with_error_when_migration_keeps_failing():
+    """
+    GIVEN a watch with an idle timeout of 0.5 seconds
+        AND migrations that keep failing
+    WHEN the approved images are watched
+    THEN the failed migrations should be retried
+        AND the watch should stop with the error after failing for the idle timeout
+    """
+    with patch('app.__main__.get_asset_manager_service'), \
+        patch('app.__main__.migrate', side_effect=ConnectionError("IP address not allowed")) as migrate:
+        start_time = time.monotonic()
+        with pytest.raises(ConnectionError):
+            watch(idle_timeout=0.5, batch_window=0.1, rescan_interval=0.2, retry_interval=0.1)
+
+    # Check that the watch retried before stopping
+    assert migrate.call_count > 1
+    assert 0.5 <= time.monotonic() - start_time < 5
@@ -1,11 +1,23 @@
 import argparse
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
 from app.config import init_config, get_config
-from app.config.log_config import logger
+from app.config.log_config import log_context, logger
+from app.models.cached_quote_generator_client import CachedQuoteGeneratorClient
+from app.models.image_job import ImageJob
 from app.models.image_meta import ImageMeta
-from app.models.quote_generator_client import OpenAiClient
+from app.models.local_llm_client import LocalLlmClient
+from app.models.quote_generator_client import OpenAiClient, QuoteGeneratorClient
+from app.models.rate_limiter import RateLimiter
+from app.models.review_server import ReviewServer
 from app.services.asset_manager_service import AssetManagerService
+from app.services.job_queue_service import JobQueueService
 from app.services.prompt_builder_service import PromptBuilderService
+from app.services.quote_dedup_service import QuoteDedupService
+from app.services.rerender_service import RerenderService
+from app.services.review_service import ReviewService
 from app.services.quote_generator_service import QuoteGeneratorService
 from app.services.image_generator_service import ImageGeneratorService
 
@@ -27,51 +39,346 @@ def parse_args():
         required=False,
         default=1
     )
+    parser.add_argument(
+        '--rerender',
+        action='store_true',
+        help='Render the images of the existing assets again from their metadata, without the LLM.',
+        required=False
+    )
+    parser.add_argument(
+        '--repair',
+        action='store_true',
+        help='Remove the metadata rows of the unfinished jobs without images, the images without '
+            'metadata and the temporary files left by interrupted runs.',
+        required=False
+    )
+    parser.add_argument(
+        '--remove_missing',
+        action='store_true',
+        help='Also let the repair remove the metadata rows of every missing image, including the '
+            'processed and deleted ones, instead of only the rows of the unfinished jobs.',
+        required=False
+    )
+    parser.add_argument(
+        '--dry_run',
+        action='store_true',
+        help='Only report what the repair would remove.',
+        required=False
+    )
+    parser.add_argument(
+        '--export',
+        action='store_true',
+        help='Export the metadata of the images to a Parquet file for analytics.',
+        required=False
+    )
+    parser.add_argument(
+        '--analyze',
+        action='store_true',
+        help='Report the approval rates of the reviewed images, and weight the prompt extras by them.',
+        required=False
+    )
+    parser.add_argument(
+        '--review',
+        action='store_true',
+        help='Serve the review page of the generated images on a local port.',
+        required=False
+    )
+    parser.add_argument(
+        '--asset_ids',
+        nargs='+',
+        help='The ids of the assets to render again. Default is every asset.',
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='The number of processes that render the images again, or threads that generate '
+            'the thumbnails of the review. Default is the number of CPUs.',
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        help='The local port of the review page. Default is 8000.',
+        required=False,
+        default=8000
+    )
 
     return parser.parse_args()
 
 
+def get_quote_generator_client() -> QuoteGeneratorClient:
+    """
+    Create the client of the configured LLM backend, wrapped with the cache if it is enabled.
+    """
+    if get_config().LLM_BACKEND == 'local':
+        quote_generator_client = LocalLlmClient(
+            base_url=get_config().LOCAL_LLM_BASE_URL,
+            model=get_config().LOCAL_LLM_MODEL,
+            batch_size=get_config().LOCAL_LLM_BATCH_SIZE,
+            stream=get_config().OPENAI_STREAM
+        )
+    elif get_config().LLM_BACKEND == 'openai':
+        quote_generator_client = OpenAiClient(
+            api_key=get_config().OPENAI_API_KEY,
+            model=get_config().OPENAI_MODEL,
+            rate_limiter=RateLimiter(requests_per_minute=get_config().OPENAI_REQUESTS_PER_MINUTE),
+            max_retries=get_config().OPENAI_MAX_RETRIES,
+            stream=get_config().OPENAI_STREAM
+        )
+    else:
+        raise ValueError("Invalid LLM backend specified. Use 'openai' or 'local'.")
+
+    if get_config().LLM_CACHE_MODE in ('on', 'replay'):
+        quote_generator_client = CachedQuoteGeneratorClient(
+            client=quote_generator_client,
+            cache_dir=get_config().LLM_CACHE_DIR,
+            max_bytes=get_config().LLM_CACHE_MAX_MB * 1024 * 1024,
+            replay=get_config().LLM_CACHE_MODE == 'replay'
+        )
+
+    return quote_generator_client
+
+
+def get_replay_jobs(prompt_builder_service: PromptBuilderService,
+    quote_generator_client: CachedQuoteGeneratorClient,
+    image_num: int) -> list[ImageJob]:
+    """
+    Create the jobs of a replayed run from the latest recorded images whose outputs are cached.
+    Their prompts are built again from their recorded prompt extras, so the sampler is not drawn from.
+    """
+    jobs, prompts = [], set()
+    for recorded_meta in reversed(AssetManagerService.get_image_metas()):
+        if len(jobs) == image_num:
+            break
+        if recorded_meta.prompt_version != prompt_builder_service.prompt_version \
+            or not recorded_meta.prompt_extras:
+            continue
+
+        # The cache holds one output per prompt, so a prompt is only replayed once
+        prompt = prompt_builder_service.get_prompt(recorded_meta.prompt_extras)
+        if prompt in prompts or not quote_generator_client.has_output(prompt):
+            continue
+
+        prompts.add(prompt)
+        jobs.append(ImageJob(
+            image_meta=ImageMeta(
+                llm_model=quote_generator_client.model,
+                prompt_version=prompt_builder_service.prompt_version,
+                prompt_extras=recorded_meta.prompt_extras
+            ),
+            prompt=prompt
+        ))
+
+    if len(jobs) < image_num:
+        logger.warning("Only %s of %s images can be replayed from the cached outputs.", len(jobs), image_num)
+
+    return jobs[::-1]
+
+
+def get_image_jobs(job_queue_service: JobQueueService,
+    prompt_builder_service: PromptBuilderService,
+    quote_generator_client: QuoteGeneratorClient,
+    image_num: int,
+    batch_size: int = 1):
+    """
+    Yield the jobs of the images to complete: the incomplete jobs of the interrupted runs first,
+    then new jobs, up to the given number of images. The outputs of every batch of prompts
+    are prefetched from the LLM client.
+
+    A replayed run only reproduces recorded images, and leaves the incomplete jobs to the next regular run.
+    """
+    if get_config().LLM_CACHE_MODE == 'replay':
+        jobs = get_replay_jobs(prompt_builder_service, quote_generator_client, image_num)
+        job_queue_service.add_jobs(jobs)
+    else:
+        jobs = job_queue_service.get_incomplete_jobs(limit=image_num)
+        if jobs:
+            logger.info("Resuming %s incomplete jobs of previous runs.", len(jobs))
+
+        new_jobs = []
+        for _ in range(image_num - len(jobs)):
+            prompt, prompt_extras = prompt_builder_service.get_prompt_variation()
+            new_jobs.append(ImageJob(
+                image_meta=ImageMeta(
+                    llm_model=quote_generator_client.model,
+                    prompt_version=prompt_builder_service.prompt_version,
+                    prompt_extras=prompt_extras
+                ),
+                prompt=prompt
+            ))
+        job_queue_service.add_jobs(new_jobs)
+        jobs += new_jobs
+
+    for batch_start in range(0, len(jobs), batch_size):
+        batch = jobs[batch_start:batch_start + batch_size]
+        quote_generator_client.prefetch([job.prompt for job in batch if job.status == ImageJob.PROMPTED])
+        yield from batch
+
+
 def main(image_num: int = 1):
     logger.info("Generating %s images with quotes...", image_num)
 
     # Initialize services
     asset_manager_service = AssetManagerService
-    prompt_builder_service = PromptBuilderService()
+    job_queue_service = JobQueueService(get_config().JOB_QUEUE_FILE,
+        max_attempts=get_config().JOB_MAX_ATTEMPTS)
+    prompt_builder_service = PromptBuilderService(
+        state_file=get_config().PROMPT_SAMPLER_STATE_FILE,
+        weights_file=get_config().PROMPT_WEIGHTS_FILE
+    )
+    quote_generator_client = get_quote_generator_client()
+
+    # Replayed runs reproduce the quotes of previous runs, so they are not deduplicated
+    quote_dedup_service = None
+    if get_config().LLM_CACHE_MODE != 'replay':
+        quote_dedup_service = QuoteDedupService(index_file=get_config().QUOTE_INDEX_FILE)
+        quote_dedup_service.load(get_config().IMAGE_META_FILE)
+
     quote_generator_service = QuoteGeneratorService(
-        client=OpenAiClient(
-            api_key=get_config().OPENAI_API_KEY,
-            model=get_config().OPENAI_MODEL
-        )
+        client=quote_generator_client,
+        quote_dedup_service=quote_dedup_service
     )
     image_generator = ImageGeneratorService()
 
-    for _ in range(image_num):
-        # Create meta information holder for the image
-        image_meta = ImageMeta(
-            llm_model=quote_generator_service.client.model,
-            prompt_version=prompt_builder_service.prompt_version
-        )
+    def render_image(quote: str):
+        image_generator.set_random_color_and_font_scheme()
+        return image_generator.create_image_with_quote(quote), image_generator.get_meta()
 
-        # Generate quote and caption with an LLM
-        prompt, prompt_extras = prompt_builder_service.get_prompt_variation()
-        quote, caption = quote_generator_service.get_quote_and_caption(prompt)
+    # The metadata of the rendered images is saved in batches, and the jobs are completed with it.
+    # The quotes are only indexed once saved, so the quotes of the failed jobs can be generated again.
+    rendered_jobs = {}
 
-        # Generate image with the quote
-        image_generator.set_random_color_and_font_scheme()
-        generated_image = image_generator.create_image_with_quote(quote)
-
-        # Update the metadata
-        image_meta.update(
-            quote=quote,
-            caption=caption,
-            prompt_extras=prompt_extras,
-            img_meta=image_generator.get_meta()
-        )
+    def index_quotes(image_metas: list[ImageMeta]):
+        for image_meta in image_metas if quote_dedup_service is not None else []:
+            quote_dedup_service.add(image_meta.quote)
+
+    def complete_rendered_jobs(image_metas: list[ImageMeta]):
+        job_queue_service.update_jobs([rendered_jobs.pop(image_meta.id) for image_meta in image_metas],
+            ImageJob.SAVED)
+        index_quotes(image_metas)
+
+    # Streamed quotes are rendered in the background while their captions are generated
+    with ThreadPoolExecutor(max_workers=1) as render_executor, closing(job_queue_service), \
+        asset_manager_service.open_image_meta_writer(on_flush=complete_rendered_jobs) as image_meta_writer:
+        # The prompts are sent in batches to the backends that batch their requests
+        batch_size = get_config().LOCAL_LLM_BATCH_SIZE if get_config().LLM_BACKEND == 'local' else 1
+
+        # Every step of a job is committed, so an interrupted job is resumed from its last step,
+        # and the writer saves the metadata of the rendered images when it is closed
+        for job in get_image_jobs(job_queue_service, prompt_builder_service,
+            quote_generator_client, image_num, batch_size):
+            image_meta = job.image_meta
+            resumed_status = job.status
+            generated_image, img_meta = None, None
+
+            with log_context(asset_id=image_meta.id):
+                try:
+                    if job.status == ImageJob.PROMPTED:
+                        # Generate quote and caption with an LLM
+                        if not get_config().OPENAI_STREAM:
+                            quote, caption = quote_generator_service.get_quote_and_caption(job.prompt)
+                        else:
+                            renders, context = {}, contextvars.copy_context()
+                            quote, caption = quote_generator_service.get_quote_and_caption(job.prompt,
+                                on_quote=lambda quote: renders.update(
+                                    {quote: render_executor.submit(context.run, render_image, quote)}))
+                            generated_image, img_meta = renders[quote].result()
+
+                        image_meta.update(
+                            quote=quote,
+                            caption=caption,
+                            llm_model=quote_generator_service.client.model
+                        )
+                        job_queue_service.update_job(job, ImageJob.GENERATED)
+
+                    if job.status == ImageJob.GENERATED:
+                        # Generate image with the quote, unless it was rendered while streaming
+                        if generated_image is None:
+                            generated_image, img_meta = render_image(image_meta.quote)
+
+                        image_meta.update(img_meta=img_meta)
+                        asset_manager_service.save_image(generated_image, image_meta.id)
+                        job_queue_service.update_job(job, ImageJob.RENDERED)
+
+                    if job.status == ImageJob.RENDERED:
+                        # A resumed job may have been interrupted after its metadata was saved
+                        if resumed_status == ImageJob.RENDERED \
+                            and asset_manager_service.has_image_meta(image_meta.id):
+                            job_queue_service.update_job(job, ImageJob.SAVED)
+                            index_quotes([image_meta])
+                        else:
+                            rendered_jobs[image_meta.id] = job
+                            image_meta_writer.write(image_meta)
+
+                    logger.info("Asset with id '%s' generated successfully.", image_meta.id)
+                except Exception:
+                    # A job that keeps failing is skipped by the next runs, so it doesn't block them,
+                    # and this run continues with the next job once it is marked as failed
+                    if not job_queue_service.record_failure(job):
+                        raise
+
+
+def rerender(asset_ids: list[str] = None,
+    workers: int = None):
+    logger.info("Rendering the images of the existing assets again...")
+
+    RerenderService(workers=workers).rerender(asset_ids)
+
+
+def repair(remove_missing: bool = False,
+    dry_run: bool = False):
+    logger.info("Repairing the generated assets...")
+
+    # The images of the incomplete jobs are kept, as their metadata is saved when they are resumed,
+    # while the metadata rows of the unfinished jobs without images are orphans
+    job_queue_service = JobQueueService(get_config().JOB_QUEUE_FILE)
+    with closing(job_queue_service):
+        incomplete_jobs = job_queue_service.get_incomplete_jobs()
+        failed_jobs = job_queue_service.get_jobs(ImageJob.FAILED)
+
+    AssetManagerService.repair_assets(
+        keep_ids={job.image_meta.id for job in incomplete_jobs},
+        unfinished_ids={job.image_meta.id for job in incomplete_jobs + failed_jobs},
+        remove_missing=remove_missing,
+        dry_run=dry_run
+    )
+
+
+def export():
+    logger.info("Exporting the image metadata...")
+
+    # The export is imported on demand, so the other commands don't load pyarrow
+    from app.services.meta_export_service import MetaExportService
+
+    MetaExportService().export()
+
+
+def analyze():
+    logger.info("Analysing the approval rates of the reviewed images...")
+
+    # The analytics are imported on demand, so the other commands don't load pyarrow
+    from app.services.approval_analytics_service import ApprovalAnalyticsService
+
+    ApprovalAnalyticsService().analyze()
+
+
+def review(port: int = 8000,
+    workers: int = None):
+    logger.info("Serving the review of the generated images...")
 
-        # Save the image and its metadata
-        asset_manager_service.save_image_meta(image_meta)
-        asset_manager_service.save_image(generated_image, image_meta.id)
-        logger.info("Asset with id '%s' generated successfully.", image_meta.id)
+    review_service = ReviewService(workers=workers)
+    server = ReviewServer(review_service, port=port)
+    logger.info("Review the images at %s", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        review_service.close()
 
 
 if __name__ == '__main__':
@@ -80,4 +387,15 @@ if __name__ == '__main__':
     # Initialize the project configuration
     init_config(env='prod')
 
-    main(args.image_num)
+    if args.rerender:
+        rerender(args.asset_ids, args.workers)
+    elif args.repair:
+        repair(args.remove_missing, args.dry_run)
+    elif args.export:
+        export()
+    elif args.analyze:
+        analyze()
+    elif args.review:
+        review(args.port, args.workers)
+    else:
+        main(args.image_num)
@@ -3,12 +3,16 @@ import csv
 
 from dotenv import load_dotenv
 
+from app.config.log_config import setup_logger
 from app.models.image_meta import ImageMeta
 
 
 class Config:
     """
     Configuration class for the application.
+
+    Only the paths are resolved on initialization. The directories and files
+    for storing the generated images are created by the first writer that needs them.
     """
     def __init__(self):
         # Load the environment variables from the .env file
@@ -17,9 +21,18 @@ class Config:
         self.set_asset_paths()
         self.set_export_root()
         self.set_export_paths()
-        # Create the directories and files for storing the generated images
-        self.create_asset_directories()
-        self.create_image_meta_file()
+        self._asset_storage_created = False
+
+
+    def ensure_asset_storage(self):
+        """
+        Create the directories and files for storing the generated images,
+        if they were not created yet by this run.
+        """
+        if not self._asset_storage_created:
+            self.create_asset_directories()
+            self.create_image_meta_file()
+            self._asset_storage_created = True
 
 
     def set_env_variables(self):
@@ -27,8 +40,30 @@ class Config:
         Set the environment variables for the application.
         """
         load_dotenv(os.path.join('app', 'config', '.env'))
-        self.OPENAI_API_KEY = os.environ['OPENAI_API_KEY']
-        self.OPENAI_MODEL = os.environ['OPENAI_MODEL']
+        # LLM backend: openai, or local for an OpenAI-compatible server (e.g. llama.cpp, vLLM)
+        self.LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+        self.LOCAL_LLM_BASE_URL = os.environ.get('LOCAL_LLM_BASE_URL', 'http://localhost:8080/v1')
+        self.LOCAL_LLM_MODEL = os.environ.get('LOCAL_LLM_MODEL', 'local')
+        self.LOCAL_LLM_BATCH_SIZE = int(os.environ.get('LOCAL_LLM_BATCH_SIZE', '8'))
+        # The API key and the model are only required by OpenAI's backend
+        self.OPENAI_API_KEY = os.environ['OPENAI_API_KEY'] if self.LLM_BACKEND == 'openai' \
+            else os.environ.get('OPENAI_API_KEY')
+        self.OPENAI_MODEL = os.environ['OPENAI_MODEL'] if self.LLM_BACKEND == 'openai' \
+            else os.environ.get('OPENAI_MODEL')
+        # Request rate of the account's tier, and retries of the transient errors
+        self.OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get('OPENAI_REQUESTS_PER_MINUTE', '500'))
+        self.OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', '5'))
+        # Stream the completions, so the quotes are rendered while the captions are generated
+        self.OPENAI_STREAM = os.environ.get('OPENAI_STREAM', 'false').lower() == 'true'
+        # Optional on-disk cache of the LLM outputs: off, on or replay
+        self.LLM_CACHE_MODE = os.environ.get('LLM_CACHE_MODE', 'off')
+        self.LLM_CACHE_MAX_MB = int(os.environ.get('LLM_CACHE_MAX_MB', '100'))
+        # Number of images whose metadata rows are appended together
+        self.IMAGE_META_BATCH_SIZE = int(os.environ.get('IMAGE_META_BATCH_SIZE', '16'))
+        # Maximum time in seconds the metadata row of a saved image waits for its batch
+        self.IMAGE_META_FLUSH_SECONDS = float(os.environ.get('IMAGE_META_FLUSH_SECONDS', '5'))
+        # Number of failed attempts after which a job of the producer is not resumed anymore
+        self.JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
 
 
     def set_asset_paths(self):
@@ -64,6 +99,14 @@ class Config:
         self.REJECTED_IMAGE_DIR = os.path.join(self.GENERATED_ASSETS_DIR, 'rejected_images')
         self.PROCESSED_IMAGE_DIR = os.path.join(self.GENERATED_ASSETS_DIR, 'processed_images')
         self.IMAGE_META_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'images_meta.csv')
+        self.QUOTE_INDEX_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'quote_index.bin')
+        self.PROMPT_SAMPLER_STATE_FILE = os.path.join(self.GENERATED_ASSETS_DIR,
+            'prompt_sampler_state.json')
+        self.LLM_CACHE_DIR = os.path.join(self.GENERATED_ASSETS_DIR, 'llm_cache')
+        self.JOB_QUEUE_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'producer_jobs.db')
+        self.IMAGE_META_EXPORT_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'images_meta.parquet')
+        self.PROMPT_WEIGHTS_FILE = os.path.join(self.GENERATED_ASSETS_DIR, 'prompt_weights.json')
+        self.THUMBNAIL_DIR = os.path.join(self.GENERATED_ASSETS_DIR, 'thumbnails')
 
 
     def create_asset_directories(self):
@@ -112,6 +155,7 @@ config = None
 
 def init_config(env='test'):
     global config
+    setup_logger()
     if env == 'test':
         config = TestConfig()
     elif env == 'prod':
@@ -20,3 +20,17 @@ class LlmOutputParsingException(Exception):
         ):
         super().__init__(message)
         self.llm_model = llm_model
+
+
+class DuplicateQuoteException(Exception):
+    """
+    Exception raised when the LLM model keeps generating quotes that were already generated.
+    """
+    def __init__(self,
+        llm_model: str,
+        attempts: int,
+        message: str = "Failed to generate a new quote with the LLM model."
+        ):
+        super().__init__(message)
+        self.llm_model = llm_model
+        self.attempts = attempts
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+from typing import Tuple
+
+from app.config.log_config import logger
+from app.models.quote_generator_client import QuoteGeneratorClient
+from app.exceptions.quote_generator_exceptions import LlmOutputGenerationException
+
+
+class CachedQuoteGeneratorClient(QuoteGeneratorClient):
+    """
+    Client class that caches the outputs of another quote generator client on disk.
+
+    The outputs are stored in a content-addressed store, keyed by the hash of the model,
+    the prompt and the temperature. When the size of the store exceeds its limit,
+    the least recently used outputs are evicted.
+
+    A prompt that is requested again by the same client is regenerated and its cached output
+    is replaced, as the repeated request means that the previous output was rejected
+    (e.g. as a duplicate quote). In replay mode the cached output is served every time.
+
+    Attributes:
+        - client: The wrapped quote generator client.
+        - cache_dir: The directory of the cached outputs.
+        - max_bytes: The maximum size of the cached outputs in bytes.
+        - replay: Whether only cached outputs are served, without calling the wrapped client.
+    """
+    def __init__(self, client: QuoteGeneratorClient,
+        cache_dir: str,
+        max_bytes: int = 100 * 1024 * 1024,
+        replay: bool = False):
+        self.client = client
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self._cache_bytes = None
+        self._served_keys: set[str] = set()
+
+
+    @property
+    def model(self) -> str:
+        return self.client.model
+
+
+    def generate_quote_and_caption(self, prompt: str) -> Tuple[str, str]:
+        """
+        Generate a quote with a relevant caption based on the given prompt,
+        served from the cache if it was generated before.
+
+        Args:
+            - prompt: The prompt to generate the quote and caption.
+        """
+        return self.parse_output(self.generate_output(prompt))
+
+
+    def generate_output(self, prompt: str) -> dict:
+        """
+        Get the cached output for the given prompt, or generate and cache it with the wrapped client.
+
+        Args:
+            - prompt: The prompt to generate the output.
+        """
+        cache_key = self._get_cache_key(prompt)
+        cache_file = os.path.join(self.cache_dir, cache_key + '.json')
+
+        if self.replay or cache_key not in self._served_keys:
+            self._served_keys.add(cache_key)
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    output = json.load(f)['output']
+                # Mark the output as recently used
+                os.utime(cache_file)
+                logger.info("Output of %s served from the cache.", self.model)
+                return output
+            except FileNotFoundError:
+                if self.replay:
+                    raise LlmOutputGenerationException(llm_model=self.model,
+                        message="No cached output found for the prompt in replay mode.")
+
+        output = self.client.generate_output(prompt)
+        self._store(cache_file, output)
+
+        return output
+
+
+    def prefetch(self, prompts: list[str]) -> None:
+        """
+        Prefetch the outputs of the given prompts that are not cached with the wrapped client.
+
+        Args:
+            - prompts: The prompts that will be sent next.
+        """
+        if self.replay:
+            return
+
+        self.client.prefetch([prompt for prompt in prompts if not self.has_output(prompt)])
+
+
+    def has_output(self, prompt: str) -> bool:
+        """
+        Check whether the output of the given prompt is cached.
+
+        Args:
+            - prompt: The prompt of the output.
+        """
+        return os.path.exists(os.path.join(self.cache_dir, self._get_cache_key(prompt) + '.json'))
+
+
+    def parse_output(self, output: dict) -> Tuple[str, str]:
+        """
+        Parse the output with the wrapped client.
+
+        Args:
+            - output: The generated output.
+        """
+        return self.client.parse_output(output)
+
+
+    def _get_cache_key(self, prompt: str) -> str:
+        """
+        Get the content address of the output for the given prompt.
+        """
+        key = json.dumps([self.model, prompt, getattr(self.client, 'temperature', None)])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+    def _store(self, cache_file: str,
+        output: dict) -> None:
+        """
+        Store an output in the cache, and evict the least recently used outputs
+        if the cache exceeds its size limit.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if self._cache_bytes is None:
+            self._cache_bytes = sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                if entry.name.endswith('.json'))
+
+        # Write the output atomically, so an interrupted run never leaves a corrupt entry
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"model": self.model, "output": output}, f)
+        if os.path.exists(cache_file):
+            self._cache_bytes -= os.path.getsize(cache_file)
+        os.replace(temp_file, cache_file)
+        self._cache_bytes += os.path.getsize(cache_file)
+
+        if self._cache_bytes > self.max_bytes:
+            self._evict()
+
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used outputs until the cache fits its size limit.
+        """
+        entries = sorted((entry for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith('.json')), key=lambda entry: entry.stat().st_mtime_ns)
+
+        for entry in entries:
+            if self._cache_bytes <= self.max_bytes:
+                break
+            self._cache_bytes -= entry.stat().st_size
+            os.remove(entry.path)
+            logger.info("Cached output '%s' evicted.", entry.name)
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+from app.models.image_meta import ImageMeta
+
+
+@dataclass
+class ImageJob:
+    """
+    This class holds the progress of generating an image in the producer's job queue.
+
+    The statuses of a job follow each other in the order of the generation:
+        - prompted: The prompt was built.
+        - generated: The quote and caption were generated by the LLM.
+        - rendered: The image was rendered and saved.
+        - saved: The metadata of the image was saved, so the job is complete.
+    A job that keeps failing is marked as failed instead, and it is not resumed anymore.
+
+    Attributes:
+        - image_meta: The metadata of the image, filled in as the job progresses.
+        - prompt: The prompt of the quote and caption.
+        - status: The status of the job.
+        - attempts: The number of failed attempts of completing the job.
+    """
+    PROMPTED = 'prompted'
+    GENERATED = 'generated'
+    RENDERED = 'rendered'
+    SAVED = 'saved'
+    FAILED = 'failed'
+
+    image_meta: ImageMeta
+    prompt: str
+    status: str = PROMPTED
+    attempts: int = 0
@@ -1,3 +1,4 @@
+import json
 import uuid
 from dataclasses import dataclass, field, fields
 
@@ -36,6 +37,37 @@ class ImageMeta:
         return [field.name for field in fields(ImageMeta)]
 
 
+    def to_row(self) -> list[str]:
+        """
+        Get the values of the fields as a row of the CSV file, in the order of the fields.
+        """
+        return [
+            self.id,
+            self.quote,
+            self.caption,
+            self.llm_model,
+            self.prompt_version,
+            json.dumps(self.prompt_extras),
+            json.dumps(self.img_meta)
+        ]
+
+
+    @staticmethod
+    def from_row(row: dict) -> 'ImageMeta':
+        """
+        Create an ImageMeta instance from a row of the CSV file, keyed by the field names.
+        """
+        return ImageMeta(
+            id=row['id'],
+            quote=row['quote'],
+            caption=row['caption'],
+            llm_model=row['llm_model'],
+            prompt_version=row['prompt_version'],
+            prompt_extras=json.loads(row['prompt_extras'] or 'null'),
+            img_meta=json.loads(row['img_meta'] or 'null')
+        )
+
+
     def update(self, **kwargs):
         """
         Update the given attributes of the ImageMeta instance.
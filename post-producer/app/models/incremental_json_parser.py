@@ -0,0 +1,118 @@
+import json
+from typing import Tuple
+
+
+class IncrementalJsonParser:
+    """
+    Parser of a JSON object with string fields that is received in chunks, e.g. from a streamed
+    completion. Every field is emitted as soon as its value is complete, and the output is
+    rejected as soon as it goes off the schema, without waiting for the rest of it.
+
+    Attributes:
+        - fields: The names of the expected string fields.
+    """
+    # Parser states, named after the next expected token
+    OBJECT_START = 'object_start'
+    KEY = 'key'
+    KEY_STRING = 'key_string'
+    COLON = 'colon'
+    VALUE = 'value'
+    VALUE_STRING = 'value_string'
+    SEPARATOR = 'separator'
+    END = 'end'
+
+    WHITESPACE = ' \t\n\r'
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        self.values: dict[str, str] = {}
+        self._state = self.OBJECT_START
+        self._buffer: list[str] = []
+        self._escaped = False
+        self._key = None
+
+
+    def feed(self, chunk: str) -> list[Tuple[str, str]]:
+        """
+        Parse the next chunk of the output.
+
+        Args:
+            - chunk: The next chunk of the output.
+
+        Returns:
+            The fields that were completed by the chunk, as (name, value) pairs.
+
+        Raises:
+            ValueError: If the output is not a JSON object of the expected string fields.
+        """
+        completed_fields = []
+
+        for char in chunk:
+            if self._state in (self.KEY_STRING, self.VALUE_STRING):
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    completed_fields.extend(self._close_string())
+                    continue
+                self._buffer.append(char)
+            elif char in self.WHITESPACE:
+                continue
+            elif self._state == self.OBJECT_START and char == '{':
+                self._state = self.KEY
+            elif self._state == self.KEY and char == '"':
+                self._state = self.KEY_STRING
+            elif self._state == self.KEY and char == '}' and not self.values:
+                self._state = self.END
+            elif self._state == self.COLON and char == ':':
+                self._state = self.VALUE
+            elif self._state == self.VALUE and char == '"':
+                self._state = self.VALUE_STRING
+            elif self._state == self.SEPARATOR and char == ',':
+                self._state = self.KEY
+            elif self._state == self.SEPARATOR and char == '}':
+                self._state = self.END
+            else:
+                raise ValueError(f"Unexpected character {char!r} in state '{self._state}'.")
+
+        return completed_fields
+
+
+    def close(self) -> dict[str, str]:
+        """
+        Check that the complete output was received, with every expected field.
+
+        Returns:
+            The values of the fields.
+
+        Raises:
+            ValueError: If the output is incomplete or a field is missing.
+        """
+        if self._state != self.END:
+            raise ValueError("The output ended before the JSON object was closed.")
+
+        missing_fields = [field for field in self.fields if field not in self.values]
+        if missing_fields:
+            raise ValueError(f"The output is missing the fields {missing_fields}.")
+
+        return self.values
+
+
+    def _close_string(self) -> list[Tuple[str, str]]:
+        """
+        Decode the closed string, and either check it as a key or complete its field.
+        """
+        string = json.loads('"' + ''.join(self._buffer) + '"')
+        self._buffer.clear()
+
+        if self._state == self.KEY_STRING:
+            if string not in self.fields or string in self.values:
+                raise ValueError(f"Unexpected field '{string}'.")
+            self._key = string
+            self._state = self.COLON
+            return []
+
+        self.values[self._key] = string
+        self._state = self.SEPARATOR
+        return [(self._key, string)]
@@ -0,0 +1,93 @@
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, Tuple
+
+from app.models.quote_generator_client import OpenAiClient, QuoteGeneratorClient
+
+
+class LocalLlmClient(OpenAiClient):
+    """
+    Client class responsible for interacting with a local OpenAI-compatible server,
+    e.g. llama.cpp's server or vLLM, which needs no API key, spend or network access.
+
+    These servers batch the concurrent requests (continuous batching), so the prompts
+    are batched by prefetching: the outputs of the next prompts are requested concurrently,
+    and served when their prompts are sent.
+
+    Attributes:
+        - batch_size: The maximum number of concurrent requests.
+    """
+    def __init__(self, base_url: str = 'http://localhost:8080/v1',
+        model: str = 'local',
+        temperature: float = None,
+        batch_size: int = 8,
+        max_retries: int = 2,
+        stream: bool = False):
+        super().__init__(
+            api_key='local',
+            model=model,
+            temperature=temperature,
+            max_retries=max_retries,
+            stream=stream,
+            base_url=base_url
+        )
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=batch_size,
+            thread_name_prefix='local-llm')
+        self._prefetched: dict[str, deque[Future]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+
+    def prefetch(self, prompts: list[str]) -> None:
+        """
+        Request the outputs of the given prompts concurrently, so the server can batch them.
+
+        Args:
+            - prompts: The prompts that will be sent next.
+        """
+        for prompt in prompts:
+            future = self._executor.submit(super().generate_output, prompt)
+            with self._lock:
+                self._prefetched[prompt].append(future)
+
+
+    def generate_output(self, prompt: str) -> dict:
+        """
+        Get the prefetched output for the given prompt, or generate it.
+
+        Args:
+            - prompt: The prompt to generate the output.
+        """
+        future = self._pop_prefetched(prompt)
+        if future is not None:
+            return future.result()
+
+        return super().generate_output(prompt)
+
+
+    def stream_quote_and_caption(self, prompt: str) -> Iterator[Tuple[str, str]]:
+        """
+        Generate a quote with a relevant caption, streamed unless the output was prefetched.
+
+        Args:
+            - prompt: The prompt to generate the quote and caption.
+        """
+        with self._lock:
+            is_prefetched = bool(self._prefetched.get(prompt))
+
+        if is_prefetched:
+            return QuoteGeneratorClient.stream_quote_and_caption(self, prompt)
+        return super().stream_quote_and_caption(prompt)
+
+
+    def _pop_prefetched(self, prompt: str) -> Future:
+        with self._lock:
+            futures = self._prefetched.get(prompt)
+            if not futures:
+                return None
+
+            future = futures.popleft()
+            if not futures:
+                del self._prefetched[prompt]
+            return future
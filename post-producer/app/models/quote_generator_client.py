@@ -1,10 +1,16 @@
 import json
-from typing import Tuple
+import random
+import time
+from contextlib import nullcontext
+from typing import Iterator, Tuple
 from abc import ABC, abstractmethod
 
-from openai import OpenAI
+from openai import OpenAI, OpenAIError, APIConnectionError, APIStatusError, RateLimitError
 
 from app.config import get_config
+from app.config.log_config import logger
+from app.models.incremental_json_parser import IncrementalJsonParser
+from app.models.rate_limiter import RateLimiter
 from app.exceptions.quote_generator_exceptions import (
     LlmOutputGenerationException,
     LlmOutputParsingException
@@ -37,6 +43,43 @@ class QuoteGeneratorClient(ABC):
         pass
 
 
+    @abstractmethod
+    def parse_output(self, output: dict) -> Tuple[str, str]:
+        """
+        Parse the generated output to extract the quote and caption.
+
+        Args:
+            - output: The generated output.
+        """
+        pass
+
+
+    def stream_quote_and_caption(self, prompt: str) -> Iterator[Tuple[str, str]]:
+        """
+        Generate a quote with a relevant caption based on the given prompt, and yield
+        the 'quote' and 'caption' fields as (name, value) pairs as soon as each is complete.
+
+        By default, the fields are yielded once the whole output is generated.
+
+        Args:
+            - prompt: The prompt to generate the quote and caption.
+        """
+        quote, caption = self.generate_quote_and_caption(prompt)
+        yield 'quote', quote
+        yield 'caption', caption
+
+
+    def prefetch(self, prompts: list[str]) -> None:
+        """
+        Start generating the outputs of the given prompts ahead of their use, so a backend
+        that batches the requests can generate them together. By default, nothing is prefetched.
+
+        Args:
+            - prompts: The prompts that will be sent next.
+        """
+        pass
+
+
 class OpenAiClient(QuoteGeneratorClient):
     """
     Client class responsible for interacting with OpenAI's GPT-4 API.
@@ -44,11 +87,32 @@ class OpenAiClient(QuoteGeneratorClient):
     Attributes:
         - client: The OpenAI client instance.
         - model: The LLM model to use for generating the output.
+        - temperature: The sampling temperature, or None to use the model's default.
+        - rate_limiter: The rate limiter shared by the calls, or None to send them unlimited.
+        - max_retries: The number of retries of a call that failed with a transient error.
+        - max_backoff: The maximum delay between two attempts in seconds.
+        - stream: Whether the completions are streamed and parsed incrementally.
+        - base_url: The URL of an OpenAI-compatible API, or None to use OpenAI's API.
     """
+    # Base delay of the exponential backoff in seconds
+    BASE_BACKOFF = 0.5
+
     def __init__(self, api_key: str = None,
-        model: str = None):
+        model: str = None,
+        temperature: float = None,
+        rate_limiter: RateLimiter = None,
+        max_retries: int = 5,
+        max_backoff: float = 60.0,
+        stream: bool = False,
+        base_url: str = None):
         self.model = model
-        self.client = OpenAI(api_key=api_key)
+        self.temperature = temperature
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.stream = stream
+        # The retries are handled by the client, so they respect the shared rate limiter
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
 
 
     def generate_quote_and_caption(self, prompt: str) -> Tuple[str, str]:
@@ -74,23 +138,153 @@ class OpenAiClient(QuoteGeneratorClient):
         """
         Generate a an output for the given prompt using the GPT model.
 
+        In streaming mode, an output that goes off the expected schema is rejected
+        as soon as it is detected, before the rest of it is generated.
+
         Args:
             - prompt: The prompt to generate the output.
         """
+        if self.stream:
+            return ''.join(content for content, _ in self._stream_output(prompt))
+
+        completion = self._create_completion(prompt)
+        # Retrieve the generated answer from the completion
+        return completion.choices[0].message.content
+
+
+    def stream_quote_and_caption(self, prompt: str) -> Iterator[Tuple[str, str]]:
+        """
+        Generate a quote with a relevant caption using GPT-4, and yield the 'quote'
+        and 'caption' fields as soon as each is complete in the streamed completion.
+        Closing the generator stops the generation.
+
+        Args:
+            - prompt: The prompt to generate the quote and caption.
+        """
+        if not self.stream:
+            yield from super().stream_quote_and_caption(prompt)
+            return
+
+        for _, completed_fields in self._stream_output(prompt):
+            yield from completed_fields
+
+
+    def _stream_output(self, prompt: str) -> Iterator[Tuple[str, list[Tuple[str, str]]]]:
+        """
+        Stream the completion for the given prompt, and parse it incrementally.
+
+        Yields:
+            The content of every chunk, with the fields that were completed by it.
+        """
+        parser = IncrementalJsonParser(fields=('quote', 'caption'))
+        stream = self._create_completion(prompt, stream=True)
+
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                response_format={ "type": "json_object" },
-                messages=[{
-                        "role": "user",
-                        "content": prompt
-                    }],
-            )
-
-            # Retrieve the generated answer from the completion
-            return completion.choices[0].message.content
-        except Exception as e:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content or ''
+                yield content, parser.feed(content)
+            parser.close()
+        except ValueError as e:
+            raise LlmOutputParsingException(llm_model=self.model) from e
+        except OpenAIError as e:
             raise LlmOutputGenerationException(llm_model=self.model) from e
+        finally:
+            # Stop the generation of an abandoned or rejected output
+            stream.response.close()
+
+
+    def _create_completion(self, prompt: str,
+        stream: bool = False):
+        """
+        Request a completion for the given prompt.
+
+        The calls are limited by the shared rate limiter, and the calls that failed
+        with a transient error (e.g. rate limiting, timeout, server error) are retried
+        with an exponential backoff with full jitter. A streamed completion is only
+        retried until its response is received.
+
+        Args:
+            - prompt: The prompt to generate the completion.
+            - stream: Whether the completion is streamed.
+        """
+        # Only send the temperature and the streaming if they were configured
+        options = {} if self.temperature is None else {"temperature": self.temperature}
+        if stream:
+            options["stream"] = True
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.rate_limiter.limit() if self.rate_limiter else nullcontext():
+                    response = self.client.chat.completions.with_raw_response.create(
+                        model=self.model,
+                        response_format={ "type": "json_object" },
+                        messages=[{
+                                "role": "user",
+                                "content": prompt
+                            }],
+                        **options
+                    )
+                if self.rate_limiter:
+                    self.rate_limiter.update(response.headers)
+
+                return response.parse()
+            except Exception as e:
+                if attempt == self.max_retries or not self.is_transient_error(e):
+                    raise LlmOutputGenerationException(llm_model=self.model) from e
+
+                retry_after = self.get_retry_after(e)
+                if isinstance(e, RateLimitError) and self.rate_limiter:
+                    self.rate_limiter.throttle(retry_after)
+
+                delay = max(retry_after or 0,
+                    random.uniform(0, min(self.max_backoff, self.BASE_BACKOFF * 2 ** attempt)))
+                logger.warning("%s call failed with a transient error (attempt %s of %s), "
+                    "retrying in %.2fs: %s", self.model, attempt + 1, self.max_retries + 1, delay, e)
+                time.sleep(delay)
+
+
+    @staticmethod
+    def is_transient_error(error: Exception) -> bool:
+        """
+        Check whether the call that raised the error may succeed when it is retried.
+
+        Args:
+            - error: The error raised by the call.
+        """
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIStatusError):
+            # An exhausted quota is reported as rate limiting, but it is not recovered by waiting
+            if getattr(error, 'code', None) == 'insufficient_quota':
+                return False
+            return error.status_code in (408, 409, 429) or error.status_code >= 500
+        return False
+
+
+    @staticmethod
+    def get_retry_after(error: Exception) -> float:
+        """
+        Get the delay requested by the API before the call is retried, if there is any.
+
+        Args:
+            - error: The error raised by the call.
+        """
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+
+        try:
+            if 'retry-after-ms' in response.headers:
+                return float(response.headers['retry-after-ms']) / 1000
+            if 'retry-after' in response.headers:
+                return float(response.headers['retry-after'])
+        except ValueError:
+            # The date format of the header is not used by the API
+            pass
+
+        return None
 
 
     def parse_output(self, output: dict) -> Tuple[str, str]:
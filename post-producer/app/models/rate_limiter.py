@@ -0,0 +1,144 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Mapping
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter, shared by every call of an API client.
+
+    The bucket is refilled at the configured request rate, and it is corrected by the
+    `x-ratelimit-*` headers of the responses, so the calls pause when the remaining requests
+    or tokens of the account run out. The number of concurrent calls is adapted by
+    additive increase and multiplicative decrease: it is halved when a call is throttled,
+    and it grows back by one slot per window of successful calls.
+
+    Attributes:
+        - rate: The number of requests that are allowed per second.
+        - capacity: The maximum number of requests that can be sent in a burst.
+        - max_concurrency: The maximum number of concurrent calls.
+        - concurrency: The current limit of concurrent calls.
+    """
+    def __init__(self, requests_per_minute: int = 500,
+        max_concurrency: int = 8):
+        self.rate = requests_per_minute / 60
+        self.capacity = max(1, requests_per_minute // 60)
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+
+    @contextmanager
+    def limit(self):
+        """
+        Wait for a free slot and a token in the bucket before giving control to the call.
+        A call that raises an exception is not counted as successful.
+        """
+        self.acquire()
+        try:
+            yield
+        except Exception:
+            self.release(success=False)
+            raise
+        else:
+            self.release(success=True)
+
+
+    def acquire(self) -> None:
+        """
+        Wait until a call is allowed by the bucket, the pause and the concurrency limit.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait = self._paused_until - now
+                if wait <= 0 and self._in_flight < int(self.concurrency):
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self._in_flight += 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+
+                # Without a deadline, the wait ends when a running call releases its slot
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+
+    def release(self, success: bool = True) -> None:
+        """
+        Release the slot of a finished call.
+
+        Args:
+            - success: Whether the call succeeded, which grows the concurrency limit.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if success:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._condition.notify_all()
+
+
+    def throttle(self, retry_after: float = None) -> None:
+        """
+        Halve the concurrency limit after a throttled call, and pause the calls
+        for the duration requested by the API.
+
+        Args:
+            - retry_after: The number of seconds to wait before the next call.
+        """
+        with self._condition:
+            self.concurrency = max(1.0, self.concurrency / 2)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._pause(retry_after)
+            self._condition.notify_all()
+
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Correct the bucket with the rate limit headers of a response.
+
+        Args:
+            - headers: The headers of the response.
+        """
+        with self._condition:
+            for resource in ('requests', 'tokens'):
+                remaining = headers.get(f'x-ratelimit-remaining-{resource}')
+                if remaining is None:
+                    continue
+
+                remaining = int(remaining)
+                if resource == 'requests':
+                    self._tokens = min(self._tokens, remaining)
+                if remaining <= 0:
+                    self._pause(self.parse_duration(headers.get(f'x-ratelimit-reset-{resource}')))
+            self._condition.notify_all()
+
+
+    @staticmethod
+    def parse_duration(duration: str) -> float:
+        """
+        Parse a duration of the rate limit headers (e.g. '20ms', '1s', '6m0s') into seconds.
+
+        Args:
+            - duration: The duration to parse.
+        """
+        units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+        return sum(float(value) * units[unit]
+            for value, unit in re.findall(r'(\d+(?:\.\d+)?)(ms|s|m|h)', duration or ''))
+
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+    def _pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,252 @@
+import json
+import os
+import re
+import secrets
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from app.config import get_config
+from app.config.log_config import logger
+from app.services.review_service import ReviewService
+
+# The ids of the assets are UUIDs, anything else could escape the image directories
+ASSET_ID_PATTERN = re.compile(r'[0-9a-zA-Z_-]+')
+
+REVIEW_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>UUPS Review</title>
+<style>
+    body { margin: 0; font-family: sans-serif; background: #222; color: #eee; text-align: center; }
+    #image { max-width: 90vw; max-height: 70vh; margin-top: 2vh; }
+    #quote { font-size: 1.3em; margin: 1em auto 0.3em; max-width: 60em; }
+    #caption { color: #aaa; max-width: 60em; margin: auto; }
+    #status { color: #888; margin-top: 1em; }
+    kbd { border: 1px solid #666; border-radius: 3px; padding: 0 4px; }
+</style>
+</head>
+<body>
+<img id="image" alt="">
+<div id="quote"></div>
+<div id="caption"></div>
+<div id="status"></div>
+<div id="keys">
+    <kbd>A</kbd>/<kbd>&rarr;</kbd> approve &nbsp; <kbd>R</kbd>/<kbd>&larr;</kbd> reject &nbsp;
+    <kbd>S</kbd> skip &nbsp; <kbd>U</kbd> undo &nbsp; <kbd>F</kbd> full size
+</div>
+<script>
+const PREFETCH = %(prefetch)d;
+const TOKEN = '%(token)s';
+let assets = [], position = 0, history = [], fullSize = false;
+const prefetched = {};
+
+function imageUrl(asset) {
+    return (fullSize ? '/images/' : '/thumbnails/') + asset.id + '.jpg';
+}
+
+function show() {
+    const status = document.getElementById('status');
+    if (position >= assets.length) {
+        document.getElementById('image').removeAttribute('src');
+        document.getElementById('quote').textContent = 'Nothing left to review.';
+        document.getElementById('caption').textContent = '';
+        status.textContent = history.length + ' reviewed';
+        return;
+    }
+    const asset = assets[position];
+    document.getElementById('image').src = imageUrl(asset);
+    document.getElementById('quote').textContent = asset.quote || '';
+    document.getElementById('caption').textContent = asset.caption || '';
+    status.textContent = (position + 1) + ' / ' + assets.length + ' \\u00b7 ' + history.length + ' reviewed';
+
+    // Load the thumbnails of the next images while the current one is reviewed
+    for (const next of assets.slice(position + 1, position + 1 + PREFETCH)) {
+        if (!prefetched[next.id]) {
+            prefetched[next.id] = new Image();
+            prefetched[next.id].src = '/thumbnails/' + next.id + '.jpg';
+        }
+    }
+}
+
+// The decisions are sent in order, so an undo never overtakes the decision it reverts
+let requests = Promise.resolve();
+
+function post(path, body) {
+    requests = requests.then(() => fetch(path, {method: 'POST', headers: {'X-Review-Token': TOKEN}, body: JSON.stringify(body)})).then(response => {
+        if (!response.ok) {
+            document.getElementById('status').textContent = 'Failed: ' + path + ' ' + body.id;
+        }
+    });
+}
+
+function decide(decision) {
+    if (position >= assets.length) return;
+    const asset = assets[position];
+    history.push({asset: asset, position: position, decision: decision});
+    if (decision !== 'skip') post('/api/review', {id: asset.id, decision: decision});
+    position += 1;
+    show();
+}
+
+function undo() {
+    const last = history.pop();
+    if (!last) return;
+    if (last.decision !== 'skip') post('/api/undo', {id: last.asset.id});
+    position = last.position;
+    show();
+}
+
+document.addEventListener('keydown', event => {
+    const actions = {
+        'a': () => decide('approve'), 'ArrowRight': () => decide('approve'),
+        'r': () => decide('reject'), 'ArrowLeft': () => decide('reject'),
+        's': () => decide('skip'), 'u': undo,
+        'f': () => { fullSize = !fullSize; show(); }
+    };
+    if (actions[event.key]) {
+        event.preventDefault();
+        actions[event.key]();
+    }
+});
+
+fetch('/api/pending').then(response => response.json()).then(pending => {
+    assets = pending;
+    show();
+});
+</script>
+</body>
+</html>
+"""
+
+
+class ReviewServer(ThreadingHTTPServer):
+    """
+    Local web server of the manual review, which shows the generated images one by one
+    with their quotes and captions, and approves or rejects them with keyboard shortcuts.
+
+    The page loads the thumbnails of the next images ahead, while the review service
+    generates the missing thumbnails of every pending image in the background.
+
+    The reviews are only accepted with the token embedded in the served page, and the requests
+    of other hosts and origins are refused, so other pages open in the browser can't review the images.
+
+    Attributes:
+        - review_service: The service that serves the thumbnails and moves the reviewed images.
+        - prefetch: The number of next thumbnails that the page loads ahead.
+        - token: The secret of this session, sent by the page with every review.
+    """
+    def __init__(self, review_service: ReviewService,
+        host: str = '127.0.0.1',
+        port: int = 8000,
+        prefetch: int = 8):
+        super().__init__((host, port), _ReviewRequestHandler)
+        self.daemon_threads = True
+        self.review_service = review_service
+        self.prefetch = prefetch
+        self.token = secrets.token_urlsafe()
+
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+
+    @property
+    def hosts(self) -> set[str]:
+        """
+        The values of the Host header that address this server, refusing e.g. a DNS rebinding.
+        """
+        host, port = self.server_address[:2]
+        return {f'{host}:{port}', f'localhost:{port}'}
+
+
+class _ReviewRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the review page, its images and its API.
+    """
+    server: ReviewServer
+
+    def do_GET(self):
+        if self.headers.get('Host') not in self.server.hosts:
+            self.send_error(403)
+        elif self.path == '/':
+            self._send(200, 'text/html; charset=utf-8', (REVIEW_PAGE % {
+                'prefetch': self.server.prefetch,
+                'token': self.server.token
+            }).encode('utf-8'))
+        elif self.path == '/api/pending':
+            pending_assets = self.server.review_service.get_pending_assets()
+            self.server.review_service.prefetch_thumbnails([asset['id'] for asset in pending_assets])
+            self._send_json(200, pending_assets)
+        elif self.path.startswith('/thumbnails/'):
+            asset_id = self._get_asset_id(self.path[len('/thumbnails/'):])
+            self._send_file(self.server.review_service.get_thumbnail(asset_id) if asset_id else None)
+        elif self.path.startswith('/images/'):
+            asset_id = self._get_asset_id(self.path[len('/images/'):])
+            self._send_file(os.path.join(get_config().BASE_IMAGE_DIR, asset_id + '.jpg') if asset_id else None)
+        else:
+            self.send_error(404)
+
+
+    def do_POST(self):
+        # The browsers send the origin of the page with every cross-origin POST
+        origin = self.headers.get('Origin')
+        if self.headers.get('Host') not in self.server.hosts \
+            or (origin is not None and origin.removeprefix('http://') not in self.server.hosts) \
+            or not secrets.compare_digest(self.headers.get('X-Review-Token', ''), self.server.token):
+            self.send_error(403)
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or '{}')
+        asset_id = request.get('id')
+        if not isinstance(asset_id, str) or not ASSET_ID_PATTERN.fullmatch(asset_id):
+            self.send_error(400)
+            return
+
+        if self.path == '/api/review' and request.get('decision') in (ReviewService.APPROVE, ReviewService.REJECT):
+            moved = self.server.review_service.review(asset_id, request['decision'])
+        elif self.path == '/api/undo':
+            moved = self.server.review_service.undo(asset_id)
+        else:
+            self.send_error(400)
+            return
+
+        self._send_json(200 if moved else 409, {'id': asset_id, 'moved': moved})
+
+
+    def log_message(self, format, *args):
+        logger.debug("Review server: " + format, *args)
+
+
+    @staticmethod
+    def _get_asset_id(file_name: str) -> Optional[str]:
+        asset_id = file_name[:-len('.jpg')] if file_name.endswith('.jpg') else None
+        return asset_id if asset_id and ASSET_ID_PATTERN.fullmatch(asset_id) else None
+
+
+    def _send_file(self, path: Optional[str]) -> None:
+        try:
+            with open(path or '', 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.send_error(404)
+            return
+
+        self._send(200, 'image/jpeg', data)
+
+
+    def _send_json(self, status: int,
+        body) -> None:
+        self._send(status, 'application/json', json.dumps(body).encode('utf-8'))
+
+
+    def _send(self, status: int,
+        content_type: str,
+        data: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
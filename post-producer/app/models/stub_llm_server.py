@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.config.log_config import logger
+
+
+class StubLlmServer(ThreadingHTTPServer):
+    """
+    OpenAI-compatible chat completions server of a tiny deterministic stub model,
+    which stands in for a local LLM server in CI runs and benchmarks.
+
+    The quote and caption are derived from the hash of the prompt and the number of times
+    it was sent before, so a run is reproducible, and a regenerated prompt gets a new quote.
+
+    Attributes:
+        - latency: The time to generate a completion in seconds.
+    """
+    ADJECTIVES = ['quiet', 'restless', 'golden', 'borrowed', 'patient', 'hollow', 'tender', 'stubborn',
+        'fleeting', 'crooked', 'gentle', 'wild', 'silver', 'forgotten', 'honest', 'distant']
+    NOUNS = ['rivers', 'lanterns', 'mornings', 'promises', 'shadows', 'gardens', 'letters', 'storms',
+        'bridges', 'whispers', 'harbors', 'echoes', 'candles', 'footsteps', 'mirrors', 'seasons']
+    VERBS = ['remember', 'outlast', 'forgive', 'carry', 'unravel', 'borrow', 'outrun', 'gather',
+        'mend', 'chase', 'soften', 'measure', 'awaken', 'outgrow', 'shelter', 'follow']
+
+    def __init__(self, host: str = '127.0.0.1',
+        port: int = 8080,
+        latency: float = 0.0):
+        super().__init__((host, port), _StubLlmRequestHandler)
+        self.daemon_threads = True
+        self.latency = latency
+        self._prompt_counts = Counter()
+        self._lock = threading.Lock()
+
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate the JSON output of the stub model for the given prompt.
+
+        Args:
+            - prompt: The prompt of the completion.
+        """
+        with self._lock:
+            count = self._prompt_counts[prompt]
+            self._prompt_counts[prompt] += 1
+
+        digest = hashlib.sha256(f'{count}:{prompt}'.encode('utf-8')).digest()
+        words = [self.ADJECTIVES[digest[0] % 16], self.NOUNS[digest[1] % 16], self.VERBS[digest[2] % 16],
+            self.ADJECTIVES[digest[3] % 16], self.NOUNS[digest[4] % 16]]
+        quote = f"{words[0].capitalize()} {words[1]} {words[2]} the {words[3]} {words[4]}."
+        caption = f"Stubbed wisdom #{words[1]} #{words[4]}"
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        return json.dumps({"quote": quote, "caption": caption})
+
+
+class _StubLlmRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the chat completions endpoint, with and without streaming.
+    """
+    server: StubLlmServer
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        prompt = request['messages'][-1]['content']
+        content = self.server.generate(prompt)
+        completion_id = 'stub-' + hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+
+        if request.get('stream'):
+            self._send_stream(request, completion_id, content)
+        else:
+            self._send_json({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get('model'),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                # The words stand in for the tokens
+                "usage": {
+                    "prompt_tokens": len(prompt.split()),
+                    "completion_tokens": len(content.split()),
+                    "total_tokens": len(prompt.split()) + len(content.split())
+                }
+            })
+
+
+    def log_message(self, format, *args):
+        logger.debug("Stub LLM server: " + format, *args)
+
+
+    def _send_json(self, body: dict) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+    def _send_stream(self, request: dict,
+        completion_id: str,
+        content: str) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        # Stream the content in chunks of a few characters, like tokens
+        for start in range(0, len(content), 4):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get('model'),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": content[start:start + 4]},
+                    "finish_reason": None
+                }]
+            }
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.close_connection = True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='''
+        Serves a deterministic stub model through an OpenAI-compatible API.
+        ''')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency_ms', type=float, default=0,
+        help='The time to generate a completion in milliseconds. Default is 0.')
+    args = parser.parse_args()
+
+    server = StubLlmServer(args.host, args.port, args.latency_ms / 1000)
+    print(f"Stub LLM server listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,159 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.config import get_config
+from app.config.log_config import logger
+from app.services.meta_export_service import MetaExportService
+
+
+class ApprovalAnalyticsService:
+    """
+    Service class that analyses the approval rates of the reviewed images by their prompt extras
+    and render settings, and derives the sampling weights of the prompt builder from them.
+
+    The metadata is read from its columnar export, which already joins every image with the
+    review directory it is in, and the rates are aggregated with Arrow's vectorized group-by.
+    An image approved before it was migrated counts as approved, the pending images are left out.
+
+    The approval rates of the values are smoothed towards the overall rate, so a value that
+    was reviewed only a few times doesn't get an extreme weight.
+
+    Attributes:
+        - prior_strength: The number of reviews that the overall approval rate counts as for every value.
+    """
+    PROMPT_DIMENSIONS = ['emotion', 'poetry_topic', 'writing_style', 'artistical_tool', 'max_words']
+    RENDER_DIMENSIONS = ['quote_font', 'image_background', 'llm_model', 'prompt_version']
+    APPROVED_STATUSES = [MetaExportService.APPROVED, MetaExportService.PROCESSED]
+    REVIEWED_STATUSES = APPROVED_STATUSES + [MetaExportService.REJECTED]
+
+    def __init__(self, prior_strength: float = 10.0):
+        self.prior_strength = prior_strength
+
+
+    def analyze(self, weights_file: str = None) -> dict[str, dict[str, float]]:
+        """
+        Export the metadata, log the approval rates of every dimension, and save the sampling weights
+        of the prompt extras for the prompt builder.
+
+        Args:
+            - weights_file: The path of the sampling weights. Defaults to the configured weights file.
+
+        Returns:
+            The sampling weights by prompt extra and value.
+        """
+        MetaExportService().export()
+        table = self.load()
+        if table.num_rows == 0:
+            logger.info("No reviewed images found to analyse.")
+            return {}
+
+        logger.info("Overall approval rate: %.1f%% of %s reviewed images.",
+            100 * self._get_overall_rate(table), table.num_rows)
+        for dimension in self.PROMPT_DIMENSIONS + self.RENDER_DIMENSIONS:
+            for rate in self.get_approval_rates(table, dimension):
+                logger.info("Approval rate of %s '%s': %.1f%% of %s reviewed images.",
+                    dimension, rate['value'], 100 * rate['approval_rate'], rate['reviewed'])
+
+        weights = self.get_sampling_weights(table)
+        self.save_weights(weights, weights_file or get_config().PROMPT_WEIGHTS_FILE)
+
+        return weights
+
+
+    def load(self, export_file: str = None) -> pa.Table:
+        """
+        Load the reviewed images from the metadata export, with their approval as a boolean column.
+
+        Args:
+            - export_file: The path of the Parquet file. Defaults to the configured export file.
+        """
+        table = MetaExportService.read(
+            filters=[('review_status', 'in', self.REVIEWED_STATUSES)],
+            columns=self.PROMPT_DIMENSIONS + self.RENDER_DIMENSIONS + ['review_status'],
+            export_file=export_file
+        )
+        approved = pc.is_in(table.column('review_status').cast(pa.string()),
+            value_set=pa.array(self.APPROVED_STATUSES))
+
+        return table.append_column('approved', approved)
+
+
+    def get_approval_rates(self, table: pa.Table,
+        dimension: str) -> list[dict]:
+        """
+        Get the approval rates of the values of a dimension, from the highest to the lowest.
+
+        Args:
+            - table: The reviewed images, as loaded by the service.
+            - dimension: The name of the column to group the images by.
+
+        Returns:
+            The value as a string, the number of reviewed and approved images, the approval rate
+            and its smoothed estimate of every value.
+        """
+        overall_rate = self._get_overall_rate(table)
+        grouped = pa.table({
+            'value': table.column(dimension).cast(pa.string()),
+            'approved': table.column('approved').cast(pa.int64())
+        }).group_by('value').aggregate([('approved', 'sum'), ('approved', 'count')])
+
+        rates = []
+        for value, approved, reviewed in zip(grouped.column('value').to_pylist(),
+            grouped.column('approved_sum').to_pylist(), grouped.column('approved_count').to_pylist()):
+            rates.append({
+                'value': value,
+                'reviewed': reviewed,
+                'approved': approved,
+                'approval_rate': approved / reviewed,
+                'smoothed_rate': (approved + self.prior_strength * overall_rate) \
+                    / (reviewed + self.prior_strength)
+            })
+
+        return sorted(rates, key=lambda rate: rate['smoothed_rate'], reverse=True)
+
+
+    def get_sampling_weights(self, table: pa.Table) -> dict[str, dict[str, float]]:
+        """
+        Get the sampling weights of the prompt extras' values: their smoothed approval rates
+        relative to the overall approval rate.
+
+        Args:
+            - table: The reviewed images, as loaded by the service.
+        """
+        overall_rate = self._get_overall_rate(table)
+        if overall_rate == 0:
+            return {}
+
+        return {dimension: {rate['value']: round(rate['smoothed_rate'] / overall_rate, 4)
+            for rate in self.get_approval_rates(table, dimension) if rate['value'] is not None}
+            for dimension in self.PROMPT_DIMENSIONS}
+
+
+    @staticmethod
+    def save_weights(weights: dict[str, dict[str, float]],
+        weights_file: str) -> None:
+        """
+        Save the sampling weights by replacing the weights file atomically.
+
+        Args:
+            - weights: The sampling weights by prompt extra and value.
+            - weights_file: The path of the sampling weights.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(weights_file)), exist_ok=True)
+        temp_file = weights_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(weights, f, indent=2)
+        os.replace(temp_file, weights_file)
+
+        logger.info("Sampling weights of the prompt extras saved to %s.", weights_file)
+
+
+    @staticmethod
+    def _get_overall_rate(table: pa.Table) -> float:
+        if table.num_rows == 0:
+            return 0.0
+
+        return pc.sum(table.column('approved').cast(pa.int64())).as_py() / table.num_rows
@@ -1,30 +1,51 @@
 import os
 import csv
-import json
+from typing import Callable, Optional
 
 from PIL import Image
 
 from app.config import get_config
 from app.config.log_config import logger
+from app.config.metrics_config import metrics
 from app.models.image_meta import ImageMeta
+from app.services.image_meta_writer import ImageMetaWriter
 
 
 class AssetManagerService:
     """
     Service class responsible for managing the lifecycle of images and their metadata.
+
+    An image is written to a temporary file, synced to disk and renamed, so it either exists
+    completely or not at all. Its metadata row is only appended after the image exists,
+    so the metadata file never refers to a missing image.
     """
     @staticmethod
+    @metrics.timed('save_image')
     def save_image(generated_image: Image.Image,
-        asset_id: str) -> None:
+        asset_id: str,
+        image_dir: str = None) -> None:
         """
-        Saves the generated image under the configured directory.
+        Saves the generated image atomically under the configured directory.
 
         Args:
             - generated_image: The image to save.
             - asset_id: The name of the image when saved.
+            - image_dir: The directory to save the image in. Defaults to the base image directory.
         """
         try:
-            generated_image.save(os.path.join(get_config().BASE_IMAGE_DIR, asset_id + '.jpg'))
+            get_config().ensure_asset_storage()
+            image_dir = image_dir or get_config().BASE_IMAGE_DIR
+            image_path = os.path.join(image_dir, asset_id + '.jpg')
+            # The temporary file is hidden, so it is not picked up as an image before it is complete
+            temp_path = os.path.join(image_dir, '.' + asset_id + '.jpg.tmp')
+
+            with open(temp_path, 'wb') as f:
+                generated_image.save(f, format='JPEG')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, image_path)
+            AssetManagerService._fsync_directory(image_dir)
+
             logger.info("Image with name %s saved.", asset_id+'.jpg')
         except Exception as e:
             logger.error("Failed to save image for asset with id '%s'", asset_id, exc_info=True)
@@ -39,20 +60,233 @@ class AssetManagerService:
         Args:
             - image_meta: The metadata of the generated image
         """
+        AssetManagerService.save_image_metas([image_meta])
+
+
+    @staticmethod
+    def save_image_metas(image_metas: list[ImageMeta]) -> None:
+        """
+        Save the metadata of the generated images with a single append to the metadata file,
+        which is synced to disk before returning.
+
+        Args:
+            - image_metas: The metadata of the generated images, whose images were already saved.
+        """
+        if not image_metas:
+            return
+
         try:
+            get_config().ensure_asset_storage()
             with open(get_config().IMAGE_META_FILE, mode='a', encoding='utf-8') as f:
                 writer = csv.writer(f, delimiter=',')
-                writer.writerow([
-                    image_meta.id,
-                    image_meta.quote,
-                    image_meta.caption,
-                    image_meta.llm_model,
-                    image_meta.prompt_version,
-                    json.dumps(image_meta.prompt_extras),
-                    json.dumps(image_meta.img_meta)
-                ])
-
-            logger.info("Image metadata saved.")
+                writer.writerows(image_meta.to_row() for image_meta in image_metas)
+                f.flush()
+                os.fsync(f.fileno())
+
+            logger.info("Metadata of %s images saved.", len(image_metas))
         except Exception as e:
             logger.error("Failed to save asset metadata.", exc_info=True)
             raise e
+
+
+    @staticmethod
+    def open_image_meta_writer(on_flush: Callable[[list[ImageMeta]], None] = None) -> ImageMetaWriter:
+        """
+        Open a buffered writer of the metadata file for a run, which flushes the rows
+        in batches of the configured size and interval.
+
+        Args:
+            - on_flush: Called with the metadata of the flushed rows, once they are synced to disk.
+        """
+        get_config().ensure_asset_storage()
+        return ImageMetaWriter(
+            get_config().IMAGE_META_FILE,
+            batch_size=get_config().IMAGE_META_BATCH_SIZE,
+            flush_interval=get_config().IMAGE_META_FLUSH_SECONDS,
+            on_flush=on_flush
+        )
+
+
+    @staticmethod
+    def move_image(asset_id: str,
+        source_dir: str,
+        target_dir: str) -> bool:
+        """
+        Move an image between the image directories with a rename, which is atomic on the same filesystem.
+
+        Args:
+            - asset_id: The id of the image.
+            - source_dir: The directory the image is in.
+            - target_dir: The directory to move the image to.
+
+        Returns:
+            Whether the image was moved, i.e. it was in the source directory.
+        """
+        os.makedirs(target_dir, exist_ok=True)
+        try:
+            os.replace(os.path.join(source_dir, asset_id + '.jpg'), os.path.join(target_dir, asset_id + '.jpg'))
+        except FileNotFoundError:
+            return False
+
+        AssetManagerService._fsync_directory(target_dir)
+        AssetManagerService._fsync_directory(source_dir)
+        logger.info("Image with name %s moved to %s.", asset_id + '.jpg', os.path.basename(target_dir))
+
+        return True
+
+
+    @staticmethod
+    def find_image_dir(asset_id: str) -> Optional[str]:
+        """
+        Find the image directory an image currently is in, i.e. its review or migration state.
+
+        Args:
+            - asset_id: The id of the image.
+
+        Returns:
+            The directory of the image, or None if it is not in any of the image directories.
+        """
+        for image_dir in AssetManagerService._image_dirs():
+            if os.path.exists(os.path.join(image_dir, asset_id + '.jpg')):
+                return image_dir
+
+        return None
+
+
+    @staticmethod
+    def has_image_meta(asset_id: str) -> bool:
+        """
+        Check whether the metadata of the asset was already saved.
+
+        Args:
+            - asset_id: The id of the asset.
+        """
+        if not os.path.exists(get_config().IMAGE_META_FILE):
+            return False
+
+        with open(get_config().IMAGE_META_FILE, mode='r', encoding='utf-8') as f:
+            return any(row and row[0] == asset_id for row in csv.reader(f))
+
+
+    @staticmethod
+    def get_image_metas() -> list[ImageMeta]:
+        """
+        Get the metadata of the generated images, in the order they were saved.
+        """
+        if not os.path.exists(get_config().IMAGE_META_FILE):
+            return []
+
+        with open(get_config().IMAGE_META_FILE, mode='r', encoding='utf-8', newline='') as f:
+            return [ImageMeta.from_row(row) for row in csv.DictReader(f)]
+
+
+    @staticmethod
+    def repair_assets(keep_ids: set[str] = frozenset(),
+        unfinished_ids: set[str] = frozenset(),
+        remove_missing: bool = False,
+        dry_run: bool = False) -> dict:
+        """
+        Clean up the inconsistencies left by interrupted runs:
+            - the temporary files of the images that were not completely written,
+            - the metadata rows of the unfinished jobs whose images were never saved,
+            - the generated images without metadata rows.
+
+        The other metadata rows whose images do not exist in any of the image directories are only
+        reported, as the processed images may be deleted and the rejected images may be deleted
+        by the reviewer, while their metadata is still used to render them again and for the analytics.
+
+        Args:
+            - keep_ids: The ids of the assets whose metadata is yet to be saved
+                by an incomplete job, so their images are kept.
+            - unfinished_ids: The ids of the assets of the incomplete and failed jobs,
+                whose metadata rows are orphans if their images are missing.
+            - remove_missing: Whether every metadata row whose image is missing is removed,
+                e.g. the orphans of the runs before the job queue.
+            - dry_run: Whether the inconsistencies are only reported, without cleaning them up.
+
+        Returns:
+            The number of the removed temporary files, metadata rows and images,
+            and of the kept metadata rows whose images are missing.
+        """
+        config = get_config()
+        image_dirs = AssetManagerService._image_dirs()
+        image_ids = {entry.name[:-len('.jpg')] for image_dir in image_dirs if os.path.isdir(image_dir)
+            for entry in os.scandir(image_dir) if entry.name.endswith('.jpg')}
+
+        # Remove the temporary files of the interrupted image saves
+        temp_files = [entry.path for image_dir in image_dirs if os.path.isdir(image_dir)
+            for entry in os.scandir(image_dir) if entry.name.endswith('.tmp')]
+        for temp_file in temp_files if not dry_run else []:
+            os.remove(temp_file)
+
+        # Remove the metadata rows whose images were never saved
+        meta_ids, orphan_rows, missing_rows = set(), 0, 0
+        if os.path.exists(config.IMAGE_META_FILE):
+            temp_meta_file = config.IMAGE_META_FILE + '.tmp'
+            with open(config.IMAGE_META_FILE, mode='r', encoding='utf-8') as in_file, \
+                open(temp_meta_file, mode='w', encoding='utf-8') as out_file:
+                reader, writer = csv.reader(in_file), csv.writer(out_file, delimiter=',')
+                writer.writerow(next(reader, ImageMeta.get_field_names()))
+                for row in reader:
+                    asset_id = row[0] if row else None
+                    if asset_id not in image_ids:
+                        # Only the rows of the unfinished jobs are known to have never had an image
+                        if asset_id and not remove_missing and asset_id not in unfinished_ids:
+                            missing_rows += 1
+                        else:
+                            orphan_rows += 1
+                            continue
+
+                    meta_ids.add(asset_id)
+                    writer.writerow(row)
+                out_file.flush()
+                os.fsync(out_file.fileno())
+
+            if orphan_rows and not dry_run:
+                os.replace(temp_meta_file, config.IMAGE_META_FILE)
+            else:
+                os.remove(temp_meta_file)
+
+        # Remove the generated images without metadata, unless their jobs are still incomplete
+        orphan_images = [os.path.join(config.BASE_IMAGE_DIR, image_id + '.jpg')
+            for image_id in image_ids - meta_ids - set(keep_ids)
+            if os.path.exists(os.path.join(config.BASE_IMAGE_DIR, image_id + '.jpg'))]
+        for orphan_image in orphan_images if not dry_run else []:
+            os.remove(orphan_image)
+
+        result = {
+            'temp_files': len(temp_files),
+            'orphan_rows': orphan_rows,
+            'orphan_images': len(orphan_images),
+            'missing_images': missing_rows
+        }
+        logger.info("%s %s temporary files, %s metadata rows without images and %s images "
+            "without metadata.", "Found" if dry_run else "Removed", *list(result.values())[:3])
+        if missing_rows:
+            logger.info("Kept %s metadata rows of images that were processed or deleted since. "
+                "Use --remove_missing to remove them too.", missing_rows)
+
+        return result
+
+
+    @staticmethod
+    def _image_dirs() -> list[str]:
+        config = get_config()
+        return [config.BASE_IMAGE_DIR, config.APPROVED_IMAGE_DIR,
+            config.REJECTED_IMAGE_DIR, config.PROCESSED_IMAGE_DIR]
+
+
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        """
+        Sync the entries of the directory to disk, so a rename in it survives a crash.
+        """
+        # Directories cannot be opened for syncing on Windows
+        if os.name != 'posix':
+            return
+
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
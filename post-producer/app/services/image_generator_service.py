@@ -7,6 +7,7 @@ from PIL import Image, ImageDraw, ImageFont
 
 from app.config import get_config
 from app.config.log_config import logger
+from app.config.metrics_config import metrics
 from app.exceptions.image_generator_exceptions import TextDrawingException
 
 
@@ -54,17 +55,48 @@ class ImageGeneratorService:
         Currently, there are 3 fonts and 3 backgrounds to choose from.
         """
         # Randomly select a font and background
-        self.quote_font = random.choice(self.fonts)
-        self.image_background = random.choice(self.backgrounds)
+        self.load_color_and_font_scheme(
+            quote_font=random.choice(self.fonts),
+            image_background=random.choice(self.backgrounds)
+        )
+
+
+    def set_color_and_font_scheme_from_meta(self, img_meta: dict):
+        """
+        Sets the color and font scheme that is described by the metadata of a previously
+        generated image. A font or background that is no longer available is replaced
+        via random selection.
+
+        Args:
+            - img_meta: The metadata of the previously generated image.
+        """
+        fonts = {os.path.basename(font): font for font in self.fonts}
+        backgrounds = {os.path.basename(background): background for background in self.backgrounds}
 
-        # Load the font and background assets
+        self.load_color_and_font_scheme(
+            quote_font=fonts.get(img_meta.get('quote_font'), random.choice(self.fonts)),
+            image_background=backgrounds.get(img_meta.get('image_background'),
+                random.choice(self.backgrounds))
+        )
+
+
+    def load_color_and_font_scheme(self, quote_font: str,
+        image_background: str):
+        """
+        Loads the font and background assets of the color and font scheme.
+
+        Args:
+            - quote_font: The path of the font file.
+            - image_background: The path of the background image.
+        """
         self.quote_font = ImageFont.truetype(
-            font=self.quote_font,
+            font=quote_font,
             size=self.quote_font_size
         )
-        self.image_background = Image.open(self.image_background)
+        self.image_background = Image.open(image_background)
 
 
+    @metrics.timed('create_image_with_quote')
     def create_image_with_quote(self, quote: str) -> Image.Image:
         """
         Creates an image with the given quote, using the pre-configured font and background.
@@ -0,0 +1,132 @@
+import csv
+import io
+import os
+import threading
+import time
+from typing import Callable
+
+from app.config.log_config import logger
+from app.models.image_meta import ImageMeta
+
+
+class ImageMetaWriter:
+    """
+    Buffered writer of the images' metadata file, which stays open for the whole run.
+
+    The rows are formatted when they are written, and appended to the file with a single
+    write and sync when the buffer reaches its size, when it gets older than the flush interval,
+    and when the writer is closed. It is safe to use from concurrent threads, as the rows are
+    only appended under its lock.
+
+    Attributes:
+        - image_meta_file: The path of the CSV file that stores the images' metadata.
+        - batch_size: The number of buffered rows that triggers a flush.
+        - flush_interval: The maximum time a row is buffered in seconds, or None to only flush by size.
+        - on_flush: Called with the metadata of the flushed rows, once they are synced to disk.
+    """
+    def __init__(self, image_meta_file: str,
+        batch_size: int = 16,
+        flush_interval: float = 5.0,
+        on_flush: Callable[[list[ImageMeta]], None] = None):
+        self.image_meta_file = image_meta_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._file = open(image_meta_file, mode='a', encoding='utf-8')
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=',')
+        self._image_metas: list[ImageMeta] = []
+        self._buffered_at = None
+        self._lock = threading.RLock()
+        self._closed = threading.Event()
+
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically,
+                name='image-meta-flusher', daemon=True)
+            self._flusher.start()
+
+
+    def __enter__(self) -> 'ImageMetaWriter':
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def write(self, image_meta: ImageMeta) -> None:
+        """
+        Buffer the metadata row of an image, whose image was already saved.
+
+        Args:
+            - image_meta: The metadata of the image.
+        """
+        with self._lock:
+            if self._closed.is_set():
+                raise ValueError("The image metadata writer is closed.")
+
+            self._writer.writerow(image_meta.to_row())
+            self._image_metas.append(image_meta)
+            if self._buffered_at is None:
+                self._buffered_at = time.monotonic()
+
+            if len(self._image_metas) >= self.batch_size:
+                self.flush()
+
+
+    def flush(self) -> None:
+        """
+        Append the buffered rows to the metadata file, and sync it to disk.
+        """
+        with self._lock:
+            if not self._image_metas:
+                return
+
+            self._file.write(self._buffer.getvalue())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+            image_metas = self._image_metas
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            self._image_metas = []
+            self._buffered_at = None
+            logger.info("Metadata of %s images saved.", len(image_metas))
+
+            if self.on_flush:
+                self.on_flush(image_metas)
+
+
+    def close(self) -> None:
+        """
+        Flush the buffered rows, and close the metadata file.
+        """
+        if self._closed.is_set():
+            return
+
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._file.close()
+
+
+    def _flush_periodically(self) -> None:
+        """
+        Flush the buffered rows when they get older than the flush interval, until the writer is closed.
+        """
+        while not self._closed.wait(timeout=self.flush_interval / 2):
+            with self._lock:
+                if self._buffered_at is None \
+                    or time.monotonic() - self._buffered_at < self.flush_interval:
+                    continue
+                try:
+                    self.flush()
+                except Exception:
+                    # The rows stay buffered, and they are flushed again by the next attempt
+                    logger.error("Failed to save the buffered image metadata.", exc_info=True)
@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.config.log_config import logger
+from app.models.image_job import ImageJob
+from app.models.image_meta import ImageMeta
+
+
+class JobQueueService:
+    """
+    Service class of the producer's durable job queue, stored in an SQLite database.
+
+    Every image is a job that is committed after each of its steps, so an interrupted run
+    can be resumed from the last completed step of its jobs, without calling the LLM again
+    for the quotes that were already generated. The connection is shared by the threads
+    of a run, which use it in turn under the service's lock.
+
+    The failed attempts of a job are counted, and a job that fails too many times is marked as failed,
+    so a job that can never be completed doesn't block the next runs.
+
+    Attributes:
+        - db_file: The path of the SQLite database.
+        - max_attempts: The number of failed attempts after which a job is marked as failed.
+    """
+    def __init__(self, db_file: str,
+        max_attempts: int = 3) -> None:
+        self.db_file = db_file
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+
+        self._connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            # The write-ahead log makes the commit of a step a single sequential write
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS image_jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT UNIQUE NOT NULL,
+                    status TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    quote TEXT,
+                    caption TEXT,
+                    llm_model TEXT,
+                    prompt_version TEXT,
+                    prompt_extras TEXT,
+                    img_meta TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # The queues created before the attempts were counted get the column
+            columns = [row['name'] for row in self._connection.execute("PRAGMA table_info(image_jobs)")]
+            if 'attempts' not in columns:
+                self._connection.execute(
+                    "ALTER TABLE image_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS image_jobs_status ON image_jobs (status)")
+
+
+    def add_jobs(self, jobs: list[ImageJob]) -> None:
+        """
+        Add new jobs to the queue in a single transaction.
+
+        Args:
+            - jobs: The jobs to add.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany("""
+                INSERT INTO image_jobs (id, status, prompt, quote, caption, llm_model,
+                    prompt_version, prompt_extras, img_meta, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [self._to_row(job) for job in jobs])
+
+
+    def update_job(self, job: ImageJob,
+        status: str) -> None:
+        """
+        Commit the completed step of a job with its current metadata.
+
+        Args:
+            - job: The job to update.
+            - status: The new status of the job.
+        """
+        self.update_jobs([job], status)
+
+
+    def update_jobs(self, jobs: list[ImageJob],
+        status: str) -> None:
+        """
+        Commit the completed step of the jobs with their current metadata in a single transaction.
+
+        Args:
+            - jobs: The jobs to update.
+            - status: The new status of the jobs.
+        """
+        for job in jobs:
+            job.status = status
+
+        with self._lock, self._connection:
+            self._connection.executemany("""
+                UPDATE image_jobs SET status = ?, prompt = ?, quote = ?, caption = ?, llm_model = ?,
+                    prompt_version = ?, prompt_extras = ?, img_meta = ?, attempts = ?, updated_at = ?
+                WHERE id = ?
+            """, [self._to_row(job)[1:] + (job.image_meta.id,) for job in jobs])
+
+
+    def record_failure(self, job: ImageJob) -> bool:
+        """
+        Count a failed attempt of the job, and mark it as failed once it reaches the maximum attempts.
+
+        Args:
+            - job: The job that failed.
+
+        Returns:
+            Whether the job was marked as failed, so it is not resumed anymore.
+        """
+        job.attempts += 1
+        if job.attempts < self.max_attempts:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "UPDATE image_jobs SET attempts = ?, updated_at = ? WHERE id = ?",
+                    (job.attempts, time.time(), job.image_meta.id))
+            return False
+
+        self.update_job(job, ImageJob.FAILED)
+        logger.error("Job of asset with id '%s' failed %s times, it is not resumed anymore.",
+            job.image_meta.id, job.attempts)
+        return True
+
+
+    def get_incomplete_jobs(self, limit: int = None) -> list[ImageJob]:
+        """
+        Get the jobs that were neither completed nor failed yet, in the order they were added.
+
+        Args:
+            - limit: The maximum number of jobs to get.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM image_jobs WHERE status NOT IN (?, ?) ORDER BY seq LIMIT ?",
+                (ImageJob.SAVED, ImageJob.FAILED, -1 if limit is None else limit)
+            ).fetchall()
+
+        return [self._from_row(row) for row in rows]
+
+
+    def get_jobs(self, status: str) -> list[ImageJob]:
+        """
+        Get the jobs with the given status, in the order they were added.
+
+        Args:
+            - status: The status of the jobs.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM image_jobs WHERE status = ? ORDER BY seq", (status,)).fetchall()
+
+        return [self._from_row(row) for row in rows]
+
+
+    def count_jobs(self, status: str) -> int:
+        """
+        Count the jobs with the given status.
+
+        Args:
+            - status: The status of the jobs.
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM image_jobs WHERE status = ?", (status,)).fetchone()[0]
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+        logger.info("Job queue closed.")
+
+
+    @staticmethod
+    def _to_row(job: ImageJob) -> tuple:
+        image_meta = job.image_meta
+        return (
+            image_meta.id,
+            job.status,
+            job.prompt,
+            image_meta.quote,
+            image_meta.caption,
+            image_meta.llm_model,
+            image_meta.prompt_version,
+            json.dumps(image_meta.prompt_extras),
+            json.dumps(image_meta.img_meta),
+            job.attempts,
+            time.time()
+        )
+
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> ImageJob:
+        return ImageJob(
+            image_meta=ImageMeta(
+                id=row['id'],
+                quote=row['quote'],
+                caption=row['caption'],
+                llm_model=row['llm_model'],
+                prompt_version=row['prompt_version'],
+                prompt_extras=json.loads(row['prompt_extras']),
+                img_meta=json.loads(row['img_meta'])
+            ),
+            prompt=row['prompt'],
+            status=row['status'],
+            attempts=row['attempts']
+        )
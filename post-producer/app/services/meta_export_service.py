@@ -0,0 +1,177 @@
+import csv
+import itertools
+import json
+import os
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import get_config
+from app.config.log_config import logger
+from app.models.image_meta import ImageMeta
+
+
+class MetaExportService:
+    """
+    Service class that exports the images' metadata to a Parquet file for analytics.
+
+    The JSON fields of the metadata file are flattened into typed columns, along with
+    the review status of the image, derived from the directory it is in. The rows are
+    written in row groups with min/max statistics, so the filters of a read are pushed down
+    to skip the row groups and columns that are not needed, instead of parsing every row.
+
+    Attributes:
+        - batch_size: The number of rows of a row group.
+    """
+    PENDING = 'pending'
+    APPROVED = 'approved'
+    REJECTED = 'rejected'
+    PROCESSED = 'processed'
+    MISSING = 'missing'
+
+    SCHEMA = pa.schema([
+        ('id', pa.string()),
+        ('quote', pa.string()),
+        ('caption', pa.string()),
+        ('llm_model', pa.dictionary(pa.int32(), pa.string())),
+        ('prompt_version', pa.dictionary(pa.int32(), pa.string())),
+        ('emotion', pa.dictionary(pa.int32(), pa.string())),
+        ('poetry_topic', pa.dictionary(pa.int32(), pa.string())),
+        ('writing_style', pa.dictionary(pa.int32(), pa.string())),
+        ('artistical_tool', pa.dictionary(pa.int32(), pa.string())),
+        ('max_words', pa.int16()),
+        ('quote_font', pa.dictionary(pa.int32(), pa.string())),
+        ('image_background', pa.dictionary(pa.int32(), pa.string())),
+        ('image_width', pa.int32()),
+        ('image_height', pa.int32()),
+        ('image_margin', pa.int32()),
+        ('quote_color', pa.list_(pa.uint8())),
+        ('quote_font_size', pa.int32()),
+        ('quote_offset', pa.int32()),
+        ('review_status', pa.dictionary(pa.int32(), pa.string()))
+    ])
+
+    def __init__(self, batch_size: int = 16384):
+        self.batch_size = batch_size
+
+
+    def export(self, export_file: str = None) -> int:
+        """
+        Export the images' metadata to a Parquet file, which replaces the previous export atomically.
+
+        Args:
+            - export_file: The path of the Parquet file. Defaults to the configured export file.
+
+        Returns:
+            The number of exported rows.
+        """
+        export_file = export_file or get_config().IMAGE_META_EXPORT_FILE
+        image_meta_file = get_config().IMAGE_META_FILE
+        if not os.path.exists(image_meta_file):
+            logger.info("No image metadata found to export.")
+            return 0
+
+        review_statuses = self._get_review_statuses()
+        exported_num = 0
+        temp_file = export_file + '.tmp'
+
+        try:
+            with open(image_meta_file, 'r', encoding='utf-8', newline='') as f, \
+                pq.ParquetWriter(temp_file, self.SCHEMA, compression='zstd') as writer:
+                for batch in self._batches(csv.DictReader(f)):
+                    columns = {name: [] for name in self.SCHEMA.names}
+                    for row in batch:
+                        for name, value in self._flatten(row, review_statuses).items():
+                            columns[name].append(value)
+
+                    writer.write_table(pa.Table.from_pydict(columns, schema=self.SCHEMA))
+                    exported_num += len(batch)
+
+            os.replace(temp_file, export_file)
+        except Exception as e:
+            logger.error("Failed to export the image metadata.", exc_info=True)
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise e
+
+        logger.info("Metadata of %s images exported to %s.", exported_num, export_file)
+
+        return exported_num
+
+
+    @staticmethod
+    def read(filters: list[tuple] = None,
+        columns: list[str] = None,
+        export_file: str = None) -> pa.Table:
+        """
+        Read the exported metadata, with the filters pushed down to the row groups of the file.
+
+        Args:
+            - filters: The predicates of the rows, e.g. [('review_status', '=', 'approved')].
+            - columns: The columns to read. Defaults to every column.
+            - export_file: The path of the Parquet file. Defaults to the configured export file.
+        """
+        return pq.read_table(export_file or get_config().IMAGE_META_EXPORT_FILE,
+            columns=columns, filters=filters)
+
+
+    def _batches(self, rows: Iterator[dict]) -> Iterator[list[dict]]:
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            yield batch
+
+
+    @classmethod
+    def _flatten(cls, row: dict,
+        review_statuses: dict[str, str]) -> dict:
+        """
+        Flatten a row of the metadata file into the columns of the export.
+        """
+        prompt_extras = json.loads(row['prompt_extras'] or 'null') or {}
+        img_meta = json.loads(row['img_meta'] or 'null') or {}
+
+        return {
+            'id': row['id'],
+            'quote': row['quote'],
+            'caption': row['caption'],
+            'llm_model': row['llm_model'] or None,
+            'prompt_version': row['prompt_version'] or None,
+            'emotion': prompt_extras.get('emotion'),
+            'poetry_topic': prompt_extras.get('poetry_topic'),
+            'writing_style': prompt_extras.get('writing_style'),
+            'artistical_tool': prompt_extras.get('artistical_tool'),
+            'max_words': prompt_extras.get('max_words'),
+            'quote_font': img_meta.get('quote_font'),
+            'image_background': img_meta.get('image_background'),
+            'image_width': img_meta.get('image_width'),
+            'image_height': img_meta.get('image_height'),
+            'image_margin': img_meta.get('image_margin'),
+            'quote_color': img_meta.get('quote_color'),
+            'quote_font_size': img_meta.get('quote_font_size'),
+            'quote_offset': img_meta.get('quote_offset'),
+            'review_status': review_statuses.get(row['id'], cls.MISSING)
+        }
+
+
+    @classmethod
+    def _get_review_statuses(cls) -> dict[str, str]:
+        """
+        Get the review status of the images by their ids, from the directory they are in.
+        """
+        directories = {
+            cls.PENDING: get_config().BASE_IMAGE_DIR,
+            cls.APPROVED: get_config().APPROVED_IMAGE_DIR,
+            cls.REJECTED: get_config().REJECTED_IMAGE_DIR,
+            cls.PROCESSED: get_config().PROCESSED_IMAGE_DIR
+        }
+
+        review_statuses = {}
+        for status, directory in directories.items():
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.jpg') and not entry.name.startswith('.'):
+                        review_statuses[entry.name[:-len('.jpg')]] = status
+
+        return review_statuses
@@ -1,11 +1,37 @@
+import hashlib
+import json
+import math
+import os
 import random
 
 
 class PromptBuilderService:
     """
     Service that generates prompts for the quote generator based on specific guidelines.
+
+    The quote characteristics are drawn from their combination space with a coverage-aware
+    sampler: every combination is used exactly once per cycle, and consecutive draws are spread
+    evenly over the space. The position in the cycle is persisted, so the coverage carries over
+    to the next runs.
+
+    Optional sampling weights of the characteristics' values, e.g. derived from their approval rates,
+    thin out the cycle: a drawn combination is only used with a probability proportional to the product
+    of its weights, otherwise the next one is drawn. The combinations of the heavier values are
+    used more often, while every combination still keeps a chance in each cycle.
+
+    Attributes:
+        - state_file: The path of the sampler's persisted state, or None to keep it in memory.
+        - weights_file: The path of the sampling weights by characteristic and value, or None to sample evenly.
     """
-    def __init__(self) -> None:
+    # Fraction of the combination space between two consecutive draws
+    GOLDEN_RATIO_FRACTION = (math.sqrt(5) - 1) / 2
+    # Lowest probability of a combination being used, relative to the heaviest combination
+    MIN_ACCEPTANCE = 0.05
+
+    def __init__(self, state_file: str = None,
+        weights_file: str = None) -> None:
+        self.state_file = state_file
+        self.weights_file = weights_file
         self.prompt_version = "1.0.0"
         self.base_prompt = """
             Please generate a quote and a caption by strictly following these guidelines:
@@ -90,27 +116,158 @@ class PromptBuilderService:
         ]
         self.writing_styles: list[str] = ["funny"]
         self.artistical_tools: list[str] = ["irony"]
+        self.max_words: list[int] = list(range(5, 16))
+
+        # Initialize the sampler of the combination space
+        self._dimensions = {
+            "emotion": self.emotions,
+            "poetry_topic": self.poetry_topics,
+            "writing_style": self.writing_styles,
+            "artistical_tool": self.artistical_tools,
+            "max_words": self.max_words
+        }
+        self._space_size = math.prod(len(values) for values in self._dimensions.values())
+        self._multiplier = self._get_multiplier(self._space_size)
+        self._state = self._load_state()
+        self._weights = self._load_weights()
 
 
     def get_prompt_variation(self) -> tuple[str, dict]:
         """
-        Generates a random prompt variation that extends the base prompt with quote characteristics.
-        """
-        # Get random values for the prompt
-        emotion = random.choice(self.emotions)
-        poetry_topic = random.choice(self.poetry_topics)
-        writing_style = random.choice(self.writing_styles)
-        artistical_tool = random.choice(self.artistical_tools)
-        max_words = random.randint(5, 15)
-        prompt_extras = {
-            "emotion": emotion,
-            "poetry_topic": poetry_topic,
-            "writing_style": writing_style,
-            "artistical_tool": artistical_tool,
-            "max_words": max_words
-        }
+        Generates a prompt variation that extends the base prompt with the quote characteristics
+        of the next combination drawn by the sampler.
+        """
+        # Get the values of the next combination for the prompt, thinned out by the weights
+        prompt_extras = self._decode(self._next_index())
+        while random.random() >= self._get_acceptance(prompt_extras):
+            prompt_extras = self._decode(self._next_index())
+        self._save_state()
+
+        return self.get_prompt(prompt_extras), prompt_extras
 
+
+    def get_prompt(self, prompt_extras: dict) -> str:
+        """
+        Builds the prompt of the given quote characteristics, without drawing from the sampler.
+
+        Args:
+            - prompt_extras: The values of the quote characteristics.
+        """
         # Merge the base prompt with the quote characteristics
-        final_prompt = self.base_prompt + self.extra_prompt.format(**prompt_extras)
+        return self.base_prompt + self.extra_prompt.format(**prompt_extras)
+
+
+    def _next_index(self) -> int:
+        """
+        Draws the index of the next combination in the current cycle.
+
+        The affine map of the position is a permutation of the combination space,
+        as its multiplier is coprime to the size of the space, so no combination is repeated
+        within a cycle. A new cycle starts with a random offset.
+        """
+        if self._state["position"] >= self._space_size:
+            self._state.update(position=0, offset=random.randrange(self._space_size),
+                cycle=self._state["cycle"] + 1)
+
+        index = (self._multiplier * self._state["position"] + self._state["offset"]) % self._space_size
+        self._state["position"] += 1
+
+        return index
+
+
+    def _decode(self, index: int) -> dict:
+        """
+        Decodes the index of a combination into the values of its characteristics,
+        with the index read as a mixed-radix number.
+        """
+        combination = {}
+        for name, values in self._dimensions.items():
+            index, value_index = divmod(index, len(values))
+            combination[name] = values[value_index]
+
+        return combination
+
+
+    def _get_acceptance(self, combination: dict) -> float:
+        """
+        Gets the probability of using a combination: the product of its values' weights,
+        relative to the product of the heaviest values.
+        """
+        acceptance = 1.0
+        for name, value in combination.items():
+            weights = self._weights.get(name)
+            if weights:
+                acceptance *= weights.get(str(value), 1.0) / max(max(weights.values()), 1.0)
+
+        return max(acceptance, self.MIN_ACCEPTANCE)
+
+
+    @classmethod
+    def _get_multiplier(cls, space_size: int) -> int:
+        """
+        Gets the multiplier of the permutation: the integer closest to the golden ratio fraction
+        of the space size that is coprime to it, which spreads consecutive draws the most evenly.
+        """
+        multiplier = max(round(space_size * cls.GOLDEN_RATIO_FRACTION), 1)
+        while math.gcd(multiplier, space_size) != 1:
+            multiplier += 1
+
+        return multiplier
+
+
+    def _get_space_id(self) -> str:
+        """
+        Gets the identifier of the combination space, which changes with any of its values.
+        """
+        return hashlib.blake2b(json.dumps(self._dimensions).encode('utf-8'),
+            digest_size=8).hexdigest()
+
+
+    def _load_state(self) -> dict:
+        """
+        Loads the persisted state of the sampler. A new state is started
+        if there is none yet or the combination space has changed since it was persisted.
+        """
+        if self.state_file and os.path.exists(self.state_file):
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            if state.get("space_id") == self._get_space_id():
+                return state
+
+        return {
+            "space_id": self._get_space_id(),
+            "cycle": 0,
+            "position": 0,
+            "offset": random.randrange(self._space_size)
+        }
+
+
+    def _load_weights(self) -> dict[str, dict[str, float]]:
+        """
+        Loads the sampling weights by characteristic and value, keyed by the values as strings.
+        The values without a weight have a weight of 1.
+        """
+        if not self.weights_file or not os.path.exists(self.weights_file):
+            return {}
+
+        with open(self.weights_file, 'r', encoding='utf-8') as f:
+            weights = json.load(f)
+
+        # Only the weights of the current characteristics are used
+        return {name: {str(value): float(weight) for value, weight in weights[name].items()}
+            for name in self._dimensions if name in weights}
+
+
+    def _save_state(self) -> None:
+        """
+        Persists the state of the sampler by replacing the state file atomically.
+        """
+        if not self.state_file:
+            return
 
-        return final_prompt, prompt_extras
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+        temp_file = self.state_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f)
+        os.replace(temp_file, self.state_file)
@@ -0,0 +1,211 @@
+import csv
+import hashlib
+import os
+import re
+import struct
+import threading
+import unicodedata
+from typing import Union
+
+from app.config.log_config import logger
+
+
+class QuoteDedupService:
+    """
+    Service class that detects quotes which were already generated in a previous or the current run.
+
+    Exact duplicates are found by the hash of the normalized quote. Near-duplicates are found
+    with MinHash signatures of the quote's character shingles, which are bucketed with
+    locality-sensitive hashing (LSH), so a lookup only compares the few quotes that share
+    a bucket, independently of the size of the index.
+
+    The hashes and signatures are persisted in a binary file with fixed-size records,
+    which is appended to as new quotes are added. The quotes may be added by another thread
+    than the one checking them, e.g. once their metadata is flushed.
+
+    Attributes:
+        - index_file: The path of the persisted index, or None to keep the index in memory.
+        - similarity_threshold: The estimated Jaccard similarity from which a quote is a duplicate.
+        - exact_hashes: The hashes of the normalized quotes.
+        - signatures: The packed MinHash signatures of the quotes.
+        - buckets: The ids of the signatures, keyed by their LSH band.
+    """
+    # Length of the character shingles
+    SHINGLE_SIZE = 4
+    # Number of 16-bit MinHash values of a signature, split into bands of rows for LSH
+    NUM_HASHES = 32
+    BAND_ROWS = 4
+    # Size of the exact hash in bytes
+    EXACT_HASH_SIZE = 16
+    RECORD_SIZE = EXACT_HASH_SIZE + NUM_HASHES * 2
+
+    def __init__(self, index_file: str = None,
+        similarity_threshold: float = 0.7) -> None:
+        self.index_file = index_file
+        self.similarity_threshold = similarity_threshold
+        self.exact_hashes: set[bytes] = set()
+        self.signatures: list[bytes] = []
+        self.buckets: dict[bytes, Union[int, list[int]]] = {}
+        self._lock = threading.Lock()
+
+
+    def load(self, image_meta_file: str = None) -> None:
+        """
+        Load the persisted index. If there is no index yet, it is built from the quotes
+        in the images' metadata file and persisted.
+
+        Args:
+            - image_meta_file: The path of the CSV file that stores the images' metadata.
+        """
+        if self.index_file and os.path.exists(self.index_file):
+            with open(self.index_file, 'rb') as f:
+                data = f.read()
+
+            # Ignore a partially written last record
+            for offset in range(0, len(data) - self.RECORD_SIZE + 1, self.RECORD_SIZE):
+                record = data[offset:offset + self.RECORD_SIZE]
+                self._insert(record[:self.EXACT_HASH_SIZE], record[self.EXACT_HASH_SIZE:])
+
+            logger.info("Quote index with %s quotes loaded.", len(self.signatures))
+            return
+
+        if image_meta_file and os.path.exists(image_meta_file):
+            with open(image_meta_file, 'r', encoding='utf-8') as f:
+                records = b''.join(self._index_quote(row['quote'])
+                    for row in csv.DictReader(f) if row.get('quote'))
+            self._persist(records)
+
+            logger.info("Quote index built from %s quotes.", len(self.signatures))
+
+
+    def is_duplicate(self, quote: str) -> bool:
+        """
+        Check whether the quote, or a near-duplicate of it, is already in the index.
+
+        Args:
+            - quote: The quote to check.
+        """
+        normalized_quote = self.normalize(quote)
+        signature = self._signature(normalized_quote)
+        candidates = set()
+        with self._lock:
+            if self._exact_hash(normalized_quote) in self.exact_hashes:
+                return True
+
+            for band in self._bands(signature):
+                bucket = self.buckets.get(band)
+                if bucket is not None:
+                    candidates.update((bucket,) if isinstance(bucket, int) else bucket)
+
+        # Estimate the Jaccard similarity by the ratio of the matching MinHash values
+        values = self._unpack(signature)
+        for candidate in candidates:
+            matches = sum(a == b for a, b in zip(values, self._unpack(self.signatures[candidate])))
+            if matches / self.NUM_HASHES >= self.similarity_threshold:
+                return True
+
+        return False
+
+
+    def add(self, quote: str) -> None:
+        """
+        Add a quote to the index, and persist it if the index has a file.
+
+        Args:
+            - quote: The quote to add.
+        """
+        with self._lock:
+            self._persist(self._index_quote(quote))
+
+
+    @staticmethod
+    def normalize(quote: str) -> str:
+        """
+        Normalize the quote, so that the differences in casing, punctuation
+        and whitespaces are ignored.
+
+        Args:
+            - quote: The quote to normalize.
+        """
+        quote = unicodedata.normalize('NFKC', quote).casefold()
+        quote = re.sub(r'[^\w\s]', '', quote)
+        return ' '.join(quote.split())
+
+
+    def _index_quote(self, quote: str) -> bytes:
+        """
+        Insert a quote into the in-memory index.
+
+        Returns:
+            The record of the quote in the persisted index.
+        """
+        normalized_quote = self.normalize(quote)
+        exact_hash = self._exact_hash(normalized_quote)
+        signature = self._signature(normalized_quote)
+        self._insert(exact_hash, signature)
+
+        return exact_hash + signature
+
+
+    def _insert(self, exact_hash: bytes,
+        signature: bytes) -> None:
+        """
+        Insert the hash and the signature of a quote into the in-memory index.
+        """
+        self.exact_hashes.add(exact_hash)
+        self.signatures.append(signature)
+        signature_id = len(self.signatures) - 1
+
+        # Most buckets hold a single signature, which is stored without a list to save memory
+        for band in self._bands(signature):
+            bucket = self.buckets.get(band)
+            if bucket is None:
+                self.buckets[band] = signature_id
+            elif isinstance(bucket, int):
+                self.buckets[band] = [bucket, signature_id]
+            else:
+                bucket.append(signature_id)
+
+
+    def _persist(self, records: bytes) -> None:
+        """
+        Append the records of the indexed quotes to the index file.
+        """
+        if not self.index_file or not records:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_file)), exist_ok=True)
+        with open(self.index_file, 'ab') as f:
+            f.write(records)
+
+
+    def _exact_hash(self, normalized_quote: str) -> bytes:
+        return hashlib.blake2b(normalized_quote.encode('utf-8'),
+            digest_size=self.EXACT_HASH_SIZE).digest()
+
+
+    def _signature(self, normalized_quote: str) -> bytes:
+        """
+        Calculate the packed MinHash signature of the quote's character shingles.
+
+        Every 16-bit chunk of a shingle's SHAKE-128 digest is used as an independent hash function,
+        so a shingle is hashed only once.
+        """
+        shingles = {normalized_quote[i:i + self.SHINGLE_SIZE]
+            for i in range(max(len(normalized_quote) - self.SHINGLE_SIZE + 1, 1))}
+        hashes = [struct.unpack(f'>{self.NUM_HASHES}H',
+            hashlib.shake_128(shingle.encode('utf-8')).digest(self.NUM_HASHES * 2))
+            for shingle in shingles]
+
+        return struct.pack(f'>{self.NUM_HASHES}H', *map(min, zip(*hashes)))
+
+
+    def _unpack(self, signature: bytes) -> tuple[int, ...]:
+        return struct.unpack(f'>{self.NUM_HASHES}H', signature)
+
+
+    def _bands(self, signature: bytes) -> list[bytes]:
+        # The band's position is part of its key, as the same values in different bands don't match
+        band_size = self.BAND_ROWS * 2
+        return [bytes([start]) + signature[start:start + band_size]
+            for start in range(0, len(signature), band_size)]
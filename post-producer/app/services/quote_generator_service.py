@@ -1,8 +1,11 @@
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 
 from app.config.log_config import logger
+from app.config.metrics_config import metrics
 from app.models.quote_generator_client import QuoteGeneratorClient
+from app.services.quote_dedup_service import QuoteDedupService
 from app.exceptions.quote_generator_exceptions import (
+    DuplicateQuoteException,
     LlmOutputGenerationException,
     LlmOutputParsingException
 )
@@ -11,23 +14,102 @@ from app.exceptions.quote_generator_exceptions import (
 class QuoteGeneratorService:
     """
     Service class that abstracts the logic for generating quotes and captions.
+
+    Attributes:
+        - client: The LLM client used for generating the quotes and captions.
+        - quote_dedup_service: The index of the saved quotes, or None to allow duplicates.
+            The quotes are only added to it once their assets are saved.
+        - max_attempts: The number of generations before giving up on duplicate quotes.
+        - max_parse_attempts: The number of generations before giving up on unparsable outputs.
     """
-    def __init__(self, client: QuoteGeneratorClient):
+    def __init__(self, client: QuoteGeneratorClient,
+        quote_dedup_service: QuoteDedupService = None,
+        max_attempts: int = 3,
+        max_parse_attempts: int = 3):
         self.client = client
+        self.quote_dedup_service = quote_dedup_service
+        self.max_attempts = max_attempts
+        self.max_parse_attempts = max_parse_attempts
 
 
-    def get_quote_and_caption(self, prompt: str = None) -> Tuple[str, str]:
+    @metrics.timed('get_quote_and_caption')
+    def get_quote_and_caption(self, prompt: str = None,
+        on_quote: Callable[[str], None] = None) -> Tuple[str, str]:
         """
         Generate a quote and caption using the provided LLM client.
 
+        Quotes that were already generated are regenerated right after parsing,
+        before any time is spent on rendering them.
+
         Args:
             prompt: The prompt to use for generating the quote and caption.
+            on_quote: Called with the new quote as soon as it is complete in the streamed output,
+                e.g. to start rendering it while the caption is generated. It is called again
+                if the output turns out to be unparsable and it is regenerated.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            quote, caption = self._generate_quote_and_caption(prompt, on_quote)
+
+            if caption is not None:
+                return quote, caption
+
+            logger.warning("Duplicate quote generated (attempt %s of %s): %s",
+                attempt, self.max_attempts, quote)
+
+        e = DuplicateQuoteException(llm_model=self.client.model, attempts=self.max_attempts)
+        logger.critical("%s kept generating duplicate quotes.", e.llm_model)
+        raise e
+
+
+    def _generate_quote_and_caption(self, prompt: str,
+        on_quote: Callable[[str], None] = None) -> Tuple[str, Optional[str]]:
+        """
+        Generate a quote and caption, and regenerate the outputs that cannot be parsed.
+        The transient errors of the generation are retried by the client itself.
+
+        Returns:
+            The quote and caption, or the quote without a caption if it is a duplicate.
         """
+        for attempt in range(1, self.max_parse_attempts + 1):
+            try:
+                if on_quote is None:
+                    quote, caption = self.client.generate_quote_and_caption(prompt)
+                    return quote, None if self._is_duplicate(quote) else caption
+
+                return self._stream_quote_and_caption(prompt, on_quote)
+            except LlmOutputGenerationException as e:
+                logger.critical("%s failed to generate quote and caption.", e.llm_model, exc_info=True)
+                raise e
+            except LlmOutputParsingException as e:
+                if attempt == self.max_parse_attempts:
+                    logger.critical("Failed to parse the output of %s.", e.llm_model, exc_info=True)
+                    raise e
+
+                logger.warning("Failed to parse the output of %s (attempt %s of %s).",
+                    e.llm_model, attempt, self.max_parse_attempts)
+
+
+    def _stream_quote_and_caption(self, prompt: str,
+        on_quote: Callable[[str], None]) -> Tuple[str, Optional[str]]:
+        """
+        Generate a quote and caption with the fields streamed by the client.
+        A duplicate quote stops the generation before its caption is generated.
+        """
+        fields = {}
+        stream = self.client.stream_quote_and_caption(prompt)
         try:
-            return self.client.generate_quote_and_caption(prompt)
-        except LlmOutputGenerationException as e:
-            logger.critical("%s failed to generate quote and caption.", e.llm_model, exc_info=True)
-            raise e
-        except LlmOutputParsingException as e:
-            logger.critical("Failed to parse the output of %s.", e.llm_model, exc_info=True)
-            raise e
+            for name, value in stream:
+                fields[name] = value
+                if name != 'quote':
+                    continue
+                if self._is_duplicate(value):
+                    return value, None
+                on_quote(value)
+        finally:
+            stream.close()
+
+        return fields['quote'], fields['caption']
+
+
+    def _is_duplicate(self, quote: str) -> bool:
+        return self.quote_dedup_service is not None and self.quote_dedup_service.is_duplicate(quote)
@@ -0,0 +1,132 @@
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+import app.config as app_config
+from app.config import Config, get_config
+from app.config.log_config import log_context, logger, setup_logger
+from app.models.image_meta import ImageMeta
+from app.services.asset_manager_service import AssetManagerService
+from app.services.image_generator_service import ImageGeneratorService
+
+
+class RerenderService:
+    """
+    Service class that renders the images of previously generated assets again from their metadata,
+    with the current settings of the image generator and without calling the LLM.
+
+    The rows of the images' metadata file are streamed in batches to a pool of worker processes,
+    and the metadata file is replaced with the updated rows once every batch is rendered.
+
+    Attributes:
+        - workers: The number of worker processes. Defaults to the number of CPUs.
+        - batch_size: The number of rows that are rendered at once.
+    """
+    def __init__(self, workers: int = None,
+        batch_size: int = 256):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+
+
+    def rerender(self, asset_ids: Iterable[str] = None) -> int:
+        """
+        Render the images of the assets again, overwriting them in the image directories they are in,
+        so their review and migration states are kept, and update their image metadata.
+
+        Args:
+            - asset_ids: The ids of the assets to render. Every asset whose image exists is rendered
+                if not given. The missing images of the given assets are saved to the base image directory,
+                so they are reviewed again.
+
+        Returns:
+            The number of rendered images.
+        """
+        image_meta_file = get_config().IMAGE_META_FILE
+        if not os.path.exists(image_meta_file):
+            logger.info("No image metadata found to render.")
+            return 0
+
+        asset_ids = set(asset_ids) if asset_ids is not None else None
+        rendered_num = 0
+        temp_file = image_meta_file + '.tmp'
+
+        # The workers are spawned, so they don't inherit the logging thread of this process
+        with open(image_meta_file, 'r', encoding='utf-8', newline='') as in_file, \
+            open(temp_file, 'w', encoding='utf-8', newline='') as out_file, \
+            ProcessPoolExecutor(max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(get_config(),)) as executor:
+
+            writer = csv.DictWriter(out_file, fieldnames=ImageMeta.get_field_names())
+            writer.writeheader()
+
+            for batch in self._batches(csv.DictReader(in_file)):
+                selected_rows = [row for row in batch
+                    if asset_ids is None or row['id'] in asset_ids]
+                rendered_rows = {row['id']: row for row in executor.map(_render_asset, selected_rows,
+                    itertools.repeat(asset_ids is not None)) if row is not None}
+                rendered_num += len(rendered_rows)
+
+                # Keep the order of the rows, and the original row of a failed render
+                writer.writerows(rendered_rows.get(row['id'], row) for row in batch)
+
+        os.replace(temp_file, image_meta_file)
+        logger.info("%s images rendered again.", rendered_num)
+
+        return rendered_num
+
+
+    def _batches(self, rows: Iterator[dict]) -> Iterator[list[dict]]:
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            yield batch
+
+
+# Image generator of the worker process
+_image_generator: Optional[ImageGeneratorService] = None
+
+
+def _init_worker(config: Config) -> None:
+    """
+    Initialize a worker process with the configuration of the parent process.
+    """
+    global _image_generator
+    setup_logger()
+    app_config.config = config
+    _image_generator = ImageGeneratorService()
+
+
+def _render_asset(row: dict,
+    restore_missing: bool = False) -> Optional[dict]:
+    """
+    Render the image of an asset from its metadata row, and save it in the directory it is in.
+
+    Args:
+        - row: The metadata row of the asset.
+        - restore_missing: Whether a missing image is saved to the base image directory.
+            Otherwise, the asset is skipped, e.g. as its processed image was deleted.
+
+    Returns:
+        The metadata row updated with the new image metadata,
+        or None if the rendering failed or the asset was skipped.
+    """
+    with log_context(asset_id=row['id']):
+        image_dir = AssetManagerService.find_image_dir(row['id'])
+        if image_dir is None and not restore_missing:
+            logger.info("Skipped asset with id '%s', as its image does not exist.", row['id'])
+            return None
+
+        try:
+            _image_generator.set_color_and_font_scheme_from_meta(json.loads(row['img_meta'] or '{}'))
+            generated_image = _image_generator.create_image_with_quote(row['quote'])
+            AssetManagerService.save_image(generated_image, row['id'], image_dir)
+        except Exception:
+            logger.error("Failed to render the image of asset with id '%s' again.", row['id'],
+                exc_info=True)
+            return None
+
+    return {**row, 'img_meta': json.dumps(_image_generator.get_meta())}
@@ -0,0 +1,158 @@
+import csv
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PIL import Image
+
+from app.config import get_config
+from app.config.log_config import logger
+from app.services.asset_manager_service import AssetManagerService
+
+
+class ReviewService:
+    """
+    Service class of the manual review, which approves or rejects the generated images.
+
+    The images are reviewed through their thumbnails, which are cached on disk and generated
+    in parallel ahead of the review. JPEGs are decoded at a reduced scale for the thumbnails,
+    so a 2000x2000 image is never decoded completely. A decision moves the image atomically from
+    the base image directory to the approved or rejected image directory, where the post-migrator
+    and the analytics pick it up.
+
+    Attributes:
+        - workers: The number of threads that generate the thumbnails. Defaults to the number of CPUs.
+        - thumbnail_size: The maximum width and height of the thumbnails in pixels.
+    """
+    APPROVE = 'approve'
+    REJECT = 'reject'
+
+    def __init__(self, workers: int = None,
+        thumbnail_size: int = 512):
+        self.workers = workers or os.cpu_count() or 1
+        self.thumbnail_size = thumbnail_size
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='thumbnail')
+
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def get_pending_assets(self) -> list[dict]:
+        """
+        Get the images waiting for a review with their quotes and captions, in the order they were generated.
+        """
+        base_image_dir = get_config().BASE_IMAGE_DIR
+        if not os.path.isdir(base_image_dir):
+            return []
+
+        with os.scandir(base_image_dir) as entries:
+            pending_ids = {entry.name[:-len('.jpg')] for entry in entries
+                if entry.name.endswith('.jpg') and not entry.name.startswith('.')}
+
+        # The metadata rows are in the order of the generation, the images without them come last
+        pending_assets = self._get_assets(pending_ids)
+        pending_assets += [{'id': asset_id, 'quote': None, 'caption': None}
+            for asset_id in sorted(pending_ids - {asset['id'] for asset in pending_assets})]
+
+        return pending_assets
+
+
+    def prefetch_thumbnails(self, asset_ids: list[str]) -> None:
+        """
+        Generate the missing thumbnails of the images in the background, in the given order.
+
+        Args:
+            - asset_ids: The ids of the images.
+        """
+        for asset_id in asset_ids:
+            self._executor.submit(self._prefetch_thumbnail, asset_id)
+
+
+    def get_thumbnail(self, asset_id: str) -> Optional[str]:
+        """
+        Get the path of the image's cached thumbnail, generating it if it is missing or outdated.
+
+        Args:
+            - asset_id: The id of the image.
+
+        Returns:
+            The path of the thumbnail, or None if the image is not waiting for a review.
+        """
+        image_path = os.path.join(get_config().BASE_IMAGE_DIR, asset_id + '.jpg')
+        thumbnail_path = os.path.join(get_config().THUMBNAIL_DIR, asset_id + '.jpg')
+
+        try:
+            image_mtime = os.stat(image_path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        # The thumbnail is outdated if the image was rendered again since
+        if os.path.exists(thumbnail_path) and os.stat(thumbnail_path).st_mtime >= image_mtime:
+            return thumbnail_path
+
+        os.makedirs(get_config().THUMBNAIL_DIR, exist_ok=True)
+        # The temporary file is unique to the thread, as the same thumbnail may be requested concurrently
+        temp_path = f'{thumbnail_path}.{threading.get_ident()}.tmp'
+        with Image.open(image_path) as image:
+            image.draft('RGB', (self.thumbnail_size, self.thumbnail_size))
+            image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            image.convert('RGB').save(temp_path, format='JPEG', quality=85)
+        os.replace(temp_path, thumbnail_path)
+
+        return thumbnail_path
+
+
+    def review(self, asset_id: str,
+        decision: str) -> bool:
+        """
+        Approve or reject an image by moving it atomically to the approved or rejected image directory.
+
+        Args:
+            - asset_id: The id of the image.
+            - decision: Either approve or reject.
+
+        Returns:
+            Whether the image was moved, i.e. it was waiting for a review.
+        """
+        target_dir = {
+            self.APPROVE: get_config().APPROVED_IMAGE_DIR,
+            self.REJECT: get_config().REJECTED_IMAGE_DIR
+        }[decision]
+
+        return AssetManagerService.move_image(asset_id, get_config().BASE_IMAGE_DIR, target_dir)
+
+
+    def undo(self, asset_id: str) -> bool:
+        """
+        Move a reviewed image back to the base image directory, unless it was already migrated.
+
+        Args:
+            - asset_id: The id of the image.
+
+        Returns:
+            Whether the image was moved back.
+        """
+        return any(AssetManagerService.move_image(asset_id, reviewed_dir, get_config().BASE_IMAGE_DIR)
+            for reviewed_dir in [get_config().APPROVED_IMAGE_DIR, get_config().REJECTED_IMAGE_DIR])
+
+
+    def _prefetch_thumbnail(self, asset_id: str) -> None:
+        try:
+            self.get_thumbnail(asset_id)
+        except Exception:
+            logger.error("Failed to generate the thumbnail of image '%s'.", asset_id, exc_info=True)
+
+
+    @staticmethod
+    def _get_assets(asset_ids: set[str]) -> list[dict]:
+        """
+        Get the ids, quotes and captions of the images from the metadata file.
+        """
+        if not asset_ids or not os.path.exists(get_config().IMAGE_META_FILE):
+            return []
+
+        with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8', newline='') as f:
+            return [{'id': row['id'], 'quote': row['quote'], 'caption': row['caption']}
+                for row in csv.DictReader(f) if row['id'] in asset_ids]
@@ -14,6 +14,7 @@ def init_client_side_effect(self,
     Mimick the OpenAI client instance initialization with a mocked client.
     """
     self.model = model
+    self.stream = False
     self.client = MagicMock()
 
 
@@ -26,6 +27,7 @@ def mock_openai_client() -> Generator[OpenAiClient, None, None]:
             new=lambda self,
             model="mock_model",
             api_key="mock_api_key",
+            **kwargs
             : init_client_side_effect(self, api_key, model)
         ), \
         patch.object(OpenAiClient, 'generate_output',
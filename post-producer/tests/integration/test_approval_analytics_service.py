@@ -0,0 +1,51 @@
+import json
+import os
+
+from PIL import Image
+
+from app.config import get_config
+from app.models.image_meta import ImageMeta
+from app.services.approval_analytics_service import ApprovalAnalyticsService
+from app.services.asset_manager_service import AssetManagerService
+
+
+def test_analyze_weights_prompt_extras_by_approval_rate():
+    """
+    GIVEN 10 reviewed images of joy, 8 of them approved, and 10 reviewed images of sadness, 2 of them approved
+        AND a pending image of anger
+    WHEN the approval rates are analysed
+    THEN joy should be weighted above the overall approval rate and sadness below it
+        AND the pending image should be left out
+    """
+    # Save the images in their review directories, with their metadata
+    reviews = [('joy', get_config().APPROVED_IMAGE_DIR)] * 6 \
+        + [('joy', get_config().PROCESSED_IMAGE_DIR)] * 2 \
+        + [('joy', get_config().REJECTED_IMAGE_DIR)] * 2 \
+        + [('sadness', get_config().APPROVED_IMAGE_DIR)] * 2 \
+        + [('sadness', get_config().REJECTED_IMAGE_DIR)] * 8 \
+        + [('anger', get_config().BASE_IMAGE_DIR)]
+    get_config().ensure_asset_storage()
+    image_metas = []
+    for emotion, directory in reviews:
+        image_meta = ImageMeta(quote='quote', prompt_extras={'emotion': emotion, 'max_words': 5},
+            img_meta={'quote_font': 'Modak-Regular.ttf'})
+        Image.new('RGB', (60, 30), color='red').save(os.path.join(directory, image_meta.id + '.jpg'))
+        image_metas.append(image_meta)
+    AssetManagerService.save_image_metas(image_metas)
+
+    # Analyse the approval rates
+    weights = ApprovalAnalyticsService(prior_strength=10).analyze()
+
+    # Check the smoothed weights: (8 + 10 * 0.5) / 20 / 0.5 and (2 + 10 * 0.5) / 20 / 0.5
+    assert weights['emotion'] == {'joy': 1.3, 'sadness': 0.7}
+    assert weights['max_words'] == {'5': 1.0}
+
+    # Check the saved weights
+    with open(get_config().PROMPT_WEIGHTS_FILE, 'r', encoding='utf-8') as f:
+        assert json.load(f) == weights
+
+    # Check the approval rates of a render setting
+    table = ApprovalAnalyticsService().load()
+    rates = ApprovalAnalyticsService().get_approval_rates(table, 'quote_font')
+    assert [(rate['value'], rate['reviewed'], rate['approved']) for rate in rates] == \
+        [('Modak-Regular.ttf', 20, 10)]
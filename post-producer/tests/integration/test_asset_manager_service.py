@@ -61,3 +61,43 @@ def test_save_image_meta():
     assert inserted_row['prompt_version'] == image_meta.prompt_version
     assert json.loads(inserted_row['prompt_extras']) == image_meta.prompt_extras
     assert json.loads(inserted_row['img_meta']) == image_meta.img_meta
+
+
+def test_repair_assets_removes_orphans():
+    """
+    GIVEN a saved asset, a metadata row of an unfinished job without an image, a metadata row
+        of a processed image that was deleted, an image without a metadata row,
+        an image of an incomplete job and a temporary image file
+    WHEN the asset manager service is called to repair the assets
+    THEN the orphan row, the orphan image and the temporary file should be removed
+        AND the saved asset, the row of the deleted image and the image of the incomplete job
+        should be kept
+    """
+    # Save the assets and the orphans
+    image = Image.new('RGB', (60, 30), color='red')
+    saved_meta, orphan_meta = ImageMeta(quote='saved_quote'), ImageMeta(quote='orphan_quote')
+    deleted_meta = ImageMeta(quote='deleted_quote')
+    AssetManagerService.save_image(image, saved_meta.id)
+    AssetManagerService.save_image_metas([saved_meta, orphan_meta, deleted_meta])
+    AssetManagerService.save_image(image, 'orphan_image')
+    AssetManagerService.save_image(image, 'incomplete_job')
+    temp_file = os.path.join(get_config().BASE_IMAGE_DIR, '.interrupted.jpg.tmp')
+    open(temp_file, 'wb').close()
+
+    # Repair the assets
+    result = AssetManagerService.repair_assets(keep_ids={'incomplete_job'},
+        unfinished_ids={'incomplete_job', orphan_meta.id})
+
+    # Check that only the orphans were removed
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        rows = list(DictReader(f))
+
+    assert result == {'temp_files': 1, 'orphan_rows': 1, 'orphan_images': 1, 'missing_images': 1}
+    assert [row['id'] for row in rows] == [saved_meta.id, deleted_meta.id]
+    assert sorted(os.listdir(get_config().BASE_IMAGE_DIR)) == \
+        sorted([saved_meta.id + '.jpg', 'incomplete_job.jpg'])
+
+    # Check that the row of the deleted image is only removed on request
+    AssetManagerService.repair_assets(remove_missing=True)
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        assert [row['id'] for row in DictReader(f)] == [saved_meta.id]
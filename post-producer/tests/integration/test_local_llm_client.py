@@ -0,0 +1,76 @@
+import os
+import threading
+from csv import DictReader
+from typing import Generator
+
+import pytest
+
+from app.__main__ import main
+from app.config import get_config
+from app.models.local_llm_client import LocalLlmClient
+from app.models.stub_llm_server import StubLlmServer
+
+
+@pytest.fixture
+def stub_llm_server() -> Generator[StubLlmServer, None, None]:
+    """
+    Serve the stub model on a free local port.
+    """
+    server = StubLlmServer(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_main_process_with_local_backend(stub_llm_server):
+    """
+    GIVEN the local LLM backend served by the stub model, with batches of 2 prompts
+    WHEN the main process is called to generate 3 images
+    THEN the images and their metadata should be generated with the stub model's quotes
+    """
+    # Configure the local backend
+    get_config().LLM_BACKEND = 'local'
+    get_config().LOCAL_LLM_BASE_URL = stub_llm_server.base_url
+    get_config().LOCAL_LLM_BATCH_SIZE = 2
+
+    # Call the main process
+    main(image_num=3)
+
+    # Check if the images and their metadata were generated
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        inserted_rows = list(DictReader(f))
+
+    assert len(os.listdir(get_config().BASE_IMAGE_DIR)) == 3
+    assert len(inserted_rows) == 3
+    assert all(row['caption'].startswith("Stubbed wisdom") for row in inserted_rows)
+    assert all(row['llm_model'] == 'local' for row in inserted_rows)
+
+
+def test_local_llm_client_streams_deterministic_quotes(stub_llm_server):
+    """
+    GIVEN two stub model servers
+    WHEN the same prompt is sent to both, once streamed and once prefetched
+    THEN both should generate the same quote and caption
+    """
+    # Serve a second stub model
+    other_server = StubLlmServer(port=0)
+    threading.Thread(target=other_server.serve_forever, daemon=True).start()
+
+    try:
+        # Send the same prompt to both
+        streamed_client = LocalLlmClient(base_url=stub_llm_server.base_url, stream=True)
+        prefetched_client = LocalLlmClient(base_url=other_server.base_url)
+        prefetched_client.prefetch(["prompt"])
+
+        streamed_fields = list(streamed_client.stream_quote_and_caption("prompt"))
+        quote, caption = prefetched_client.generate_quote_and_caption("prompt")
+    finally:
+        other_server.shutdown()
+        other_server.server_close()
+
+    # Check that the outputs are the same
+    assert streamed_fields == [('quote', quote), ('caption', caption)]
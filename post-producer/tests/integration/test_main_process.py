@@ -1,20 +1,32 @@
 import os
+import json
 from csv import DictReader
+from unittest.mock import patch
+
+import pytest
 
 from app.__main__ import main
 from app.config import get_config
+from app.exceptions.quote_generator_exceptions import LlmOutputGenerationException
+from app.models.image_job import ImageJob
+from app.services.asset_manager_service import AssetManagerService
+from app.services.job_queue_service import JobQueueService
+from app.services.quote_dedup_service import QuoteDedupService
 
 
 def test_main_process(mock_openai_client):
     """
     GIVEN the number of images to generate
-        AND a mocked OpenAI client instance that returns a dummy quote
+        AND a mocked OpenAI client instance that returns a distinct dummy quote for each image
     WHEN the main process is called to generate images
     THEN the specified number of images should be generated
         AND the images' metadata should be saved
     """
     # Initialize values
     image_num = 2
+    quotes = ["mock_quote", "Another mocked quote for the second image."]
+    mock_openai_client.generate_output.side_effect = [
+        json.dumps({"quote": quote, "caption": "mock_caption"}) for quote in quotes]
 
     # Call the main process
     main(image_num=image_num)
@@ -30,6 +42,154 @@ def test_main_process(mock_openai_client):
 
     assert len(inserted_rows) == image_num
     assert set(image.split('.')[0] for image in images) == set(row['id'] for row in inserted_rows)
-    assert all([row['quote'] == 'mock_quote' for row in inserted_rows])
+    assert sorted(row['quote'] for row in inserted_rows) == sorted(quotes)
     assert all([row['caption'] == 'mock_caption' for row in inserted_rows])
     assert all([row['prompt_extras'] is not None for row in inserted_rows])
+
+
+def test_main_process_resumes_interrupted_job_without_llm_call(mock_openai_client):
+    """
+    GIVEN a run of 2 images that is interrupted when the second image is saved
+    WHEN the main process is called again to generate 2 more images
+    THEN the interrupted job should be completed with its already generated quote
+        AND only one more quote should be generated
+    """
+    # Initialize values
+    quotes = ["mock_quote", "Another mocked quote for the second image.",
+        "A third mocked quote for the new image."]
+    mock_openai_client.generate_output.side_effect = [
+        json.dumps({"quote": quote, "caption": "mock_caption"}) for quote in quotes]
+
+    # Interrupt the run when the second image is saved
+    save_image = AssetManagerService.save_image
+    saved_images = []
+
+    def interrupted_save_image(generated_image, asset_id):
+        if saved_images:
+            raise OSError("Interrupted")
+        save_image(generated_image, asset_id)
+        saved_images.append(asset_id)
+
+    with patch.object(AssetManagerService, 'save_image', side_effect=interrupted_save_image), \
+        pytest.raises(OSError):
+        main(image_num=2)
+
+    # Resume the interrupted job and generate a new one
+    main(image_num=2)
+
+    # Check that the interrupted job was completed without generating its quote again
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        inserted_rows = list(DictReader(f))
+
+    assert mock_openai_client.generate_output.call_count == 3
+    assert [row['quote'] for row in inserted_rows] == quotes
+    assert len(os.listdir(get_config().BASE_IMAGE_DIR)) == 3
+
+
+def test_main_process_replays_cached_run_without_llm_call(mock_openai_client):
+    """
+    GIVEN a run of 2 images with the LLM outputs cached
+    WHEN the main process is called again in replay mode to generate 2 images
+    THEN the recorded images should be generated again from the cached outputs
+        AND the LLM should not be called
+        AND the state of the prompt sampler should not change
+        AND every job of the replay should be completed
+    """
+    # Generate the images with the cache enabled
+    quotes = ["mock_quote", "Another mocked quote for the second image."]
+    mock_openai_client.generate_output.side_effect = [
+        json.dumps({"quote": quote, "caption": "mock_caption"}) for quote in quotes]
+    get_config().LLM_CACHE_MODE = 'on'
+    main(image_num=2)
+    with open(get_config().PROMPT_SAMPLER_STATE_FILE, 'r', encoding='utf-8') as f:
+        sampler_state = f.read()
+
+    # Replay the run without the LLM
+    mock_openai_client.generate_output.reset_mock()
+    mock_openai_client.generate_output.side_effect = AssertionError("The LLM must not be called")
+    get_config().LLM_CACHE_MODE = 'replay'
+    main(image_num=2)
+
+    # Check that the recorded images were replayed
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        inserted_rows = list(DictReader(f))
+
+    assert [row['quote'] for row in inserted_rows] == quotes + quotes
+    assert [row['prompt_extras'] for row in inserted_rows[2:]] \
+        == [row['prompt_extras'] for row in inserted_rows[:2]]
+    assert len(os.listdir(get_config().BASE_IMAGE_DIR)) == 4
+    mock_openai_client.generate_output.assert_not_called()
+
+    # Check that the sampler and the job queue were left consistent
+    with open(get_config().PROMPT_SAMPLER_STATE_FILE, 'r', encoding='utf-8') as f:
+        assert f.read() == sampler_state
+    job_queue_service = JobQueueService(get_config().JOB_QUEUE_FILE)
+    assert job_queue_service.count_jobs(ImageJob.SAVED) == 4
+    assert job_queue_service.get_incomplete_jobs() == []
+    job_queue_service.close()
+
+
+def test_main_process_skips_job_that_keeps_failing(mock_openai_client):
+    """
+    GIVEN a job queue that allows two attempts per job
+        AND an LLM that fails to generate the output of the first job twice
+    WHEN the main process is called three times to generate 1 image
+    THEN the first run should fail
+        AND the second run should mark the job as failed without raising
+        AND the third run should generate a new image instead of resuming the failed job
+    """
+    # Fail the generation of the first job in the first two runs
+    get_config().JOB_MAX_ATTEMPTS = 2
+    mock_openai_client.generate_output.side_effect = [
+        LlmOutputGenerationException(llm_model="mock_model"),
+        LlmOutputGenerationException(llm_model="mock_model"),
+        json.dumps({"quote": "mock_quote", "caption": "mock_caption"})
+    ]
+
+    with pytest.raises(LlmOutputGenerationException):
+        main(image_num=1)
+    main(image_num=1)
+    main(image_num=1)
+
+    # Check that the failed job was skipped, and a new image was generated
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        inserted_rows = list(DictReader(f))
+
+    assert [row['quote'] for row in inserted_rows] == ["mock_quote"]
+    job_queue_service = JobQueueService(get_config().JOB_QUEUE_FILE)
+    assert job_queue_service.count_jobs(ImageJob.FAILED) == 1
+    assert job_queue_service.count_jobs(ImageJob.SAVED) == 1
+    job_queue_service.close()
+
+
+def test_main_process_only_indexes_quotes_of_saved_assets(mock_openai_client):
+    """
+    GIVEN a job queue that allows one attempt per job
+        AND an image that fails to be saved in the first run
+    WHEN the main process is called twice to generate 1 image with the same quote
+    THEN the first run should mark its job as failed without indexing the quote
+        AND the second run should generate the same quote again, and index it once saved
+    """
+    # Fail the saving of the image in the first run
+    get_config().JOB_MAX_ATTEMPTS = 1
+    mock_openai_client.generate_output.side_effect = [
+        json.dumps({"quote": "mock_quote", "caption": "mock_caption"}) for _ in range(2)]
+
+    with patch.object(AssetManagerService, 'save_image', side_effect=OSError("Disk full")):
+        main(image_num=1)
+
+    quote_dedup_service = QuoteDedupService(index_file=get_config().QUOTE_INDEX_FILE)
+    quote_dedup_service.load()
+    assert not quote_dedup_service.is_duplicate("mock_quote")
+
+    # Generate the same quote again
+    main(image_num=1)
+
+    # Check that the quote was accepted, and indexed once saved
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        inserted_rows = list(DictReader(f))
+
+    assert [row['quote'] for row in inserted_rows] == ["mock_quote"]
+    quote_dedup_service = QuoteDedupService(index_file=get_config().QUOTE_INDEX_FILE)
+    quote_dedup_service.load()
+    assert quote_dedup_service.is_duplicate("mock_quote")
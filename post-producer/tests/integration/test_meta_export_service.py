@@ -0,0 +1,58 @@
+import os
+import shutil
+
+from PIL import Image
+
+from app.config import get_config
+from app.models.image_meta import ImageMeta
+from app.services.asset_manager_service import AssetManagerService
+from app.services.meta_export_service import MetaExportService
+
+
+def test_export_flattens_metadata_and_pushes_down_filters():
+    """
+    GIVEN the metadata of 5 images, one of them approved and one of them rejected
+    WHEN the metadata is exported with row groups of 2 rows, and read with filters
+    THEN the nested fields should be flattened into typed columns with the review status
+        AND only the matching rows should be read
+    """
+    # Save the images and their metadata
+    image_metas = [ImageMeta(
+        quote=f'quote {i}',
+        caption=f'caption {i}',
+        llm_model='test_llm_model',
+        prompt_version='1',
+        prompt_extras={'emotion': 'Joy' if i % 2 else 'Sadness', 'poetry_topic': 'Love',
+            'writing_style': 'funny', 'artistical_tool': 'irony', 'max_words': 5 + i},
+        img_meta={'quote_font': 'Modak-Regular.ttf', 'image_background': 'background_pink.png',
+            'image_width': 2000, 'image_height': 2000, 'image_margin': 151,
+            'quote_color': [0, 0, 0], 'quote_font_size': 140, 'quote_offset': 100}
+    ) for i in range(5)]
+    for image_meta in image_metas:
+        AssetManagerService.save_image(Image.new('RGB', (60, 30), color='red'), image_meta.id)
+    AssetManagerService.save_image_metas(image_metas)
+
+    # Review two of the images
+    for image_meta, directory in [(image_metas[1], get_config().APPROVED_IMAGE_DIR),
+        (image_metas[2], get_config().REJECTED_IMAGE_DIR)]:
+        shutil.move(os.path.join(get_config().BASE_IMAGE_DIR, image_meta.id + '.jpg'), directory)
+
+    # Export the metadata
+    assert MetaExportService(batch_size=2).export() == 5
+
+    # Check the flattened columns and their types
+    table = MetaExportService.read()
+    assert table.num_rows == 5
+    assert table.column('max_words').type.bit_width == 16
+    assert table.column('max_words').to_pylist() == [5, 6, 7, 8, 9]
+    assert table.column('quote_font').to_pylist() == ['Modak-Regular.ttf'] * 5
+    assert table.column('review_status').to_pylist() == \
+        ['pending', 'approved', 'rejected', 'pending', 'pending']
+
+    # Check the filtered reads
+    approved = MetaExportService.read(filters=[('review_status', '=', 'approved')], columns=['id'])
+    assert approved.column_names == ['id']
+    assert approved.column('id').to_pylist() == [image_metas[1].id]
+
+    joyful_long = MetaExportService.read(filters=[('emotion', '=', 'Joy'), ('max_words', '>', 6)])
+    assert joyful_long.column('id').to_pylist() == [image_metas[3].id]
@@ -0,0 +1,80 @@
+import os
+import json
+from csv import DictReader
+
+from app.__main__ import main
+from app.config import get_config
+from app.services.asset_manager_service import AssetManagerService
+from app.services.rerender_service import RerenderService
+
+
+def test_rerender_renders_selected_images_again(mock_openai_client):
+    """
+    GIVEN two generated assets
+        AND an image of the first asset that was deleted
+    WHEN the first asset is rendered again
+    THEN its image should be saved again
+        AND the metadata of both assets should be kept, with the quotes unchanged
+    """
+    # Generate the assets
+    quotes = ["mock_quote", "Another mocked quote for the second image."]
+    mock_openai_client.generate_output.side_effect = [
+        json.dumps({"quote": quote, "caption": "mock_caption"}) for quote in quotes]
+    main(image_num=2)
+
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        original_rows = list(DictReader(f))
+    asset_id = original_rows[0]['id']
+    os.remove(os.path.join(get_config().BASE_IMAGE_DIR, asset_id + '.jpg'))
+
+    # Render the first asset again
+    rendered_num = RerenderService(workers=2).rerender(asset_ids=[asset_id])
+
+    # Check if the image was saved again
+    assert rendered_num == 1
+    assert os.path.exists(os.path.join(get_config().BASE_IMAGE_DIR, asset_id + '.jpg'))
+
+    # Check if the metadata was kept
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        rendered_rows = list(DictReader(f))
+
+    assert [row['id'] for row in rendered_rows] == [row['id'] for row in original_rows]
+    assert [row['quote'] for row in rendered_rows] == [row['quote'] for row in original_rows]
+    assert json.loads(rendered_rows[0]['img_meta'])['quote_font'] == \
+        json.loads(original_rows[0]['img_meta'])['quote_font']
+
+
+def test_rerender_keeps_the_images_in_their_directories(mock_openai_client):
+    """
+    GIVEN three generated assets
+        AND the first asset that was approved
+        AND an image of the second asset that was deleted after it was processed
+    WHEN every asset is rendered again
+    THEN the image of the approved asset should be saved in the approved image directory
+        AND the images of the approved and processed assets should not be returned to the base image directory
+        AND the pending asset should be rendered again in the base image directory
+    """
+    # Generate the assets
+    quotes = ["mock_quote", "Another mocked quote for the second image.", "A third mocked quote."]
+    mock_openai_client.generate_output.side_effect = [
+        json.dumps({"quote": quote, "caption": "mock_caption"}) for quote in quotes]
+    main(image_num=3)
+
+    with open(get_config().IMAGE_META_FILE, 'r', encoding='utf-8') as f:
+        approved_id, processed_id, pending_id = [row['id'] for row in DictReader(f)]
+
+    # Approve the first asset and process the second one
+    AssetManagerService.move_image(approved_id, get_config().BASE_IMAGE_DIR, get_config().APPROVED_IMAGE_DIR)
+    os.remove(os.path.join(get_config().BASE_IMAGE_DIR, processed_id + '.jpg'))
+    approved_path = os.path.join(get_config().APPROVED_IMAGE_DIR, approved_id + '.jpg')
+    approved_mtime = os.stat(approved_path).st_mtime_ns
+
+    # Render every asset again
+    rendered_num = RerenderService(workers=2).rerender()
+
+    # Check if the images were kept in their directories
+    assert rendered_num == 2
+    assert os.stat(approved_path).st_mtime_ns != approved_mtime
+    assert not os.path.exists(os.path.join(get_config().BASE_IMAGE_DIR, approved_id + '.jpg'))
+    assert not os.path.exists(os.path.join(get_config().BASE_IMAGE_DIR, processed_id + '.jpg'))
+    assert os.path.exists(os.path.join(get_config().BASE_IMAGE_DIR, pending_id + '.jpg'))
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from PIL import Image
+
+from app.config import get_config
+from app.models.image_meta import ImageMeta
+from app.models.review_server import ReviewServer
+from app.services.asset_manager_service import AssetManagerService
+from app.services.review_service import ReviewService
+
+
+def save_assets(num: int) -> list[ImageMeta]:
+    """
+    Save generated images of 2000x2000 pixels with their metadata.
+    """
+    image_metas = [ImageMeta(quote=f'quote {i}', caption=f'caption {i}') for i in range(num)]
+    for image_meta in image_metas:
+        AssetManagerService.save_image(Image.new('RGB', (2000, 2000), color='red'), image_meta.id)
+    AssetManagerService.save_image_metas(image_metas)
+
+    return image_metas
+
+
+def test_thumbnails_are_cached_and_reviews_move_images():
+    """
+    GIVEN 2 generated images waiting for a review
+    WHEN their thumbnails are requested twice, and the images are approved and rejected
+    THEN the thumbnails should be generated once and fit the thumbnail size
+        AND the images should be moved to the approved and rejected image directories
+        AND an undone review should move the image back
+    """
+    # Save the generated images
+    image_metas = save_assets(2)
+    review_service = ReviewService(workers=2, thumbnail_size=256)
+
+    # Request the thumbnails twice
+    thumbnail_path = review_service.get_thumbnail(image_metas[0].id)
+    mtime = os.stat(thumbnail_path).st_mtime_ns
+    assert review_service.get_thumbnail(image_metas[0].id) == thumbnail_path
+    assert os.stat(thumbnail_path).st_mtime_ns == mtime
+    with Image.open(thumbnail_path) as thumbnail:
+        assert thumbnail.size == (256, 256)
+
+    # Review the images
+    assert [asset['quote'] for asset in review_service.get_pending_assets()] == ['quote 0', 'quote 1']
+    assert review_service.review(image_metas[0].id, ReviewService.APPROVE)
+    assert review_service.review(image_metas[1].id, ReviewService.REJECT)
+    assert not review_service.review(image_metas[1].id, ReviewService.APPROVE)
+    review_service.close()
+
+    # Check the reviewed images
+    assert os.listdir(get_config().APPROVED_IMAGE_DIR) == [image_metas[0].id + '.jpg']
+    assert os.listdir(get_config().REJECTED_IMAGE_DIR) == [image_metas[1].id + '.jpg']
+    assert review_service.get_pending_assets() == []
+
+    # Undo a review
+    assert review_service.undo(image_metas[1].id)
+    assert [asset['id'] for asset in review_service.get_pending_assets()] == [image_metas[1].id]
+
+
+def test_review_server_prefetches_thumbnails_and_reviews_images():
+    """
+    GIVEN the review server of 3 generated images
+    WHEN the pending images are requested, and an image is approved through the API
+    THEN the thumbnails of the pending images should be generated in the background
+        AND the approved image should be moved, while a malformed id should be refused
+        AND the reviews without the token of the page or from another origin should be refused
+    """
+    # Serve the review
+    image_metas = save_assets(3)
+    review_service = ReviewService(workers=2)
+    server = ReviewServer(review_service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        # Request the pending images
+        with urllib.request.urlopen(server.url + 'api/pending') as response:
+            assert [asset['id'] for asset in json.load(response)] == [image_meta.id for image_meta in image_metas]
+
+        # Check that the thumbnails are generated in the background
+        thumbnail_paths = [os.path.join(get_config().THUMBNAIL_DIR, image_meta.id + '.jpg')
+            for image_meta in image_metas]
+        deadline = time.monotonic() + 10
+        while not all(os.path.exists(path) for path in thumbnail_paths) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert all(os.path.exists(path) for path in thumbnail_paths)
+
+        # Check that the page embeds the token of the session
+        with urllib.request.urlopen(server.url) as response:
+            assert server.token in response.read().decode('utf-8')
+
+        # Approve an image through the API
+        request = urllib.request.Request(server.url + 'api/review', method='POST',
+            headers={'X-Review-Token': server.token},
+            data=json.dumps({'id': image_metas[0].id, 'decision': 'approve'}).encode('utf-8'))
+        with urllib.request.urlopen(request) as response:
+            assert json.load(response)['moved']
+        assert os.listdir(get_config().APPROVED_IMAGE_DIR) == [image_metas[0].id + '.jpg']
+
+        # Refuse a malformed id
+        request = urllib.request.Request(server.url + 'api/review', method='POST',
+            headers={'X-Review-Token': server.token},
+            data=json.dumps({'id': '../images_meta', 'decision': 'approve'}).encode('utf-8'))
+        try:
+            urllib.request.urlopen(request)
+            assert False, "The malformed id was accepted."
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+
+        # Refuse the reviews without the token, or from another origin
+        for headers in [{}, {'X-Review-Token': 'wrong-token'},
+            {'X-Review-Token': server.token, 'Origin': 'http://example.com'}]:
+            request = urllib.request.Request(server.url + 'api/review', method='POST', headers=headers,
+                data=json.dumps({'id': image_metas[1].id, 'decision': 'reject'}).encode('utf-8'))
+            try:
+                urllib.request.urlopen(request)
+                assert False, "The forged review was accepted."
+            except urllib.error.HTTPError as e:
+                assert e.code == 403
+        assert os.listdir(get_config().REJECTED_IMAGE_DIR) == []
+    finally:
+        server.shutdown()
+        server.server_close()
+        review_service.close()
@@ -0,0 +1,80 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.exceptions.quote_generator_exceptions import LlmOutputGenerationException
+from app.models.cached_quote_generator_client import CachedQuoteGeneratorClient
+
+
+def make_client(output: str = None) -> MagicMock:
+    """
+    Create a mocked quote generator client that returns the given output.
+    """
+    client = MagicMock(model="mock_model", temperature=None)
+    client.generate_output.return_value = output or json.dumps(
+        {"quote": "mock_quote", "caption": "mock_caption"})
+    client.parse_output.side_effect = lambda output: tuple(json.loads(output).values())
+    return client
+
+
+def test_generate_quote_and_caption_serves_cached_output(tmp_path):
+    """
+    GIVEN an output that was cached by a previous run
+    WHEN the same prompt is sent by a new cached client
+    THEN the cached output should be returned without calling the wrapped client
+    """
+    # Cache the output with a first run
+    CachedQuoteGeneratorClient(make_client(), cache_dir=tmp_path) \
+        .generate_quote_and_caption("prompt")
+
+    # Send the same prompt with a new run
+    client = make_client()
+    quote, caption = CachedQuoteGeneratorClient(client, cache_dir=tmp_path) \
+        .generate_quote_and_caption("prompt")
+
+    # Check that the cached output was served
+    assert (quote, caption) == ("mock_quote", "mock_caption")
+    client.generate_output.assert_not_called()
+
+
+def test_generate_output_raises_exception_on_cache_miss_in_replay_mode(tmp_path):
+    """
+    GIVEN an empty cache in replay mode
+    WHEN a prompt is sent
+    THEN an LlmOutputGenerationException should be raised without calling the wrapped client
+    """
+    # Initialize the cached client in replay mode
+    client = make_client()
+    cached_client = CachedQuoteGeneratorClient(client, cache_dir=tmp_path, replay=True)
+
+    # Check that the cache miss is not generated
+    with pytest.raises(LlmOutputGenerationException):
+        cached_client.generate_output("prompt")
+    client.generate_output.assert_not_called()
+
+
+def test_generate_output_evicts_least_recently_used_outputs(tmp_path):
+    """
+    GIVEN a cache that fits only two outputs
+    WHEN three prompts are sent, and the first one is reused before the third
+    THEN the second output should be evicted as the least recently used one
+    """
+    # Initialize the cached client with a limit of two outputs
+    output = json.dumps({"quote": "mock_quote", "caption": "mock_caption"})
+    entry_size = len(json.dumps({"model": "mock_model", "output": output}))
+    cached_client = CachedQuoteGeneratorClient(make_client(output), cache_dir=tmp_path,
+        max_bytes=2 * entry_size)
+
+    # Send the prompts, with the first one reused by a new run before the third
+    cached_client.generate_output("first")
+    cached_client.generate_output("second")
+    os.utime(os.path.join(tmp_path, cached_client._get_cache_key("second") + '.json'), (0, 0))
+    cached_client.generate_output("third")
+
+    # Check that the least recently used output was evicted
+    cached_files = set(os.listdir(tmp_path))
+    assert cached_client._get_cache_key("second") + '.json' not in cached_files
+    assert {cached_client._get_cache_key(prompt) + '.json'
+        for prompt in ("first", "third")} <= cached_files
@@ -0,0 +1,21 @@
+import os
+from unittest.mock import patch
+
+import app.config as app_config
+
+
+def test_config_does_not_require_openai_settings_with_local_backend():
+    """
+    GIVEN the local LLM backend
+        AND no OpenAI settings in the environment
+    WHEN the configuration is initialized
+    THEN it should be initialized without the OpenAI settings
+    """
+    with patch.dict(os.environ, {'LLM_BACKEND': 'local'}), patch('app.config.load_dotenv'):
+        os.environ.pop('OPENAI_API_KEY', None)
+        os.environ.pop('OPENAI_MODEL', None)
+        config = app_config.TestConfig()
+
+    assert config.LLM_BACKEND == 'local'
+    assert config.OPENAI_API_KEY is None
+    assert config.OPENAI_MODEL is None
@@ -0,0 +1,60 @@
+import csv
+import threading
+
+from app.models.image_meta import ImageMeta
+from app.services.image_meta_writer import ImageMetaWriter
+
+
+def test_concurrent_writes_are_flushed_in_batches(tmp_path):
+    """
+    GIVEN an image metadata writer with a batch size of 10 and no flush interval
+    WHEN 4 threads write 25 rows each
+    THEN the rows should be flushed in batches of 10, and all of them should be saved once closed
+    """
+    # Initialize the writer
+    image_meta_file = tmp_path / 'images_meta.csv'
+    flushed = []
+    writer = ImageMetaWriter(str(image_meta_file), batch_size=10, flush_interval=None,
+        on_flush=lambda image_metas: flushed.append(len(image_metas)))
+
+    # Write the rows from concurrent threads
+    def write_rows():
+        for _ in range(25):
+            writer.write(ImageMeta(quote='Quote, with "quotes"', img_meta={'font': 'a.ttf'}))
+
+    threads = [threading.Thread(target=write_rows) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Check that only full batches were flushed before closing
+    assert flushed == [10] * 10
+    writer.close()
+
+    # Check that every row was saved once and intact
+    with open(image_meta_file, encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 100
+    assert len({row[0] for row in rows}) == 100
+    assert all(row[1] == 'Quote, with "quotes"' for row in rows)
+
+
+def test_buffered_rows_are_flushed_after_the_interval(tmp_path):
+    """
+    GIVEN an image metadata writer with a flush interval of 50ms
+    WHEN a single row is written
+    THEN it should be saved after the interval, without closing the writer
+    """
+    # Write a row
+    image_meta_file = tmp_path / 'images_meta.csv'
+    flushed = threading.Event()
+    with ImageMetaWriter(str(image_meta_file), batch_size=10, flush_interval=0.05,
+        on_flush=lambda image_metas: flushed.set()) as writer:
+        image_meta = ImageMeta(quote='Quote')
+        writer.write(image_meta)
+        assert image_meta_file.read_text(encoding='utf-8') == ''
+
+        # Check that the row was saved after the interval
+        assert flushed.wait(timeout=1)
+        assert image_meta_file.read_text(encoding='utf-8').startswith(image_meta.id)
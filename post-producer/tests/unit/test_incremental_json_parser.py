@@ -0,0 +1,33 @@
+import pytest
+
+from app.models.incremental_json_parser import IncrementalJsonParser
+
+
+def test_feed_emits_every_field_as_soon_as_it_is_complete():
+    """
+    GIVEN an output split into chunks in the middle of keys, values and escape sequences
+    WHEN the chunks are fed to the parser one by one
+    THEN every field should be emitted by the chunk that completes it
+    """
+    # Initialize the parser and the chunks
+    parser = IncrementalJsonParser(fields=('quote', 'caption'))
+    chunks = ['{"quo', 'te": "Say \\"hi', '\\" \\u00e9"', ', "caption": "mock', '_caption"', '}']
+
+    # Feed the chunks
+    completed_fields = [parser.feed(chunk) for chunk in chunks]
+
+    # Check that the fields were emitted as soon as they were complete
+    assert completed_fields == [[], [], [('quote', 'Say "hi" é')], [], [('caption', 'mock_caption')], []]
+    assert parser.close() == {'quote': 'Say "hi" é', 'caption': 'mock_caption'}
+
+
+def test_feed_rejects_off_schema_output_early():
+    """
+    GIVEN an output that starts with an unexpected field
+    WHEN the chunk with the unexpected key is fed to the parser
+    THEN a ValueError should be raised before the rest of the output is received
+    """
+    parser = IncrementalJsonParser(fields=('quote', 'caption'))
+
+    with pytest.raises(ValueError):
+        parser.feed('{"author": ')
@@ -0,0 +1,55 @@
+from app.models.image_job import ImageJob
+from app.models.image_meta import ImageMeta
+from app.services.job_queue_service import JobQueueService
+
+
+def test_get_incomplete_jobs_returns_committed_progress_in_order(tmp_path):
+    """
+    GIVEN a job queue with three jobs, of which the first is saved and the second is generated
+    WHEN the incomplete jobs are read by a new queue instance of the same database
+    THEN the second and third jobs should be returned in order, with their committed progress
+    """
+    # Add the jobs and commit their progress
+    job_queue_service = JobQueueService(str(tmp_path / 'jobs.db'))
+    jobs = [ImageJob(image_meta=ImageMeta(prompt_extras={'emotion': 'joy'}), prompt=f"prompt_{i}")
+        for i in range(3)]
+    job_queue_service.add_jobs(jobs)
+
+    jobs[0].image_meta.update(quote="first_quote", caption="first_caption")
+    job_queue_service.update_job(jobs[0], ImageJob.SAVED)
+    jobs[1].image_meta.update(quote="second_quote", caption="second_caption")
+    job_queue_service.update_job(jobs[1], ImageJob.GENERATED)
+    job_queue_service.close()
+
+    # Read the incomplete jobs with a new queue instance
+    incomplete_jobs = JobQueueService(str(tmp_path / 'jobs.db')).get_incomplete_jobs()
+
+    # Check that the progress was committed
+    assert [job.prompt for job in incomplete_jobs] == ["prompt_1", "prompt_2"]
+    assert incomplete_jobs[0].status == ImageJob.GENERATED
+    assert incomplete_jobs[0].image_meta == jobs[1].image_meta
+    assert incomplete_jobs[1].status == ImageJob.PROMPTED
+
+
+def test_record_failure_marks_job_as_failed_after_max_attempts(tmp_path):
+    """
+    GIVEN a job queue that allows two attempts per job, with two jobs
+    WHEN the first job fails twice
+    THEN the first failure should only be counted
+        AND the second failure should mark the job as failed
+        AND only the second job should be returned as incomplete
+    """
+    # Add the jobs
+    job_queue_service = JobQueueService(str(tmp_path / 'jobs.db'), max_attempts=2)
+    jobs = [ImageJob(image_meta=ImageMeta(), prompt=f"prompt_{i}") for i in range(2)]
+    job_queue_service.add_jobs(jobs)
+
+    # Fail the first job twice
+    assert not job_queue_service.record_failure(jobs[0])
+    assert [job.attempts for job in job_queue_service.get_incomplete_jobs()] == [1, 0]
+    assert job_queue_service.record_failure(jobs[0])
+
+    # Check that the failed job is not resumed
+    assert [job.prompt for job in job_queue_service.get_incomplete_jobs()] == ["prompt_1"]
+    assert job_queue_service.count_jobs(ImageJob.FAILED) == 1
+    job_queue_service.close()
@@ -0,0 +1,31 @@
+import json
+import logging
+import queue
+
+from app.config.log_config import CorrelationQueueHandler, JsonFormatter, log_context, run_id_var
+
+
+def test_queue_handler_stamps_records_with_correlation_ids():
+    """
+    GIVEN a queue handler with a JSON formatter on the consuming side
+    WHEN a record is logged within the context of an asset
+    THEN the formatted record should contain the run and asset ids
+    """
+    # Initialize the queue handler
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger('tests.log_config')
+    logger.propagate = False
+    logger.addHandler(CorrelationQueueHandler(log_queue))
+
+    # Log a record within the context of an asset
+    with log_context(asset_id='asset-1'):
+        logger.warning("Image with name %s saved.", 'asset-1.jpg')
+    logger.warning("Outside of the asset context.")
+
+    # Check the formatted records
+    formatter = JsonFormatter()
+    records = [json.loads(formatter.format(log_queue.get())) for _ in range(2)]
+    assert records[0]['message'] == "Image with name asset-1.jpg saved."
+    assert records[0]['asset_id'] == 'asset-1'
+    assert records[1]['asset_id'] is None
+    assert all(record['run_id'] == run_id_var.get() for record in records)
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from app.config.metrics_config import MetricsRecorder
+
+
+def test_timed_records_stage_duration_as_json_line(tmp_path):
+    """
+    GIVEN a metrics recorder with a JSON lines file sink
+    WHEN a timed function succeeds and then fails
+    THEN a metric should be appended to the file for both calls with their status
+    """
+    # Initialize the metrics recorder
+    metrics_file = tmp_path / 'metrics' / 'metrics.jsonl'
+    metrics = MetricsRecorder('post-producer', str(metrics_file))
+
+    @metrics.timed('divide')
+    def divide(a, b):
+        return a / b
+
+    # Call the timed function
+    assert divide(4, 2) == 2
+    with pytest.raises(ZeroDivisionError):
+        divide(1, 0)
+
+    # Check the recorded metrics
+    records = [json.loads(line) for line in metrics_file.read_text(encoding='utf-8').splitlines()]
+    assert [(record['stage'], record['status']) for record in records] == [
+        ('divide', 'ok'), ('divide', 'error')]
+    assert all(record['component'] == 'post-producer' for record in records)
+    assert all(record['duration_ms'] >= 0 for record in records)
+
+
+def test_timed_returns_function_unchanged_when_disabled():
+    """
+    GIVEN a metrics recorder without a sink
+    WHEN a function is decorated as timed
+    THEN the original function should be returned
+    """
+    # Initialize the metrics recorder
+    metrics = MetricsRecorder('post-producer')
+
+    def noop():
+        return None
+
+    # Check that the function is not wrapped
+    assert metrics.timed('noop')(noop) is noop
@@ -0,0 +1,68 @@
+import json
+import os
+
+from app.services.prompt_builder_service import PromptBuilderService
+
+
+def test_get_prompt_variation_covers_every_combination_once_per_cycle():
+    """
+    GIVEN a prompt builder service
+    WHEN as many prompt variations are generated as there are combinations
+    THEN every combination of the quote characteristics should be used exactly once
+    """
+    # Initialize the prompt builder service
+    prompt_builder_service = PromptBuilderService()
+    space_size = prompt_builder_service._space_size
+
+    # Generate a full cycle of prompt variations
+    combinations = [tuple(prompt_builder_service.get_prompt_variation()[1].values())
+        for _ in range(space_size)]
+
+    # Check that no combination was repeated
+    assert len(set(combinations)) == space_size
+
+
+def test_get_prompt_variation_continues_from_persisted_state(tmp_path):
+    """
+    GIVEN a prompt builder service with a persisted sampler state
+    WHEN a new service is initialized with the same state file
+    THEN it should continue the cycle where the previous service stopped
+    """
+    # Generate prompt variations with the first service
+    state_file = os.path.join(tmp_path, 'prompt_sampler_state.json')
+    first_service = PromptBuilderService(state_file=state_file)
+    used_combinations = [first_service.get_prompt_variation()[1] for _ in range(3)]
+
+    # Generate the next prompt variation with a new service
+    second_service = PromptBuilderService(state_file=state_file)
+    _, prompt_extras = second_service.get_prompt_variation()
+
+    # Check that the cycle was continued
+    with open(state_file, 'r', encoding='utf-8') as f:
+        assert json.load(f)['position'] == 4
+    assert prompt_extras not in used_combinations
+
+
+def test_get_prompt_variation_prefers_heavier_weighted_values(tmp_path):
+    """
+    GIVEN a prompt builder service with a weight of 1 for joy and 0.1 for sadness
+    WHEN a full cycle of prompt variations is drawn
+    THEN joy should be used more often than sadness
+        AND no combination should be repeated within the cycle
+    """
+    # Save the sampling weights
+    weights_file = os.path.join(tmp_path, 'prompt_weights.json')
+    with open(weights_file, 'w', encoding='utf-8') as f:
+        json.dump({'emotion': {'joy': 1.0, 'sadness': 0.1}}, f)
+
+    # Draw the prompt variations of a full cycle
+    prompt_builder_service = PromptBuilderService(weights_file=weights_file)
+    combinations = []
+    while prompt_builder_service._state['cycle'] == 0:
+        combinations.append(tuple(prompt_builder_service.get_prompt_variation()[1].items()))
+    combinations.pop()
+
+    # Check that the heavier emotion was preferred, without repeating a combination
+    emotions = [dict(combination)['emotion'] for combination in combinations]
+    assert emotions.count('joy') > 3 * emotions.count('sadness')
+    assert len(set(combinations)) == len(combinations)
@@ -0,0 +1,51 @@
+import csv
+import os
+
+from app.models.image_meta import ImageMeta
+from app.services.quote_dedup_service import QuoteDedupService
+
+
+def test_is_duplicate_finds_exact_and_near_duplicates():
+    """
+    GIVEN a quote dedup index with a single quote
+    WHEN quotes that differ only in casing and punctuation, or in a single word, are checked
+    THEN they should be found as duplicates
+        AND an unrelated quote should not be
+    """
+    # Initialize the index
+    quote_dedup_service = QuoteDedupService()
+    quote_dedup_service.add("The best way out is always through the door you fear.")
+
+    # Check the duplicates
+    assert quote_dedup_service.is_duplicate("the best way out is always  through the door you fear!")
+    assert quote_dedup_service.is_duplicate("The best way out is always through the door you dread.")
+    assert not quote_dedup_service.is_duplicate("Chasing rainbows rarely buys you an umbrella.")
+
+
+def test_load_builds_index_from_image_meta_file_and_persists_it(tmp_path):
+    """
+    GIVEN an images' metadata file with a quote
+        AND no persisted quote index
+    WHEN the index is loaded twice
+    THEN the first load should build the index from the metadata file
+        AND the second load should read the persisted index
+    """
+    # Create the images' metadata file
+    image_meta_file = os.path.join(tmp_path, 'images_meta.csv')
+    with open(image_meta_file, 'w', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(ImageMeta.get_field_names())
+        writer.writerow(['1', 'Following shadows leads to light, eventually.', 'caption',
+            'model', '1.0.0', '{}', '{}'])
+    index_file = os.path.join(tmp_path, 'quote_index.bin')
+
+    # Build the index from the metadata file
+    QuoteDedupService(index_file=index_file).load(image_meta_file)
+
+    # Load the persisted index without the metadata file
+    quote_dedup_service = QuoteDedupService(index_file=index_file)
+    quote_dedup_service.load()
+
+    # Check the loaded index
+    assert os.path.getsize(index_file) == QuoteDedupService.RECORD_SIZE
+    assert quote_dedup_service.is_duplicate("Following shadows leads to light, eventually.")
@@ -1,8 +1,11 @@
 import json
+from unittest.mock import MagicMock, patch
 
 import pytest
+from openai import APIConnectionError
 
 from app.exceptions.quote_generator_exceptions import LlmOutputParsingException
+from app.models.quote_generator_client import OpenAiClient
 
 
 def test_openai_client_can_generate_quote_and_caption(mock_openai_client):
@@ -53,3 +56,32 @@ def test_openai_client_throws_exception_on_invalid_output(mock_openai_client):
     # Check that the parsing of the invalid output raises an exception
     with pytest.raises(LlmOutputParsingException):
         mock_openai_client.parse_output(output)
+
+
+def test_openai_client_retries_transient_errors():
+    """
+    GIVEN an OpenAI client whose first call fails with a connection error
+    WHEN an output is generated
+    THEN the call should be retried after a backoff
+        AND the rate limiter should be updated with the response headers
+    """
+    # Initialize the client with a failing first call
+    client = OpenAiClient(api_key="mock_api_key", model="mock_model",
+        rate_limiter=MagicMock(), max_retries=2)
+    response = MagicMock(headers={"x-ratelimit-remaining-requests": "10"})
+    response.parse.return_value.choices[0].message.content = "mock_output"
+    client.client = MagicMock()
+    client.client.chat.completions.with_raw_response.create.side_effect = [
+        APIConnectionError(request=MagicMock()),
+        response
+    ]
+
+    # Generate the output without waiting for the backoff
+    with patch('time.sleep') as mock_sleep:
+        output = client.generate_output("test_prompt")
+
+    # Check that the call was retried
+    assert output == "mock_output"
+    assert client.client.chat.completions.with_raw_response.create.call_count == 2
+    mock_sleep.assert_called_once()
+    client.rate_limiter.update.assert_called_once_with(response.headers)
@@ -0,0 +1,111 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.exceptions.quote_generator_exceptions import (
+    DuplicateQuoteException,
+    LlmOutputParsingException
+)
+from app.services.quote_dedup_service import QuoteDedupService
+from app.services.quote_generator_service import QuoteGeneratorService
+
+
+def test_get_quote_and_caption_regenerates_duplicate_quote():
+    """
+    GIVEN a quote dedup index with an already generated quote
+        AND a client that generates the same quote first, then a new one
+    WHEN a quote and caption are generated
+    THEN the new quote should be returned
+        AND it should not be added to the index before its asset is saved
+    """
+    # Initialize the index and the client
+    quote_dedup_service = QuoteDedupService()
+    quote_dedup_service.add("Following shadows leads to light, eventually.")
+    client = MagicMock(model="mock_model")
+    client.generate_quote_and_caption.side_effect = [
+        ("Following shadows leads to light, eventually!", "caption"),
+        ("Chasing rainbows rarely buys you an umbrella.", "caption")
+    ]
+    quote_generator_service = QuoteGeneratorService(client, quote_dedup_service)
+
+    # Generate the quote and caption
+    quote, _ = quote_generator_service.get_quote_and_caption("prompt")
+
+    # Check that the duplicate was regenerated
+    assert quote == "Chasing rainbows rarely buys you an umbrella."
+    assert client.generate_quote_and_caption.call_count == 2
+    assert not quote_dedup_service.is_duplicate(quote)
+
+
+def test_get_quote_and_caption_raises_exception_after_max_attempts():
+    """
+    GIVEN a client that only generates an already generated quote
+    WHEN a quote and caption are generated
+    THEN a DuplicateQuoteException should be raised after the maximum number of attempts
+    """
+    # Initialize the index and the client
+    quote_dedup_service = QuoteDedupService()
+    quote_dedup_service.add("mock_quote")
+    client = MagicMock(model="mock_model")
+    client.generate_quote_and_caption.return_value = ("mock_quote", "mock_caption")
+    quote_generator_service = QuoteGeneratorService(client, quote_dedup_service, max_attempts=2)
+
+    # Check that the generation gives up
+    with pytest.raises(DuplicateQuoteException):
+        quote_generator_service.get_quote_and_caption("prompt")
+    assert client.generate_quote_and_caption.call_count == 2
+
+
+def test_get_quote_and_caption_regenerates_unparsable_output():
+    """
+    GIVEN a client whose first output cannot be parsed
+    WHEN a quote and caption are generated
+    THEN the output should be regenerated without using a duplicate attempt
+    """
+    # Initialize the client
+    client = MagicMock(model="mock_model")
+    client.generate_quote_and_caption.side_effect = [
+        LlmOutputParsingException(llm_model="mock_model"),
+        ("mock_quote", "mock_caption")
+    ]
+    quote_generator_service = QuoteGeneratorService(client, max_attempts=1)
+
+    # Generate the quote and caption
+    quote, caption = quote_generator_service.get_quote_and_caption("prompt")
+
+    # Check that the unparsable output was regenerated
+    assert (quote, caption) == ("mock_quote", "mock_caption")
+    assert client.generate_quote_and_caption.call_count == 2
+
+
+def test_get_quote_and_caption_stops_streamed_duplicate_before_caption():
+    """
+    GIVEN a client that streams an already generated quote first, then a new one
+    WHEN a quote and caption are generated with a callback for the streamed quotes
+    THEN the duplicate's stream should be stopped before its caption
+        AND only the new quote should be passed to the callback
+    """
+    # Initialize the index and the streaming client
+    quote_dedup_service = QuoteDedupService()
+    quote_dedup_service.add("mock_quote")
+    quotes = iter(["mock_quote", "Another mocked quote."])
+    captions_generated = []
+
+    def stream_quote_and_caption(prompt):
+        quote = next(quotes)
+        yield 'quote', quote
+        captions_generated.append(quote)
+        yield 'caption', "mock_caption"
+
+    client = MagicMock(model="mock_model")
+    client.stream_quote_and_caption.side_effect = stream_quote_and_caption
+    quote_generator_service = QuoteGeneratorService(client, quote_dedup_service)
+    on_quote = MagicMock()
+
+    # Generate the quote and caption
+    quote, caption = quote_generator_service.get_quote_and_caption("prompt", on_quote=on_quote)
+
+    # Check that the duplicate was stopped and the new quote was streamed to the callback
+    assert (quote, caption) == ("Another mocked quote.", "mock_caption")
+    assert captions_generated == ["Another mocked quote."]
+    on_quote.assert_called_once_with("Another mocked quote.")
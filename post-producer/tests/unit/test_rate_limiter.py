@@ -0,0 +1,45 @@
+import time
+
+from app.models.rate_limiter import RateLimiter
+
+
+def test_acquire_waits_until_the_reset_of_exhausted_requests():
+    """
+    GIVEN a rate limiter updated with headers of exhausted remaining requests
+    WHEN a call is acquired
+    THEN it should wait until the requests are reset
+    """
+    # Initialize the rate limiter with exhausted requests
+    rate_limiter = RateLimiter(requests_per_minute=6000)
+    rate_limiter.update({
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "50ms"
+    })
+
+    # Acquire a call
+    start_time = time.monotonic()
+    with rate_limiter.limit():
+        pass
+
+    # Check that the call waited for the reset
+    assert time.monotonic() - start_time >= 0.05
+
+
+def test_throttle_halves_concurrency_and_success_grows_it_back():
+    """
+    GIVEN a rate limiter with a concurrency limit of 8
+    WHEN a call is throttled, and then calls succeed
+    THEN the concurrency limit should be halved, and then grow back additively
+    """
+    # Throttle a call
+    rate_limiter = RateLimiter(requests_per_minute=6000, max_concurrency=8)
+    rate_limiter.throttle()
+    assert rate_limiter.concurrency == 4
+
+    # Let calls succeed
+    for _ in range(4):
+        rate_limiter.acquire()
+        rate_limiter.release(success=True)
+
+    # Check that the limit grew by one slot per window of calls
+    assert 4.9 < rate_limiter.concurrency < 5.1
@@ -1,13 +1,47 @@
+import logging
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Union
-
-from azure.cosmos.cosmos_client import CosmosClient
-from azure.identity import DefaultAzureCredential
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Union
 
 from exceptions.database_client_exceptions import (
     DatabaseSelectQueryException,
     DatabaseUpdateQueryException
 )
+from models.publish_status import PublishStatus
+
+# The Azure SDKs are imported on first use to keep the cold start of the function app short
+if TYPE_CHECKING:
+    from azure.identity import DefaultAzureCredential
+
+
+# The lease owners are UUIDs. The filter predicate of a patch can't be parameterized,
+# so anything else is rejected before it gets into the predicate.
+LEASE_OWNER_PATTERN = re.compile(r'[0-9a-zA-Z_-]+')
+
+# Indexing policy of the image metadata container.
+# Only the fields used for selecting the next post are indexed, which keeps the
+# selection query on the composite index and the write costs of the large text fields low.
+IMAGE_META_INDEXING_POLICY = {
+    "indexingMode": "consistent",
+    "automatic": True,
+    "includedPaths": [
+        {"path": "/published/?"},
+        {"path": "/scheduled_at/?"},
+        {"path": "/lease_expires_at/?"},
+        {"path": "/published_at/?"}
+    ],
+    "excludedPaths": [
+        {"path": "/*"},
+        {"path": "/\"_etag\"/?"}
+    ],
+    "compositeIndexes": [
+        [
+            {"path": "/published", "order": "ascending"},
+            {"path": "/scheduled_at", "order": "ascending"}
+        ]
+    ]
+}
 
 
 class DatabaseClient(ABC):
@@ -24,15 +58,92 @@ class DatabaseClient(ABC):
         """
         pass
 
+    @abstractmethod
+    def find_next_by_published(self, published: bool) -> dict:
+        """
+        Retrieve the id and caption of the next document in the publishing queue
+        based on the published status.
+
+        Args:
+            - published: Whether the post has already been published to social media or not.
+        """
+        pass
+
+    @abstractmethod
+    def find_claimable_by_published(self, published: bool,
+        leased_before: str,
+        limit: int) -> list[dict]:
+        """
+        Retrieve the next documents in the publishing queue that are not leased
+        based on the published status.
+
+        Args:
+            - published: Whether the post has already been published to social media or not.
+            - leased_before: Leases expiring before this ISO timestamp are considered released.
+            - limit: The maximum number of documents to retrieve.
+        """
+        pass
+
+    @abstractmethod
+    def claim_lease(self, document_id: str,
+        etag: str,
+        lease_owner: str,
+        lease_expires_at: str) -> Union[dict, None]:
+        """
+        Lease a document, if it has not been modified since it was retrieved.
+
+        Args:
+            - document_id: The ID of the document to be leased.
+            - etag: The ETag of the document when it was retrieved.
+            - lease_owner: The identifier of the lease holder.
+            - lease_expires_at: The ISO timestamp when the lease expires.
+        """
+        pass
+
+    @abstractmethod
+    def release_lease(self, document_id: str,
+        lease_owner: str) -> None:
+        """
+        Release the lease of a document, if it is still held by the given owner.
+
+        Args:
+            - document_id: The ID of the leased document.
+            - lease_owner: The identifier of the lease holder.
+        """
+        pass
+
+    @abstractmethod
+    def find_last_published_at(self) -> Union[str, None]:
+        """
+        Retrieve the time when the last post was published.
+        """
+        pass
+
     @abstractmethod
     def update_published_status(self, document_id: str,
-        published: bool) -> None:
+        published: bool,
+        published_at: str = None) -> None:
         """
         Update the published status of a document in the database.
 
         Args:
             - document_id: The ID of the document to be updated.
             - published: Whether the post has already been published to social media or not.
+            - published_at: The ISO timestamp when the post was published.
+        """
+        pass
+
+    @abstractmethod
+    def update_published_statuses(self, statuses: list[PublishStatus]) -> list[str]:
+        """
+        Update the publishing outcome of multiple documents in the database,
+        if they have not been modified since they were claimed.
+
+        Args:
+            - statuses: The publishing outcomes of the documents.
+
+        Returns:
+            The IDs of the documents that were modified by someone else, and were not updated.
         """
         pass
 
@@ -48,21 +159,23 @@ class CosmosDbClient(DatabaseClient):
         - cosmos_client: The Azure Cosmos DB client instance.
         - database_client: The Azure Cosmos DB database client instance.
         - container_client: The Azure Cosmos DB container client instance.
+        - last_request_charge: The Request Units (RU) consumed by the last query.
     """
     def __init__(self, account_url: str,
         database_name: str,
         container_name: str,
-        credential: DefaultAzureCredential) -> None:
+        credential: 'DefaultAzureCredential') -> None:
         self.account_url = account_url
         self.database_name = database_name
         self.container_name = container_name
+        self.last_request_charge: float = None
         # Create the Azure Cosmos DB clients
         self._init_database_client(credential)
         self.init_container_client(container_name)
 
 
     def _init_database_client(self,
-        credential: Union[DefaultAzureCredential, Dict[str, Any]]) -> None:
+        credential: Union['DefaultAzureCredential', Dict[str, Any]]) -> None:
         """
         Initialize a database client that can be used to interact with the Azure Cosmos DB.
 
@@ -70,6 +183,8 @@ class CosmosDbClient(DatabaseClient):
             - key: The account key for the Azure Cosmos DB.
             It can be either an Azure managed identity or a master key.
         """
+        from azure.cosmos.cosmos_client import CosmosClient
+
         self.cosmos_client = CosmosClient(
             url=self.account_url,
             credential=credential
@@ -108,21 +223,235 @@ class CosmosDbClient(DatabaseClient):
         except Exception as e:
             raise DatabaseSelectQueryException(cloud_database_name="Azure Cosmos DB") from e
 
+        self._record_request_charge(query)
+
+        return results[0] if len(results) > 0 else None
+
+
+    def find_next_by_published(self, published: bool) -> Union[dict, None]:
+        """
+        Retrieve the id and caption of the next document in the publishing queue
+        based on the published status.
+
+        The query is served by the composite index on the published and scheduled_at fields,
+        and only projects the fields needed for publishing.
+        Documents without a scheduled_at field are not part of the queue.
+
+        Args:
+            - published: Whether the post has already been published to social media or not.
+        """
+        query = "SELECT TOP 1 c.id, c.caption FROM c WHERE c.published = @published " \
+            "ORDER BY c.published ASC, c.scheduled_at ASC"
+        parameters = [{"name": "@published", "value": published}]
+
+        try:
+            results = list(self.container_client.query_items(
+                query=query,
+                parameters=parameters,
+                enable_cross_partition_query=True
+            ))
+        except Exception as e:
+            raise DatabaseSelectQueryException(cloud_database_name="Azure Cosmos DB") from e
+
+        self._record_request_charge(query)
+
         return results[0] if len(results) > 0 else None
 
 
+    def find_claimable_by_published(self, published: bool,
+        leased_before: str,
+        limit: int) -> list[dict]:
+        """
+        Retrieve the id, caption and ETag of the next documents in the publishing queue
+        that are not leased, based on the published status.
+
+        Documents without a scheduled_at field are only returned once the queue is empty.
+
+        Args:
+            - published: Whether the post has already been published to social media or not.
+            - leased_before: Leases expiring before this ISO timestamp are considered released.
+            - limit: The maximum number of documents to retrieve.
+        """
+        condition = "c.published = @published " \
+            "AND (NOT IS_DEFINED(c.lease_expires_at) OR c.lease_expires_at < @leased_before)"
+        queries = [
+            "SELECT TOP @limit c.id, c.caption, c._etag FROM c WHERE " + condition
+                + " ORDER BY c.published ASC, c.scheduled_at ASC",
+            "SELECT TOP @limit c.id, c.caption, c._etag FROM c WHERE " + condition
+                + " AND NOT IS_DEFINED(c.scheduled_at)"
+        ]
+        parameters = [
+            {"name": "@published", "value": published},
+            {"name": "@leased_before", "value": leased_before},
+            {"name": "@limit", "value": limit}
+        ]
+
+        for query in queries:
+            try:
+                results = list(self.container_client.query_items(
+                    query=query,
+                    parameters=parameters,
+                    enable_cross_partition_query=True
+                ))
+            except Exception as e:
+                raise DatabaseSelectQueryException(cloud_database_name="Azure Cosmos DB") from e
+
+            self._record_request_charge(query)
+
+            if results:
+                return results
+
+        return []
+
+
+    def claim_lease(self, document_id: str,
+        etag: str,
+        lease_owner: str,
+        lease_expires_at: str) -> Union[dict, None]:
+        """
+        Lease a document in the Cosmos DB container,
+        if it has not been modified since it was retrieved.
+        Every lease is a publishing attempt, so it is counted in the document,
+        whether or not the post succeeds.
+
+        Args:
+            - document_id: The ID of the document to be leased.
+            - etag: The ETag of the document when it was retrieved.
+            - lease_owner: The identifier of the lease holder.
+            - lease_expires_at: The ISO timestamp when the lease expires.
+
+        Returns:
+            The leased document, or None if it was modified (e.g. claimed) by someone else.
+        """
+        from azure.core import MatchConditions
+        from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+        operations = [
+            { 'op': 'set', 'path': '/lease_owner', 'value': lease_owner },
+            { 'op': 'set', 'path': '/lease_expires_at', 'value': lease_expires_at },
+            { 'op': 'incr', 'path': '/publish_attempts', 'value': 1 }
+        ]
+
+        try:
+            return self.container_client.patch_item(
+                item=document_id,
+                partition_key=document_id,
+                patch_operations=operations,
+                etag=etag,
+                match_condition=MatchConditions.IfNotModified
+            )
+        except CosmosAccessConditionFailedError:
+            return None
+        except Exception as e:
+            raise DatabaseUpdateQueryException(cloud_database_name="Azure Cosmos DB") from e
+
+
+    def release_lease(self, document_id: str,
+        lease_owner: str) -> None:
+        """
+        Release the lease of a document in the Cosmos DB container,
+        if it is still held by the given owner.
+
+        Args:
+            - document_id: The ID of the leased document.
+            - lease_owner: The identifier of the lease holder.
+        """
+        from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+        if not LEASE_OWNER_PATTERN.fullmatch(lease_owner):
+            raise ValueError(f"Invalid lease owner '{lease_owner}'.")
+
+        operations = [
+            { 'op': 'remove', 'path': '/lease_owner' },
+            { 'op': 'remove', 'path': '/lease_expires_at' }
+        ]
+
+        try:
+            self.container_client.patch_item(
+                item=document_id,
+                partition_key=document_id,
+                patch_operations=operations,
+                filter_predicate=f"FROM c WHERE c.lease_owner = '{lease_owner}'"
+            )
+        except CosmosAccessConditionFailedError:
+            # The lease has expired and was claimed by someone else in the meantime
+            return
+        except Exception as e:
+            raise DatabaseUpdateQueryException(cloud_database_name="Azure Cosmos DB") from e
+
+
+    def _record_request_charge(self, query: str) -> None:
+        """
+        Record and log the Request Units (RU) consumed by the last query.
+
+        Args:
+            - query: The query that has been executed.
+        """
+        headers = self.container_client.client_connection.last_response_headers or {}
+        request_charge = headers.get('x-ms-request-charge')
+
+        self.last_request_charge = float(request_charge) if request_charge else None
+        logging.info("Query '%s' consumed %s RUs.", query, self.last_request_charge)
+
+
+    def provision_indexing_policy(self) -> None:
+        """
+        Replace the indexing policy of the container with the one required
+        by the publishing queue.
+
+        The container's partition key must be the document id.
+        Replacing the container is a control plane operation, therefore it has to be run
+        with a credential that is allowed to manage the Cosmos DB account.
+        """
+        from azure.cosmos import PartitionKey
+
+        try:
+            self.database_client.replace_container(
+                container=self.container_name,
+                partition_key=PartitionKey(path='/id'),
+                indexing_policy=IMAGE_META_INDEXING_POLICY
+            )
+        except Exception as e:
+            raise DatabaseUpdateQueryException(cloud_database_name="Azure Cosmos DB",
+                message="Failed to provision the indexing policy of the container.") from e
+
+
+    def find_last_published_at(self) -> Union[str, None]:
+        """
+        Retrieve the ISO timestamp when the last post was published.
+        """
+        query = "SELECT TOP 1 c.published_at FROM c " \
+            "WHERE IS_DEFINED(c.published_at) ORDER BY c.published_at DESC"
+
+        try:
+            results = list(self.container_client.query_items(
+                query=query,
+                enable_cross_partition_query=True
+            ))
+        except Exception as e:
+            raise DatabaseSelectQueryException(cloud_database_name="Azure Cosmos DB") from e
+
+        self._record_request_charge(query)
+
+        return results[0]['published_at'] if len(results) > 0 else None
+
+
     def update_published_status(self, document_id: str,
-        published: bool) -> None:
+        published: bool,
+        published_at: str = None) -> None:
         """
         Update the published status of a document in the Cosmos DB container.
 
         Args:
             - document_id: The ID of the document to update.
             - published: Whether the post has already been published to social media or not.
+            - published_at: The ISO timestamp when the post was published.
         """
         operations = [
             { 'op': 'set', 'path': '/published', 'value': published }
         ]
+        if published_at:
+            operations.append({ 'op': 'set', 'path': '/published_at', 'value': published_at })
 
         try:
             self.container_client.patch_item(
@@ -134,6 +463,67 @@ class CosmosDbClient(DatabaseClient):
             raise DatabaseUpdateQueryException(cloud_database_name="Azure Cosmos DB") from e
 
 
+    def update_published_statuses(self, statuses: list[PublishStatus]) -> list[str]:
+        """
+        Update the publishing outcome of multiple documents in the Cosmos DB container,
+        if they have not been modified since they were claimed.
+
+        The partition key is the document id, so the documents can't share a transactional batch.
+        Instead, the patches are sent concurrently.
+
+        Args:
+            - statuses: The publishing outcomes of the documents.
+
+        Returns:
+            The IDs of the documents that were modified by someone else, and were not updated.
+        """
+        if not statuses:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(len(statuses), 8)) as executor:
+            updated = list(executor.map(self._patch_published_status, statuses))
+
+        return [status.document_id for status, is_updated in zip(statuses, updated)
+            if not is_updated]
+
+
+    def _patch_published_status(self, status: PublishStatus) -> bool:
+        """
+        Update the publishing outcome of a document in the Cosmos DB container,
+        if its ETag still matches.
+
+        Args:
+            - status: The publishing outcome of the document.
+
+        Returns:
+            Whether the document was updated.
+        """
+        from azure.core import MatchConditions
+        from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+        operations = [
+            { 'op': 'set', 'path': '/published', 'value': status.published },
+            { 'op': 'set', 'path': '/published_at', 'value': status.published_at },
+            { 'op': 'set', 'path': '/post_ids', 'value': status.post_ids }
+        ]
+
+        try:
+            self.container_client.patch_item(
+                item=status.document_id,
+                partition_key=status.document_id,
+                patch_operations=operations,
+                etag=status.etag,
+                match_condition=MatchConditions.IfNotModified
+            )
+        except CosmosAccessConditionFailedError:
+            logging.warning("Document '%s' was modified since it was claimed.", status.document_id)
+            return False
+        except Exception as e:
+            raise DatabaseUpdateQueryException(cloud_database_name="Azure Cosmos DB") from e
+
+        return True
+
+
     def delete_all_items_from_container(self) -> None:
         """
         Delete all items from the preconfigured database container.
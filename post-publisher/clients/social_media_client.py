@@ -1,14 +1,26 @@
 import logging
+import random
+import time
 from abc import ABC, abstractmethod
 
-import requests
-
+from config.metrics_config import metrics
 from exceptions.social_media_client_exceptions import (
     InstagramMediaUploadException,
-    InstagramMediaPublishException
+    InstagramMediaPublishException,
+    InstagramMediaContainerException,
+    InstagramMediaContainerTimeoutException
 )
 
 
+def _requests():
+    """
+    Import the HTTP library on first use, to keep the cold start of the function app short.
+    """
+    import requests
+
+    return requests
+
+
 class SocialMediaClient(ABC):
     """
     Abstract class for a social media client.
@@ -18,9 +30,12 @@ class SocialMediaClient(ABC):
         image_path: str,
         caption: str,
         account_id: str,
-        access_token: str) -> None:
+        access_token: str) -> str:
         """
         Publishes a post to the social media platform.
+
+        Returns:
+            The ID of the published post.
         """
         pass
 
@@ -28,11 +43,27 @@ class SocialMediaClient(ABC):
 class InstagramClient(SocialMediaClient):
     """
     A client class for interacting with Instagram.
+
+    Attributes:
+        - container_poll_delay: The initial delay (in seconds) before the first
+          status check of a media container.
+        - container_poll_max_delay: The upper limit (in seconds) of a single backoff delay.
+        - container_poll_deadline: The maximum time (in seconds) to wait for
+          a media container to finish processing.
+        - container_metrics: Timing metrics of the last media container status polling.
     """
-    def __init__(self) -> None:
+    def __init__(self, container_poll_delay: float = 1.0,
+        container_poll_max_delay: float = 16.0,
+        container_poll_deadline: float = 120.0) -> None:
         self.name="instagram"
         self.api_version = "v20.0"
         self.base_url = "https://graph.facebook.com/" + self.api_version + "/"
+        # Media container status polling properties
+        self.container_poll_delay = container_poll_delay
+        self.container_poll_max_delay = container_poll_max_delay
+        self.container_poll_deadline = container_poll_deadline
+        self.container_metrics: dict = {}
+        self._adaptive_poll_delay = container_poll_delay
 
 
     def upload_image_to_container(self,
@@ -63,7 +94,7 @@ class InstagramClient(SocialMediaClient):
         }
 
         # Send the request to the Instagram API
-        response = requests.post(url, params=param, timeout=60)
+        response = _requests().post(url, params=param, timeout=60)
         response = response.json()
 
         if response.get('error'):
@@ -75,10 +106,103 @@ class InstagramClient(SocialMediaClient):
         return container_id
 
 
+    def get_container_status(self, container_id: str,
+        access_token: str) -> str:
+        """
+        Retrieves the processing status of a media container.
+
+        Args:
+            - container_id: The ID of the media container.
+            - access_token: The access token for the Instagram account.
+
+        Returns:
+            The status code of the container: EXPIRED, ERROR, FINISHED, IN_PROGRESS or PUBLISHED.
+        """
+        # Define the URL for querying the media container
+        url = self.base_url + container_id
+
+        # Define the parameters for the request
+        param = {
+            'access_token': access_token,
+            'fields': 'status_code,status'
+        }
+
+        # Send the request to the Instagram API
+        response = _requests().get(url, params=param, timeout=60)
+        response = response.json()
+
+        if response.get('error'):
+            logging.error("Failed to retrieve the status of Instagram's media container.")
+            raise InstagramMediaContainerException(status_code=None,
+                error_message=response['error']['message'])
+
+        return response['status_code']
+
+
+    def wait_for_container(self, container_id: str,
+        access_token: str) -> None:
+        """
+        Waits until Instagram finishes processing the media container.
+
+        The container status is polled with exponential backoff and equal jitter,
+        until it is finished or the deadline is reached.
+        The first delay adapts to the processing time of the previous container,
+        so that subsequent posts are not polled earlier than they are likely to be ready.
+
+        Args:
+            - container_id: The ID of the media container.
+            - access_token: The access token for the Instagram account.
+        """
+        start_time = time.monotonic()
+        deadline = start_time + self.container_poll_deadline
+        delay = self._adaptive_poll_delay
+        polls = 0
+
+        while True:
+            status_code = self.get_container_status(container_id, access_token)
+            polls += 1
+            waited_seconds = time.monotonic() - start_time
+
+            if status_code in ('FINISHED', 'PUBLISHED'):
+                break
+
+            if status_code != 'IN_PROGRESS':
+                logging.error("Instagram's media container '%s' has status '%s'.",
+                    container_id, status_code)
+                raise InstagramMediaContainerException(status_code=status_code)
+
+            remaining_seconds = deadline - time.monotonic()
+            if remaining_seconds <= 0:
+                logging.error("Instagram's media container '%s' was not ready after %.2f seconds.",
+                    container_id, waited_seconds)
+                raise InstagramMediaContainerTimeoutException(status_code=status_code,
+                    waited_seconds=waited_seconds)
+
+            # Sleep for a random time in the upper half of the current backoff window, so the adapted
+            # first delay is not cut short, without passing the deadline
+            time.sleep(min(random.uniform(delay / 2, delay), remaining_seconds))
+            delay = min(delay * 2, self.container_poll_max_delay)
+
+        self.container_metrics = {
+            'container_id': container_id,
+            'status_code': status_code,
+            'polls': polls,
+            'wait_seconds': waited_seconds
+        }
+        metrics.record('wait_for_container', waited_seconds, status=status_code, polls=polls)
+        logging.info("Instagram's media container '%s' is ready after %.2f seconds and %s polls.",
+            container_id, waited_seconds, polls)
+
+        # Adapt the first delay of the next container to the last processing time
+        self._adaptive_poll_delay = min(max(waited_seconds / 2, self.container_poll_delay),
+            self.container_poll_max_delay)
+
+
+    @metrics.timed('publish_post')
     def publish_post(self, image_path: str,
         caption: str,
         account_id: str,
-        access_token: str) -> None:
+        access_token: str) -> str:
         """
         Uploads an image post with a caption to Instagram.
 
@@ -87,6 +211,9 @@ class InstagramClient(SocialMediaClient):
             - caption: The caption for the image.
             - account_id: The ID of the Instagram account where the post will be published.
             - access_token: The access token for the Instagram account.
+
+        Returns:
+            The ID of the published Instagram post.
         """
         logging.info("Uploading post to Instagram...")
 
@@ -101,6 +228,9 @@ class InstagramClient(SocialMediaClient):
             access_token=access_token
         )
 
+        # Wait until Instagram has fetched and processed the image
+        self.wait_for_container(container_id, access_token)
+
         # Define the parameters for the request
         param = {
             'access_token': access_token,
@@ -108,7 +238,7 @@ class InstagramClient(SocialMediaClient):
         }
 
         # Publish the post to Instagram
-        response = requests.post(url, params=param, timeout=60)
+        response = _requests().post(url, params=param, timeout=60)
         response = response.json()
 
         if response.get('error'):
@@ -117,3 +247,5 @@ class InstagramClient(SocialMediaClient):
                 error_message=response['error']['message'])
 
         logging.info("Post with ID '%s' uploaded to Instagram successfully.", response['id'])
+
+        return response['id']
@@ -1,14 +1,14 @@
 import datetime
 import logging
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
-from azure.identity import DefaultAzureCredential
-from azure.storage.blob import (
-    BlobServiceClient,
-    BlobSasPermissions,
-    UserDelegationKey,
-    generate_blob_sas
-)
+from config.metrics_config import metrics
+
+# The Azure SDKs are imported on first use to keep the cold start of the function app short
+if TYPE_CHECKING:
+    from azure.identity import DefaultAzureCredential
+    from azure.storage.blob import UserDelegationKey
 
 
 class StorageClient(ABC):
@@ -38,20 +38,22 @@ class AzureStorageClient(StorageClient):
     """
     def __init__(self, account_url: str,
         container_name: str,
-        credential: DefaultAzureCredential) -> None:
+        credential: 'DefaultAzureCredential') -> None:
         self.account_url = account_url
         self.container_name = container_name
         # Create a client that will access the blobs in the Storage Account's container
         self._init_blob_service_client(credential)
 
 
-    def _init_blob_service_client(self, credential: DefaultAzureCredential) -> None:
+    def _init_blob_service_client(self, credential: 'DefaultAzureCredential') -> None:
         """
         Initialize the Azure Blob Storage container client.
 
         Args:
             - credential: The Azure credential to authenticate the client.
         """
+        from azure.storage.blob import BlobServiceClient
+
         self.blob_service_client = BlobServiceClient(
             account_url=self.account_url,
             container_name=self.container_name,
@@ -60,7 +62,7 @@ class AzureStorageClient(StorageClient):
         self.container_client = self.blob_service_client.get_container_client(self.container_name)
 
 
-    def _request_user_delegation_key(self) -> UserDelegationKey:
+    def _request_user_delegation_key(self) -> 'UserDelegationKey':
         """
         Request a user delegation key for signing SAS tokens 
         that enables permissioned access to blobs in the authenticated Storage Account.
@@ -81,6 +83,7 @@ class AzureStorageClient(StorageClient):
         return user_delegation_key
 
 
+    @metrics.timed('get_access_token')
     def get_access_token(self, file_name: str) -> str:
         """
         Get a short-lived read-only access token for the given file.
@@ -91,6 +94,8 @@ class AzureStorageClient(StorageClient):
         Args:
             - file_name: The name of the file to get the access token for.
         """
+        from azure.storage.blob import BlobSasPermissions, generate_blob_sas
+
         # Initialize a BlobClient for the given blob
         blob_client = self.blob_service_client.get_blob_client(
             container=self.container_name,
@@ -19,6 +19,10 @@ class Config:
         self.COSMOSDB_CONTAINER_NAME = os.environ['COSMOSDB_CONTAINER_NAME']
         # Azure Key Vault credentials
         self.KEYVAULT_URL = os.environ['KEYVAULT_URL']
+        # Posting plan, by default one post per day at 17:00 UTC
+        self.PUBLISH_SLOTS = os.environ.get('PUBLISH_SLOTS', '17:00')
+        self.PUBLISH_TIMEZONE = os.environ.get('PUBLISH_TIMEZONE', 'UTC')
+        self.PUBLISH_MAX_POSTS_PER_RUN = os.environ.get('PUBLISH_MAX_POSTS_PER_RUN', '1')
 
 
 class TestConfig:
@@ -38,6 +42,10 @@ class TestConfig:
         self.COSMOSDB_CONTAINER_NAME = os.environ['TEST_COSMOSDB_CONTAINER_NAME']
         # Azure Key Vault credentials
         self.KEYVAULT_URL = 'test_keyvault_url'
+        # Posting plan
+        self.PUBLISH_SLOTS = '17:00'
+        self.PUBLISH_TIMEZONE = 'UTC'
+        self.PUBLISH_MAX_POSTS_PER_RUN = '1'
 
 
 # Initialize the Config class as a global variable
@@ -33,3 +33,31 @@ class InstagramMediaPublishException(SocialMediaException):
         super().__init__(message)
         self.error_code = error_code
         self.error_message = error_message
+
+
+class InstagramMediaContainerException(SocialMediaException):
+    """
+    Exception raised when Instagram fails to process the image in a media container,
+    or when the container's status cannot be retrieved.
+
+    Read more about the container statuses here:
+    https://developers.facebook.com/docs/instagram-platform/instagram-graph-api/reference/ig-container
+    """
+    def __init__(self, status_code: str,
+        error_message: str = None,
+        message: str = "Instagram's media container is not ready to be published."):
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_message = error_message
+
+
+class InstagramMediaContainerTimeoutException(InstagramMediaContainerException):
+    """
+    Exception raised when Instagram does not finish processing the media container
+    within the configured deadline.
+    """
+    def __init__(self, status_code: str,
+        waited_seconds: float,
+        message: str = "Instagram's media container was not ready before the deadline."):
+        super().__init__(status_code=status_code, message=message)
+        self.waited_seconds = waited_seconds
@@ -1,15 +1,18 @@
 import os
+import datetime
 import logging
 
 import azure.functions as func
-from azure.identity import DefaultAzureCredential
-from azure.keyvault.secrets import SecretClient
 
 from config import init_config
 from clients.database_client import CosmosDbClient
 from clients.storage_client import AzureStorageClient
 from clients.social_media_client import InstagramClient
+from models.publish_plan import PublishPlan
+from models.publish_status import PublishStatus
 from services.asset_manager_service import AssetManagerService
+from services.publish_queue_service import PublishQueueService
+from services.publish_schedule_service import PublishScheduleService
 from services.social_media_manager_service import SocialMediaManagerService
 
 
@@ -19,14 +22,17 @@ app = func.FunctionApp()
 # Python v2 model currently does not support the use of Microsoft Entra ID
 # for authentication in function bindings.
 # Therefore, the bindings initialization is done in the main function.
-@app.schedule(schedule="0 0 17 * * *",
+# The schedule is read from the PUBLISH_SCHEDULE app setting, so it can be changed without
+# redeploying. It must fire at least at every slot of the posting plan.
+@app.schedule(schedule="%PUBLISH_SCHEDULE%",
     arg_name="myTimer",
     run_on_startup=False,
     use_monitor=False)
 def timer_trigger(myTimer: func.TimerRequest) -> None:
     """
-    Timer trigger function that runs every day at 17:00 and checks for unpublished approved images.
-    In the case of any, it will pick one and publish it to the configured social media accounts.
+    Timer trigger function that checks whether any slot of the posting plan is due.
+    For each due slot, it picks an unpublished approved image and publishes it
+    to the configured social media accounts.
     
     This is the entry point for the Azure Function App.
     """
@@ -42,9 +48,20 @@ def main():
     # Set the environment configuration
     config = init_config(os.environ['UUPS_ENV'])
 
+    # The Azure SDKs are imported on first use to keep the cold start short
+    from azure.identity import DefaultAzureCredential
+
     # Initialize authentication with managed identity
     default_credential = DefaultAzureCredential()
 
+    # Initialize the Cosmos DB client that stores the images' metadata
+    database_client = CosmosDbClient(
+        account_url=config.COSMOSDB_ACCOUNT_URL,
+        database_name=config.COSMOSDB_DATABASE_NAME,
+        container_name=config.COSMOSDB_CONTAINER_NAME,
+        credential=default_credential
+    )
+
     # Initialize the asset manager for Azure Storage Account and Cosmos DB
     asset_manager_service = AssetManagerService(
         storage_client=AzureStorageClient(
@@ -52,37 +69,79 @@ def main():
             container_name=config.STORAGE_CONTAINER_NAME,
             credential=default_credential
         ),
-        database_client=CosmosDbClient(
-            account_url=config.COSMOSDB_ACCOUNT_URL,
-            database_name=config.COSMOSDB_DATABASE_NAME,
-            container_name=config.COSMOSDB_CONTAINER_NAME,
-            credential=default_credential
-        )
+        database_client=database_client
     )
 
-    # Check if there are any unpublished approved images
-    image_meta = asset_manager_service.get_approved_image_meta()
-    if not image_meta:
-        logging.info("No unpublished images found.")
+    # Check which slots of the posting plan are due since the last published post
+    publish_schedule_service = PublishScheduleService(
+        PublishPlan.parse(
+            slots=config.PUBLISH_SLOTS,
+            timezone=config.PUBLISH_TIMEZONE,
+            max_posts_per_run=config.PUBLISH_MAX_POSTS_PER_RUN
+        )
+    )
+    due_slots = publish_schedule_service.get_due_slots(
+        now=datetime.datetime.now(datetime.timezone.utc),
+        last_published_at=asset_manager_service.get_last_published_at()
+    )
+    if not due_slots:
+        logging.info("No posts are due.")
         return
 
-    # Retrieve the image from the blob storage
-    img_path = asset_manager_service.get_image_path(image_meta)
-
     # Initialize the Key Vault service that stores social media account credentials
+    from azure.keyvault.secrets import SecretClient
+
     key_vault_client = SecretClient(config.KEYVAULT_URL, default_credential)
 
-    # Initialize the social media manager service
+    # Initialize the social media manager service, shared by all due posts
     social_media_manager_service = SocialMediaManagerService(key_vault_client)
     social_media_manager_service.add_social_media_account(InstagramClient())
 
-    # Upload post to all registered social media accounts
-    social_media_manager_service.publish_posts(
-        image_path=img_path,
-        caption=image_meta['caption']
-    )
-
-    # Update the published status of the image in the database
-    asset_manager_service.update_published_status(image_meta)
+    publish_queue_service = PublishQueueService(database_client)
+    published_statuses: list[PublishStatus] = []
+    # The statuses of the run are written at once, concurrently, even if a later post fails,
+    # so the published images are not left claimed and published again once their leases expire
+    try:
+        for due_slot in due_slots:
+            # Claim the next unpublished approved image, so overlapping runs can't publish it
+            image_meta = publish_queue_service.claim_next()
+            if not image_meta:
+                logging.info("No unpublished images found.")
+                break
+
+            logging.info("Publishing image with id '%s' for slot %s.",
+                image_meta['id'], due_slot.isoformat())
+
+            try:
+                # Retrieve the image from the blob storage
+                img_path = asset_manager_service.get_image_path(image_meta)
+
+                # Upload post to all registered social media accounts
+                post_ids = social_media_manager_service.publish_posts(
+                    image_path=img_path,
+                    caption=image_meta['caption']
+                )
+            except Exception as e:
+                # Nothing was published, hand the image back to the queue
+                publish_queue_service.release(image_meta)
+                raise e
+
+            if not post_ids:
+                # The post failed on every account, hand the image back to the queue.
+                # Otherwise it is published, with the post ids of the accounts that succeeded.
+                logging.error("Image with id '%s' was not published to any account.", image_meta['id'])
+                publish_queue_service.release(image_meta)
+                break
+
+            published_statuses.append(PublishStatus(
+                document_id=image_meta['id'],
+                etag=image_meta['_etag'],
+                published=True,
+                published_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                post_ids=post_ids
+            ))
+    finally:
+        if published_statuses:
+            asset_manager_service.update_published_statuses(published_statuses)
 
     logging.info('Function execution completed successfully.')
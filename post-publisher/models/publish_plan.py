@@ -0,0 +1,38 @@
+import datetime
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PublishPlan:
+    """
+    This class holds the posting plan of the social media accounts.
+
+    Attributes:
+        - slots: The local times of the day when a post is due.
+        - timezone: The IANA name of the timezone the slots are given in.
+        - max_posts_per_run: The maximum number of posts published in a single run,
+          when catching up on missed slots.
+    """
+    slots: list[datetime.time] = field(default_factory=lambda: [datetime.time(17, 0)])
+    timezone: str = "UTC"
+    max_posts_per_run: int = 1
+
+
+    @staticmethod
+    def parse(slots: str,
+        timezone: str,
+        max_posts_per_run: str) -> 'PublishPlan':
+        """
+        Create a posting plan from its configuration values.
+
+        Args:
+            - slots: Comma separated list of the slots in HH:MM format. E.g.: '09:00,17:00'
+            - timezone: The IANA name of the timezone. E.g.: 'Europe/Budapest'
+            - max_posts_per_run: The maximum number of posts published in a single run.
+        """
+        return PublishPlan(
+            slots=sorted(datetime.time.fromisoformat(slot.strip())
+                for slot in slots.split(',') if slot.strip()),
+            timezone=timezone,
+            max_posts_per_run=int(max_posts_per_run)
+        )
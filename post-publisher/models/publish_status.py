@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PublishStatus:
+    """
+    This class holds the outcome of publishing an image, to be stored with its metadata.
+
+    Attributes:
+        - document_id: The ID of the image's metadata document.
+        - etag: The ETag of the metadata document when it was claimed.
+        - published: Whether the post has already been published to social media or not.
+        - published_at: The ISO timestamp when the post was published.
+        - post_ids: The IDs of the published posts, keyed by the social media platform's name.
+    """
+    document_id: str
+    etag: str
+    published: bool
+    published_at: str
+    post_ids: dict = field(default_factory=dict)
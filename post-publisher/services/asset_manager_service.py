@@ -1,3 +1,4 @@
+import datetime
 import logging
 from typing import Union
 
@@ -8,6 +9,7 @@ from exceptions.database_client_exceptions import (
     DatabaseSelectQueryException,
     DatabaseUpdateQueryException
 )
+from models.publish_status import PublishStatus
 
 
 class AssetManagerService:
@@ -22,10 +24,14 @@ class AssetManagerService:
 
     def get_approved_image_meta(self) -> Union[dict, None]:
         """
-        Retrieves the metadata of an approved image from the Cosmos DB.
+        Retrieves the metadata of the next approved image from the Cosmos DB.
+
+        Documents that were migrated before the publishing queue was introduced
+        have no scheduled_at field, these are picked up once the queue is empty.
         """
         try:
-            return self.database_client.find_one_by_published(published=False)
+            return self.database_client.find_next_by_published(published=False) \
+                or self.database_client.find_one_by_published(published=False)
         except DatabaseSelectQueryException as e:
             logging.error("%s failed to retrieve approved image metadata.",
                 e.cloud_database_name, exc_info=True)
@@ -51,6 +57,20 @@ class AssetManagerService:
         return img_url
 
 
+    def get_last_published_at(self) -> Union[datetime.datetime, None]:
+        """
+        Retrieves the time when the last image was published.
+        """
+        try:
+            last_published_at = self.database_client.find_last_published_at()
+        except DatabaseSelectQueryException as e:
+            logging.error("%s failed to retrieve the last publishing time.",
+                e.cloud_database_name, exc_info=True)
+            raise e
+
+        return datetime.datetime.fromisoformat(last_published_at) if last_published_at else None
+
+
     def update_published_status(self, image_meta: dict) -> None:
         """
         Update the published status of an image in the database.
@@ -61,9 +81,29 @@ class AssetManagerService:
         try:
             self.database_client.update_published_status(
                 document_id=image_meta['id'],
-                published=True
+                published=True,
+                published_at=datetime.datetime.now(datetime.timezone.utc).isoformat()
             )
         except DatabaseUpdateQueryException as e:
             logging.error("%s failed to update image metadata in database",
                 e.cloud_database_name, exc_info=True)
             raise e
+
+
+    def update_published_statuses(self, statuses: list[PublishStatus]) -> None:
+        """
+        Update the publishing outcome of multiple images in the database at once.
+
+        Args:
+            - statuses: The publishing outcomes of the images.
+        """
+        try:
+            conflicting_ids = self.database_client.update_published_statuses(statuses)
+        except DatabaseUpdateQueryException as e:
+            logging.error("%s failed to update image metadata in database",
+                e.cloud_database_name, exc_info=True)
+            raise e
+
+        if conflicting_ids:
+            logging.error("Images with ids %s were claimed by another run while being published.",
+                conflicting_ids)
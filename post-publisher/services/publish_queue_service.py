@@ -0,0 +1,120 @@
+import datetime
+import logging
+import uuid
+from collections import deque
+from typing import Union
+
+from clients.database_client import DatabaseClient
+from exceptions.database_client_exceptions import (
+    DatabaseSelectQueryException,
+    DatabaseUpdateQueryException
+)
+
+
+class PublishQueueService:
+    """
+    Service class that hands out the approved images for publishing in their scheduled order.
+
+    An image is claimed by leasing its metadata document with an ETag-conditional update,
+    so overlapping runs never publish the same image. The lease expires after a while,
+    so the images of a crashed run are picked up again by the next run.
+
+    Attributes:
+        - database_client: The client for the database that stores the images' metadata.
+        - lease_duration: The time for which a claimed image is reserved for this run.
+        - prefetch_size: The number of queued images retrieved with a single query.
+        - lease_owner: The unique identifier of this run, used as the holder of the leases.
+    """
+    def __init__(self, database_client: DatabaseClient,
+        lease_duration: datetime.timedelta = datetime.timedelta(minutes=10),
+        prefetch_size: int = 5) -> None:
+        self.database_client = database_client
+        self.lease_duration = lease_duration
+        self.prefetch_size = prefetch_size
+        self.lease_owner = str(uuid.uuid4())
+        self._candidates: deque[dict] = deque()
+
+
+    def claim_next(self) -> Union[dict, None]:
+        """
+        Claims the next image in the publishing queue.
+
+        The candidates are served from the prefetched queue items, which is refilled
+        with a single query when it runs empty. Candidates that were modified or claimed
+        by another run since they were prefetched are skipped.
+
+        Returns:
+            The metadata of the claimed image, or None if the queue is empty.
+        """
+        refilled = False
+
+        while True:
+            if not self._candidates:
+                # Stop if even the freshly retrieved candidates could not be claimed
+                if refilled:
+                    return None
+                self._prefetch()
+                refilled = True
+
+                if not self._candidates:
+                    return None
+
+            candidate = self._candidates.popleft()
+            lease_expires_at = datetime.datetime.now(datetime.timezone.utc) + self.lease_duration
+
+            try:
+                claimed = self.database_client.claim_lease(
+                    document_id=candidate['id'],
+                    etag=candidate['_etag'],
+                    lease_owner=self.lease_owner,
+                    lease_expires_at=lease_expires_at.isoformat()
+                )
+            except DatabaseUpdateQueryException as e:
+                logging.error("%s failed to claim image metadata.",
+                    e.cloud_database_name, exc_info=True)
+                raise e
+
+            if claimed:
+                logging.info("Image with id '%s' claimed for publishing.", candidate['id'])
+                return claimed
+
+            logging.info("Image with id '%s' was claimed by another run.", candidate['id'])
+
+
+    def release(self, image_meta: dict) -> None:
+        """
+        Releases a claimed image, so it can be claimed again without waiting for its lease
+        to expire.
+
+        Args:
+            - image_meta: The metadata of the claimed image.
+        """
+        try:
+            self.database_client.release_lease(
+                document_id=image_meta['id'],
+                lease_owner=self.lease_owner
+            )
+        except DatabaseUpdateQueryException as e:
+            logging.error("%s failed to release image metadata.",
+                e.cloud_database_name, exc_info=True)
+            raise e
+
+
+    def _prefetch(self) -> None:
+        """
+        Retrieves the next unleased images of the publishing queue.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        try:
+            candidates = self.database_client.find_claimable_by_published(
+                published=False,
+                leased_before=now.isoformat(),
+                limit=self.prefetch_size
+            )
+        except DatabaseSelectQueryException as e:
+            logging.error("%s failed to retrieve the publishing queue.",
+                e.cloud_database_name, exc_info=True)
+            raise e
+
+        self._candidates.extend(candidates)
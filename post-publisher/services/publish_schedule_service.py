@@ -0,0 +1,77 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+from models.publish_plan import PublishPlan
+
+
+class PublishScheduleService:
+    """
+    Service class that computes which slots of the posting plan are due.
+
+    Attributes:
+        - publish_plan: The posting plan of the social media accounts.
+        - grace_period: Slots that are due within this period are considered due already,
+          to tolerate timer triggers that fire slightly early.
+    """
+    def __init__(self, publish_plan: PublishPlan,
+        grace_period: datetime.timedelta = datetime.timedelta(minutes=1)) -> None:
+        self.publish_plan = publish_plan
+        self.grace_period = grace_period
+
+
+    def get_due_slots(self, now: datetime.datetime,
+        last_published_at: datetime.datetime = None) -> list[datetime.datetime]:
+        """
+        Get the slots that passed since the last published post, in chronological order.
+
+        When catching up after an outage, only the latest slots are returned,
+        up to the maximum number of posts per run.
+        Without any previously published post, only the latest passed slot is due.
+
+        Args:
+            - now: The current time, timezone aware.
+            - last_published_at: The time of the last published post, timezone aware.
+        """
+        timezone = ZoneInfo(self.publish_plan.timezone)
+        local_now = now.astimezone(timezone) + self.grace_period
+
+        # Every day has at least one slot, so looking further back than
+        # the maximum posts per run is unnecessary
+        lookback_start = local_now - datetime.timedelta(days=self.publish_plan.max_posts_per_run)
+        if last_published_at is None:
+            start = lookback_start
+        else:
+            start = max(self._get_covered_slot(last_published_at.astimezone(timezone)), lookback_start)
+
+        due_slots = []
+        day = start.date()
+        while day <= local_now.date():
+            for slot in self.publish_plan.slots:
+                slot_time = datetime.datetime.combine(day, slot, tzinfo=timezone)
+                if start < slot_time <= local_now:
+                    due_slots.append(slot_time)
+            day += datetime.timedelta(days=1)
+
+        if last_published_at is None:
+            return due_slots[-1:]
+
+        return due_slots[-self.publish_plan.max_posts_per_run:]
+
+
+    def _get_covered_slot(self, published_at: datetime.datetime) -> datetime.datetime:
+        """
+        Get the time up to which the slots are covered by a post.
+
+        A post published early, within the grace period before a slot, covered that slot,
+        so its publishing time is rounded up to the slot.
+
+        Args:
+            - published_at: The time of the post, in the timezone of the posting plan.
+        """
+        for day in [published_at.date(), published_at.date() + datetime.timedelta(days=1)]:
+            for slot in self.publish_plan.slots:
+                slot_time = datetime.datetime.combine(day, slot, tzinfo=published_at.tzinfo)
+                if published_at < slot_time <= published_at + self.grace_period:
+                    return slot_time
+
+        return published_at
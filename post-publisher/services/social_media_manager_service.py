@@ -1,16 +1,18 @@
 import logging
-
-from azure.keyvault.secrets import SecretClient
-from azure.core.exceptions import ResourceNotFoundError
+from typing import TYPE_CHECKING
 
 from clients.social_media_client import SocialMediaClient
 
+# The Azure SDKs are imported on first use to keep the cold start of the function app short
+if TYPE_CHECKING:
+    from azure.keyvault.secrets import SecretClient
+
 
 class SocialMediaManagerService:
     """
     Service class that manages the posting of images to social media accounts.
     """
-    def __init__(self, secret_client: SecretClient) -> None:
+    def __init__(self, secret_client: 'SecretClient') -> None:
         self.secret_client = secret_client
         self.social_media_clients: list[SocialMediaClient] = []
 
@@ -26,7 +28,7 @@ class SocialMediaManagerService:
 
 
     def publish_posts(self, image_path: str,
-        caption: str) -> None:
+        caption: str) -> dict[str, str]:
         """
         Publishes a post to all registered social media accounts.
 
@@ -35,7 +37,13 @@ class SocialMediaManagerService:
         Args:
             - image_path: The path of the image to be uploaded.
             - caption: The caption for the image.
+
+        Returns:
+            The IDs of the published posts, keyed by the social media platform's name.
         """
+        from azure.core.exceptions import ResourceNotFoundError
+
+        post_ids = {}
         for social_media_client in self.social_media_clients:
             try:
                 # Retrieve the credentials for the social media account
@@ -46,10 +54,15 @@ class SocialMediaManagerService:
             except ResourceNotFoundError:
                 logging.error("Failed to get credentials for %s.", social_media_client.name)
                 continue
+            except Exception:
+                # The posts of the previous accounts are kept, continue with the next account
+                logging.error("Failed to retrieve credentials for %s.", social_media_client.name,
+                    exc_info=True)
+                continue
 
             try:
                 # Publish the post to the social media account
-                social_media_client.publish_post(
+                post_ids[social_media_client.name] = social_media_client.publish_post(
                     image_path=image_path,
                     caption=caption,
                     account_id=account_id,
@@ -58,3 +71,5 @@ class SocialMediaManagerService:
             except Exception:
                 # Error is logged already, continue with the next account
                 continue
+
+        return post_ids
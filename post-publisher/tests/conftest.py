@@ -10,6 +10,7 @@ pytest_plugins = [
     "tests.fixtures.asset_manager_service_fixtures",
     "tests.fixtures.authentication_fixtures",
     "tests.fixtures.database_client_fixtures",
+    "tests.fixtures.publish_queue_service_fixtures",
     "tests.fixtures.secret_client_fixtures",
     "tests.fixtures.social_media_client_fixtures",
     "tests.fixtures.storage_client_fixtures",
@@ -1,7 +1,6 @@
 import os
 from typing import Generator
 
-from PIL import Image
 from azure.storage.blob import ContentSettings
 
 import pytest
@@ -17,14 +16,14 @@ def dummy_img_in_blob_storage(
     """
     Upload a dummy image to the test blob storage container.
     """
-    # Create a dummy image
+    # Create a dummy image with the raw pixels of a black 10x10 RGB image
     image_name = '123.jpg'
-    image = Image.new('RGB', (10, 10))
+    image_data = bytes(10 * 10 * 3)
 
     # Upload the dummy image to the test container
     test_storage_account_client.container_client.upload_blob(
         name=image_name,
-        data=image.tobytes(),
+        data=image_data,
         content_settings=ContentSettings(
             content_type="image/jpg"
         ))
@@ -19,7 +19,20 @@ def mock_cosmosdb_client() -> Generator[CosmosDbClient, None, None]:
             "id": "123",
             "published": False
         }), \
-        patch.object(CosmosDbClient, 'update_published_status', return_value=None):
+        patch.object(CosmosDbClient, 'find_next_by_published', return_value={
+            "id": "123",
+            "caption": "test caption"
+        }), \
+        patch.object(CosmosDbClient, 'find_claimable_by_published', return_value=[
+            {"id": "123", "caption": "test caption", "_etag": "etag-123"},
+            {"id": "456", "caption": "test caption", "_etag": "etag-456"}
+        ]), \
+        patch.object(CosmosDbClient, 'claim_lease',
+            side_effect=lambda document_id, **kwargs: {"id": document_id, "_etag": "new-etag"}), \
+        patch.object(CosmosDbClient, 'release_lease', return_value=None), \
+        patch.object(CosmosDbClient, 'find_last_published_at', return_value=None), \
+        patch.object(CosmosDbClient, 'update_published_status', return_value=None), \
+        patch.object(CosmosDbClient, 'update_published_statuses', return_value=[]):
         mock_instance = CosmosDbClient(
             account_url=get_config().COSMOSDB_ACCOUNT_URL,
             database_name=get_config().COSMOSDB_DATABASE_NAME,
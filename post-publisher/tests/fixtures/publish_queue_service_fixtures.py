@@ -0,0 +1,12 @@
+import pytest
+
+from clients.database_client import CosmosDbClient
+from services.publish_queue_service import PublishQueueService
+
+
+@pytest.fixture
+def mock_publish_queue_service(mock_cosmosdb_client: CosmosDbClient) -> PublishQueueService:
+    """
+    Creates a default PublishQueueService instance with a mocked database client.
+    """
+    return PublishQueueService(database_client=mock_cosmosdb_client)
@@ -1,6 +1,6 @@
 from typing import Generator
 
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import pytest
 
 from clients.social_media_client import InstagramClient
@@ -32,3 +32,31 @@ def mock_instagram_clients() -> Generator[list[InstagramClient], None, None]:
         patch.object(mock_instance_2, 'upload_image_to_container', return_value='0002'), \
         patch.object(mock_instance_2, 'publish_post', return_value=None):
         yield [mock_instance_1, mock_instance_2]
+
+
+@pytest.fixture
+def make_instagram_client_with_container_statuses():
+    """
+    Return a function that creates an Instagram client, whose media container
+    status requests return the given status codes in order.
+    The sleeps between the status requests are mocked.
+    """
+    patchers = []
+
+    def get_instagram_client(status_codes: list[str]) -> InstagramClient:
+        responses = [MagicMock(**{'json.return_value': {'status_code': status_code}})
+            for status_code in status_codes]
+
+        patchers.extend([
+            patch('requests.get', side_effect=responses),
+            patch('clients.social_media_client.time.sleep', return_value=None)
+        ])
+        for patcher in patchers:
+            patcher.start()
+
+        return InstagramClient(container_poll_delay=0.01)
+
+    yield get_instagram_client
+
+    for patcher in patchers:
+        patcher.stop()
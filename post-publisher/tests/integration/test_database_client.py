@@ -1,4 +1,5 @@
 from clients.database_client import CosmosDbClient
+from models.publish_status import PublishStatus
 
 
 def test_find_one_by_published(test_cosmosdb_client: CosmosDbClient):
@@ -26,6 +27,38 @@ def test_find_one_by_published(test_cosmosdb_client: CosmosDbClient):
     assert result["published"] is False
 
 
+def test_find_next_by_published_returns_projected_documents_in_schedule_order(
+    test_cosmosdb_client: CosmosDbClient):
+    """
+    GIVEN a test Cosmos DB instance
+        AND some dummy unpublished records with different scheduled times
+    WHEN the method to find the next record in the publishing queue is called
+    THEN it should return the earliest scheduled record
+        AND only its id and caption should be returned
+        AND the consumed request units should be recorded
+    """
+    # Insert some records with scheduled times
+    test_cosmosdb_client.container_client.upsert_item({
+        "id": "456",
+        "caption": "later caption",
+        "published": False,
+        "scheduled_at": "2024-09-02T17:00:00+00:00"
+    })
+    test_cosmosdb_client.container_client.upsert_item({
+        "id": "123",
+        "caption": "earlier caption",
+        "published": False,
+        "scheduled_at": "2024-09-01T17:00:00+00:00"
+    })
+
+    # Retrieve the next document of the publishing queue
+    result = test_cosmosdb_client.find_next_by_published(False)
+
+    # Check the result
+    assert result == {"id": "123", "caption": "earlier caption"}
+    assert test_cosmosdb_client.last_request_charge > 0
+
+
 def test_update_published_status(test_cosmosdb_client: CosmosDbClient):
     """
     GIVEN a test Cosmos DB instance
@@ -48,3 +81,67 @@ def test_update_published_status(test_cosmosdb_client: CosmosDbClient):
     # Check the result
     assert result["id"] == "123"
     assert result["published"] is True
+
+
+def test_claim_lease_fails_for_modified_record(test_cosmosdb_client: CosmosDbClient):
+    """
+    GIVEN a test Cosmos DB instance
+        AND a dummy unpublished record that is claimed with its current ETag
+    WHEN the record is claimed again with the same, now outdated ETag
+    THEN the second claim should fail
+    """
+    # Insert the dummy record
+    record = test_cosmosdb_client.container_client.upsert_item({
+        "id": "123",
+        "published": False
+    })
+
+    # Claim the record twice with the same ETag
+    first_claim = test_cosmosdb_client.claim_lease("123", record["_etag"],
+        "first-owner", "2099-01-01T00:00:00+00:00")
+    second_claim = test_cosmosdb_client.claim_lease("123", record["_etag"],
+        "second-owner", "2099-01-01T00:00:00+00:00")
+
+    # Check that only the first claim succeeded
+    assert first_claim["lease_owner"] == "first-owner"
+    assert first_claim["publish_attempts"] == 1
+    assert second_claim is None
+
+
+def test_update_published_statuses_skips_modified_records(test_cosmosdb_client: CosmosDbClient):
+    """
+    GIVEN a test Cosmos DB instance
+        AND two dummy unpublished records, where the second one is modified after retrieval
+    WHEN the publishing outcome of both records is updated with their retrieved ETags
+    THEN only the first record should be updated
+        AND the id of the second record should be returned as a conflict
+    """
+    # Insert the dummy records and modify the second one
+    first_record = test_cosmosdb_client.container_client.upsert_item({
+        "id": "123",
+        "published": False
+    })
+    second_record = test_cosmosdb_client.container_client.upsert_item({
+        "id": "456",
+        "published": False
+    })
+    test_cosmosdb_client.container_client.upsert_item({
+        "id": "456",
+        "published": False,
+        "modified": True
+    })
+
+    # Update the publishing outcome of both records
+    conflicting_ids = test_cosmosdb_client.update_published_statuses([
+        PublishStatus(document_id=record["id"], etag=record["_etag"], published=True,
+            published_at="2024-09-01T17:00:00+00:00", post_ids={"instagram": "post-" + record["id"]})
+        for record in [first_record, second_record]
+    ])
+
+    # Check the results
+    first_result = test_cosmosdb_client.container_client.read_item("123", "123")
+    second_result = test_cosmosdb_client.container_client.read_item("456", "456")
+    assert conflicting_ids == ["456"]
+    assert first_result["published"] is True
+    assert first_result["post_ids"] == {"instagram": "post-123"}
+    assert second_result["published"] is False
@@ -24,3 +24,24 @@ def test_get_image_path_correctly_assembles_url(
         + get_config().STORAGE_CONTAINER_NAME + '/' \
         + image_meta['id'] + '.jpg' \
         + '?TESTSASTOKEN'
+
+
+def test_get_approved_image_meta_falls_back_to_documents_outside_the_queue(
+    mock_asset_manager_service: AssetManagerService
+    ):
+    """
+    GIVEN a mocked AssetManagerService instance
+        AND an empty publishing queue with an unpublished document outside of it
+    WHEN the next approved image metadata is retrieved
+    THEN the document outside of the queue should be returned
+    """
+    # Empty the publishing queue
+    mock_asset_manager_service.database_client.find_next_by_published.return_value = None
+
+    # Retrieve the next approved image metadata
+    image_meta = mock_asset_manager_service.get_approved_image_meta()
+
+    # Assert that the legacy query was used
+    mock_asset_manager_service.database_client.find_one_by_published \
+        .assert_called_once_with(published=False)
+    assert image_meta['id'] == '123'
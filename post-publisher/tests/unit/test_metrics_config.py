@@ -0,0 +1,24 @@
+import json
+import logging
+
+from config.metrics_config import MetricsRecorder
+
+
+def test_record_emits_metrics_through_logger(caplog):
+    """
+    GIVEN a metrics recorder with the log sink
+    WHEN a metric is recorded with additional attributes
+    THEN the metric should be logged as a JSON line
+    """
+    # Initialize the metrics recorder
+    metrics = MetricsRecorder('post-publisher', 'log')
+
+    # Record a metric
+    with caplog.at_level(logging.INFO):
+        metrics.record('wait_for_container', 1.5, status='FINISHED', polls=3)
+
+    # Check the logged metric
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['stage'] == 'wait_for_container'
+    assert record['duration_ms'] == 1500
+    assert record['polls'] == 3
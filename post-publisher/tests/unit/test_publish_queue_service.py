@@ -0,0 +1,58 @@
+from services.publish_queue_service import PublishQueueService
+
+
+def test_claim_next_serves_prefetched_images_in_order(
+    mock_publish_queue_service: PublishQueueService
+    ):
+    """
+    GIVEN a mocked PublishQueueService instance
+        AND two unpublished images in the publishing queue
+    WHEN the next image is claimed twice
+    THEN the images should be claimed in the queue's order
+        AND the queue should be queried only once
+    """
+    # Claim the next two images
+    first_image_meta = mock_publish_queue_service.claim_next()
+    second_image_meta = mock_publish_queue_service.claim_next()
+
+    # Assert that the images were claimed in order with a single query
+    assert first_image_meta['id'] == '123'
+    assert second_image_meta['id'] == '456'
+    mock_publish_queue_service.database_client.find_claimable_by_published.assert_called_once()
+
+
+def test_claim_next_skips_images_claimed_by_another_run(
+    mock_publish_queue_service: PublishQueueService
+    ):
+    """
+    GIVEN a mocked PublishQueueService instance
+        AND two unpublished images in the publishing queue
+        AND the first image is claimed by another run in the meantime
+    WHEN the next image is claimed
+    THEN the second image should be claimed
+    """
+    # Make the ETag check of the first image fail
+    mock_publish_queue_service.database_client.claim_lease.side_effect = \
+        lambda document_id, **kwargs: None if document_id == '123' else {"id": document_id}
+
+    # Claim the next image
+    image_meta = mock_publish_queue_service.claim_next()
+
+    # Assert that the first image was skipped
+    assert image_meta['id'] == '456'
+
+
+def test_claim_next_returns_none_for_empty_queue(
+    mock_publish_queue_service: PublishQueueService
+    ):
+    """
+    GIVEN a mocked PublishQueueService instance
+        AND an empty publishing queue
+    WHEN the next image is claimed
+    THEN no image should be returned
+    """
+    # Empty the publishing queue
+    mock_publish_queue_service.database_client.find_claimable_by_published.return_value = []
+
+    # Assert that no image is claimed
+    assert mock_publish_queue_service.claim_next() is None
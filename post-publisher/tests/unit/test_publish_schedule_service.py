@@ -0,0 +1,97 @@
+import datetime
+
+from models.publish_plan import PublishPlan
+from services.publish_schedule_service import PublishScheduleService
+
+
+def test_get_due_slots_returns_slots_since_last_published_post():
+    """
+    GIVEN a posting plan with two slots per day in a non-UTC timezone
+        AND a post that was published at the morning slot
+    WHEN the due slots are computed in the evening
+    THEN only the evening slot should be due
+    """
+    # Initialize the posting plan
+    publish_schedule_service = PublishScheduleService(
+        PublishPlan.parse(slots='09:00,17:00', timezone='Europe/Budapest', max_posts_per_run='3'))
+
+    # Compute the due slots (Budapest is UTC+2 in summer)
+    due_slots = publish_schedule_service.get_due_slots(
+        now=datetime.datetime(2024, 9, 1, 15, 0, tzinfo=datetime.timezone.utc),
+        last_published_at=datetime.datetime(2024, 9, 1, 7, 0, tzinfo=datetime.timezone.utc)
+    )
+
+    # Check that the evening slot is due
+    assert [slot.isoformat() for slot in due_slots] == ['2024-09-01T17:00:00+02:00']
+
+
+def test_get_due_slots_catches_up_to_the_max_posts_per_run():
+    """
+    GIVEN a posting plan with two slots per day and maximum three posts per run
+        AND the last post was published days ago
+    WHEN the due slots are computed
+    THEN the latest three slots should be due, in chronological order
+    """
+    # Initialize the posting plan
+    publish_schedule_service = PublishScheduleService(
+        PublishPlan.parse(slots='17:00, 09:00', timezone='UTC', max_posts_per_run='3'))
+
+    # Compute the due slots after an outage
+    due_slots = publish_schedule_service.get_due_slots(
+        now=datetime.datetime(2024, 9, 5, 10, 0, tzinfo=datetime.timezone.utc),
+        last_published_at=datetime.datetime(2024, 9, 1, 17, 0, tzinfo=datetime.timezone.utc)
+    )
+
+    # Check that only the latest three slots are due
+    assert [slot.isoformat() for slot in due_slots] == [
+        '2024-09-04T09:00:00+00:00',
+        '2024-09-04T17:00:00+00:00',
+        '2024-09-05T09:00:00+00:00'
+    ]
+
+
+def test_get_due_slots_returns_latest_slot_without_published_posts():
+    """
+    GIVEN the default posting plan
+        AND no post was published before
+    WHEN the due slots are computed
+    THEN only the latest passed slot should be due
+    """
+    # Initialize the default posting plan
+    publish_schedule_service = PublishScheduleService(PublishPlan())
+
+    # Compute the due slots
+    due_slots = publish_schedule_service.get_due_slots(
+        now=datetime.datetime(2024, 9, 5, 10, 0, tzinfo=datetime.timezone.utc))
+
+    # Check that yesterday's slot is due
+    assert [slot.isoformat() for slot in due_slots] == ['2024-09-04T17:00:00+00:00']
+
+
+def test_get_due_slots_skips_slot_published_by_early_trigger():
+    """
+    GIVEN a posting plan with two slots per day
+        AND a timer trigger that fired 30 seconds before the evening slot
+    WHEN the due slots are computed by the early run, and again by a later run
+        after the early run published its post
+    THEN the evening slot should be due in the early run only
+    """
+    # Initialize the posting plan
+    publish_schedule_service = PublishScheduleService(
+        PublishPlan.parse(slots='09:00,17:00', timezone='UTC', max_posts_per_run='3'))
+
+    # Compute the due slots in the early run, which publishes the evening slot's post
+    early_due_slots = publish_schedule_service.get_due_slots(
+        now=datetime.datetime(2024, 9, 1, 16, 59, 30, tzinfo=datetime.timezone.utc),
+        last_published_at=datetime.datetime(2024, 9, 1, 9, 0, 5, tzinfo=datetime.timezone.utc)
+    )
+
+    # Compute the due slots in the later run
+    later_due_slots = publish_schedule_service.get_due_slots(
+        now=datetime.datetime(2024, 9, 1, 18, 0, tzinfo=datetime.timezone.utc),
+        last_published_at=datetime.datetime(2024, 9, 1, 16, 59, 35, tzinfo=datetime.timezone.utc)
+    )
+
+    # Check that the evening slot is not published twice
+    assert [slot.isoformat() for slot in early_due_slots] == ['2024-09-01T17:00:00+00:00']
+    assert later_due_slots == []
@@ -0,0 +1,59 @@
+import pytest
+
+from exceptions.social_media_client_exceptions import (
+    InstagramMediaContainerException,
+    InstagramMediaContainerTimeoutException
+)
+
+
+def test_wait_for_container_polls_until_finished(make_instagram_client_with_container_statuses):
+    """
+    GIVEN a mocked Instagram client whose media container is processed after some time
+    WHEN the client waits for the media container
+    THEN it should poll the status until the container is finished
+        AND it should record the number of polls
+    """
+    # Initialize the client with a container that finishes on the third status check
+    instagram_client = make_instagram_client_with_container_statuses(
+        ['IN_PROGRESS', 'IN_PROGRESS', 'FINISHED'])
+
+    # Wait for the container to be ready
+    instagram_client.wait_for_container('0001', 'test-access-token')
+
+    # Check the recorded metrics
+    assert instagram_client.container_metrics['status_code'] == 'FINISHED'
+    assert instagram_client.container_metrics['polls'] == 3
+
+
+def test_wait_for_container_raises_exception_on_error_status(
+    make_instagram_client_with_container_statuses):
+    """
+    GIVEN a mocked Instagram client whose media container fails to be processed
+    WHEN the client waits for the media container
+    THEN it should raise an exception with the container's status code
+    """
+    # Initialize the client with a container that fails to process the image
+    instagram_client = make_instagram_client_with_container_statuses(['IN_PROGRESS', 'ERROR'])
+
+    # Check that waiting for the container raises an exception
+    with pytest.raises(InstagramMediaContainerException) as e:
+        instagram_client.wait_for_container('0001', 'test-access-token')
+
+    assert e.value.status_code == 'ERROR'
+
+
+def test_wait_for_container_raises_exception_after_deadline(
+    make_instagram_client_with_container_statuses):
+    """
+    GIVEN a mocked Instagram client whose media container is never processed
+        AND a deadline that is already reached
+    WHEN the client waits for the media container
+    THEN it should raise a timeout exception
+    """
+    # Initialize the client with a container that stays in progress
+    instagram_client = make_instagram_client_with_container_statuses(['IN_PROGRESS'])
+    instagram_client.container_poll_deadline = 0
+
+    # Check that waiting for the container raises a timeout exception
+    with pytest.raises(InstagramMediaContainerTimeoutException):
+        instagram_client.wait_for_container('0001', 'test-access-token')
@@ -31,3 +31,62 @@ def test_publish_post_publishes_to_all_accounts(
             account_id=mock_key_vault_client.get_secret("instagram-account-id").value,
             access_token=mock_key_vault_client.get_secret("instagram-access-token").value
         )
+
+
+def test_publish_posts_returns_post_ids_of_successful_accounts(
+    mock_key_vault_client,
+    mock_instagram_clients: list[InstagramClient]
+    ):
+    """
+    GIVEN two mocked social media accounts, where the second one fails to publish
+        AND a social media manager service that manages these accounts
+    WHEN the service is called to publish a post
+    THEN only the post id of the first account should be returned
+    """
+    # Initialize the social media manager service with differently named accounts
+    social_media_manager_service = SocialMediaManagerService(mock_key_vault_client)
+    mock_instagram_clients[0].publish_post.return_value = "post-1"
+    mock_instagram_clients[1].name = "failing"
+    mock_instagram_clients[1].publish_post.side_effect = Exception("Failed to publish")
+    for client in mock_instagram_clients:
+        social_media_manager_service.add_social_media_account(client)
+
+    # Publish the post to all registered social media accounts
+    post_ids = social_media_manager_service.publish_posts("test.jpg", "Test caption")
+
+    # Assert that only the successful post id is returned
+    assert post_ids == {"instagram": "post-1"}
+
+
+def test_publish_posts_keeps_post_ids_when_credentials_of_next_account_fail(
+    mock_key_vault_client,
+    mock_instagram_clients: list[InstagramClient]
+    ):
+    """
+    GIVEN two mocked social media accounts, where the credentials of the second one
+        can't be retrieved from the key vault
+        AND a social media manager service that manages these accounts
+    WHEN the service is called to publish a post
+    THEN the post id of the first account should be returned
+    """
+    # Make the key vault fail for the second account
+    social_media_manager_service = SocialMediaManagerService(mock_key_vault_client)
+    get_secret = mock_key_vault_client.get_secret.side_effect
+
+    def get_secret_side_effect(name):
+        if not name.startswith("instagram"):
+            raise ConnectionError("Key vault unreachable")
+        return get_secret(name)
+
+    mock_key_vault_client.get_secret.side_effect = get_secret_side_effect
+    mock_instagram_clients[0].publish_post.return_value = "post-1"
+    mock_instagram_clients[1].name = "unreachable"
+    for client in mock_instagram_clients:
+        social_media_manager_service.add_social_media_account(client)
+
+    # Publish the post to all registered social media accounts
+    post_ids = social_media_manager_service.publish_posts("test.jpg", "Test caption")
+
+    # Assert that the post id of the first account is kept
+    assert post_ids == {"instagram": "post-1"}
+    mock_instagram_clients[1].publish_post.assert_not_called()